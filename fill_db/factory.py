@@ -0,0 +1,326 @@
+import datetime
+import random
+import uuid
+
+from django.db import transaction
+from django.db.models import Max
+
+from scoring.models import (
+    AgeGroup,
+    Archer,
+    Category,
+    CategoryMembership,
+    Club,
+    ClubMembership,
+    Competition,
+    CompetitionMembership,
+    Round,
+    RoundMembership,
+    Score,
+    ScoringSheet,
+    Team,
+    TeamMembership,
+)
+from scoring import reference
+from scoring.ids import uuid7
+from scoring.slugs import SlugAllocator
+from scoring.summaries import invalidate_summary
+
+FIRST_NAMES = [
+    'Anna', 'Bram', 'Daan', 'Emma', 'Femke', 'Gijs', 'Hanna', 'Iris', 'Jan', 'Julia',
+    'Lars', 'Lotte', 'Milan', 'Noor', 'Peter', 'Piet', 'Rik', 'Sanne', 'Sem', 'Tess',
+]
+LAST_NAMES = [
+    'Bakker', 'Bos', 'Dekker', 'de Boer', 'de Groot', 'de Jong', 'de Vries', 'Dijkstra',
+    'Hendriks', 'Jansen', 'Janssen', 'Meijer', 'Mulder', 'Peters', 'Smit', 'van Dijk',
+    'van den Berg', 'van Leeuwen', 'Visser', 'Willems',
+]
+TOWNS = [
+    'Amsterdam', 'Breda', 'Den Bosch', 'Eindhoven', 'Groningen', 'Helmond', 'Nijmegen',
+    'Tilburg', 'Utrecht', 'Veldhoven', 'Zwolle',
+]
+CLUB_WORDS = ['Boog', 'Pijl', 'Schutters', 'Roos', 'Koker', 'Pees', 'Vizier', 'Doel']
+ROUNDS_PER_COMPETITION = 5
+
+
+class BulkFixtureFactory:
+    """
+    Generate large, reproducible datasets with ``bulk_create``.
+
+    Rows are built in memory ``batch_size`` at a time with their UUIDs set in
+    Python, so foreign keys are drawn from id pools kept by the factory
+    instead of being queried back. Slugs are assigned per batch by a
+    ``SlugAllocator`` per model instead of a uniqueness query per row. Model
+    signals do not run for bulk inserts; :meth:`finish` invalidates the
+    cached summaries afterwards.
+    """
+    def __init__(self, author, seed=None, batch_size=2000, stdout=None):
+        self.author = author
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.stdout = stdout
+        # The seed fixes every value drawn; ids and the tag that keeps names
+        # unique stay random so the same seed can be loaded twice.
+        self.tag = uuid.uuid4().hex[:8]
+        self.created = {}
+        self.slugs = {}
+
+    def uuid(self):
+        return uuid7()
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def insert(self, model, rows):
+        """
+        ``bulk_create`` an iterable of unsaved rows in batches and return their
+        primary keys.
+        """
+        pks = []
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                pks += self.flush(model, batch)
+                batch = []
+        if batch:
+            pks += self.flush(model, batch)
+        self.created[model] = self.created.get(model, 0) + len(pks)
+        self.log(f'{model._meta.verbose_name_plural}: {len(pks)} created')
+        return pks
+
+    def flush(self, model, batch):
+        if model not in self.slugs:
+            self.slugs[model] = SlugAllocator(model)
+        self.slugs[model].assign(batch)
+        with transaction.atomic():
+            model.objects.bulk_create(batch, batch_size=self.batch_size)
+        return [row.pk for row in batch]
+
+    def pool(self, model):
+        return list(model.objects.values_list('pk', flat=True))
+
+    def names(self, model):
+        """
+        Map pk to name, for the ``sort_key`` of the memberships.
+        """
+        return dict(model.all_objects.values_list('pk', 'name'))
+
+    def create_archers(self, count):
+        first_union_number = (Archer.all_objects.aggregate(Max('union_number'))['union_number__max'] or 0) + 1
+
+        def rows():
+            for index in range(count):
+                last_name = self.random.choice(LAST_NAMES)
+                yield Archer(
+                    id=self.uuid(),
+                    author=self.author,
+                    first_name=self.random.choice(FIRST_NAMES),
+                    last_name=last_name,
+                    union_number=first_union_number + index,
+                    city=self.random.choice(TOWNS),
+                    birth_date=datetime.date(1950, 1, 1) + datetime.timedelta(days=self.random.randrange(20000)),
+                )
+        return self.insert(Archer, rows())
+
+    def create_clubs(self, count):
+        def rows():
+            for index in range(count):
+                name = f'De {self.random.choice(CLUB_WORDS)} {self.tag}-{index}'
+                yield Club(
+                    id=self.uuid(),
+                    author=self.author,
+                    name=name,
+                    town=self.random.choice(TOWNS),
+                )
+        return self.insert(Club, rows())
+
+    def create_rounds(self, count, scoringsheet_ids):
+        start = datetime.date(2026, 1, 1)
+        arrows_per_sheet = {
+            pk: rows * columns
+            for pk, rows, columns in ScoringSheet.objects.filter(
+                pk__in=scoringsheet_ids,
+            ).values_list('pk', 'rows', 'columns')
+        }
+
+        def rows():
+            for index in range(count):
+                name = f'Round {self.tag}-{index:07d}'
+                yield Round(
+                    id=self.uuid(),
+                    author=self.author,
+                    name=name,
+                    start_date=start + datetime.timedelta(days=7 * (index % 520)),
+                    start_time=datetime.time(20, 0),
+                    scoringsheet_id=self.random.choice(scoringsheet_ids) if scoringsheet_ids else None,
+                )
+        round_ids = []
+        self.arrows_per_round = {}
+        self.round_names = {}
+        for round in self.build(Round, rows()):
+            round_ids.append(round.pk)
+            self.arrows_per_round[round.pk] = arrows_per_sheet.get(round.scoringsheet_id, 30)
+            self.round_names[round.pk] = round.name
+        return round_ids
+
+    def build(self, model, rows):
+        """
+        Like :meth:`insert` but yields the inserted rows, for callers that
+        need more than the primary keys.
+        """
+        batch = []
+        total = 0
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self.flush(model, batch)
+                total += len(batch)
+                yield from batch
+                batch = []
+        if batch:
+            self.flush(model, batch)
+            total += len(batch)
+            yield from batch
+        self.created[model] = self.created.get(model, 0) + total
+        self.log(f'{model._meta.verbose_name_plural}: {total} created')
+
+    def create_competitions(self, round_ids):
+        competition_ids = []
+        memberships = []
+        for index in range(0, len(round_ids), ROUNDS_PER_COMPETITION):
+            competition_id = self.uuid()
+            competition_ids.append(competition_id)
+            for round_id in round_ids[index:index + ROUNDS_PER_COMPETITION]:
+                memberships.append((competition_id, round_id))
+
+        competition_names = {
+            competition_id: f'Competition {self.tag}-{index:06d}'
+            for index, competition_id in enumerate(competition_ids)
+        }
+        self.insert(Competition, (
+            Competition(
+                id=competition_id,
+                author=self.author,
+                name=competition_names[competition_id],
+            )
+            for competition_id in competition_ids
+        ))
+        self.insert(CompetitionMembership, (
+            CompetitionMembership(
+                id=self.uuid(),
+                author=self.author,
+                competition_id=competition_id,
+                round_id=round_id,
+                sort_key=competition_names[competition_id],
+            )
+            for competition_id, round_id in memberships
+        ))
+        return competition_ids
+
+    def create_group_memberships(self, archer_ids, club_ids, category_ids, agegroup_ids, team_ids):
+        if club_ids:
+            self.insert(ClubMembership, (
+                ClubMembership(
+                    id=self.uuid(),
+                    author=self.author,
+                    archer_id=archer_id,
+                    club_id=self.random.choice(club_ids),
+                )
+                for archer_id in archer_ids
+            ))
+        if category_ids:
+            category_names = self.names(Category)
+            self.insert(CategoryMembership, (
+                CategoryMembership(
+                    id=self.uuid(),
+                    author=self.author,
+                    archer_id=archer_id,
+                    category_id=category_id,
+                    agegroup_id=self.random.choice(agegroup_ids) if agegroup_ids else None,
+                    sort_key=category_names[category_id],
+                )
+                for archer_id, category_id in (
+                    (archer_id, self.random.choice(category_ids)) for archer_id in archer_ids
+                )
+            ))
+        if team_ids:
+            # Roughly one archer in five shoots in a team
+            team_names = self.names(Team)
+            self.insert(TeamMembership, (
+                TeamMembership(
+                    id=self.uuid(),
+                    author=self.author,
+                    archer_id=archer_id,
+                    team_id=team_id,
+                    sort_key=team_names[team_id],
+                )
+                for archer_id, team_id in (
+                    (archer_id, self.random.choice(team_ids)) for archer_id in archer_ids
+                    if self.random.random() < 0.2
+                )
+            ))
+
+    def create_scores(self, archer_ids, round_ids, scores_per_archer):
+        """
+        Register every archer for ``scores_per_archer`` distinct rounds and
+        shoot one score in each.
+        """
+        per_archer = min(scores_per_archer, len(round_ids))
+        arrows_per_round = getattr(self, 'arrows_per_round', {})
+        round_names = getattr(self, 'round_names', None) or self.names(Round)
+
+        def memberships():
+            for archer_id in archer_ids:
+                for round_id in self.random.sample(round_ids, per_archer):
+                    yield RoundMembership(
+                        id=self.uuid(),
+                        author=self.author,
+                        archer_id=archer_id,
+                        round_id=round_id,
+                        sort_key=round_names[round_id],
+                    )
+
+        def scores():
+            for membership in self.build(RoundMembership, memberships()):
+                number_of_arrows = arrows_per_round.get(membership.round_id, 30)
+                # Mean arrow around 8 with archer to archer spread
+                average = min(10.0, max(1.0, self.random.gauss(8.0, 1.0)))
+                score = int(min(10 * number_of_arrows, max(0, self.random.gauss(average * number_of_arrows, number_of_arrows / 3))))
+                tens = min(number_of_arrows, max(0, int(number_of_arrows * (average - 7) / 4)))
+                yield Score(
+                    id=self.uuid(),
+                    author=self.author,
+                    round_archer_id=membership.pk,
+                    score=score,
+                    number_of_arrows=number_of_arrows,
+                    tens=tens,
+                    xs=tens // 3,
+                )
+
+        return self.insert(Score, scores())
+
+    def run(self, archers=0, clubs=0, rounds=0, scores_per_archer=0):
+        club_ids = self.create_clubs(clubs) if clubs else []
+        round_ids = self.create_rounds(rounds, self.pool(ScoringSheet)) if rounds else []
+        if round_ids:
+            self.create_competitions(round_ids)
+        archer_ids = self.create_archers(archers) if archers else []
+        if archer_ids:
+            self.create_group_memberships(
+                archer_ids,
+                club_ids or self.pool(Club),
+                self.pool(Category),
+                self.pool(AgeGroup),
+                self.pool(Team),
+            )
+        if archer_ids and scores_per_archer:
+            self.create_scores(archer_ids, round_ids or self.pool(Round), scores_per_archer)
+        self.finish()
+        return self.created
+
+    def finish(self):
+        for model in self.created:
+            invalidate_summary(model)
+            reference.invalidate(model)
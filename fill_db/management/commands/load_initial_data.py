@@ -5,6 +5,8 @@ from django.core.management.base import BaseCommand
 from userauth.models import CustomUser
 from django.utils import lorem_ipsum
 
+from fill_db.factory import BulkFixtureFactory
+
 from scoring.models import (
     AgeGroup,
     Archer,
@@ -60,8 +62,17 @@ class Command(BaseCommand):
 
         
     help = 'Populate the database with sample data'
-    
+
+    def add_arguments(self, parser):
+        parser.add_argument('--archers', type=int, default=0, help="Generated archers on top of the sample data.")
+        parser.add_argument('--clubs', type=int, default=0, help="Generated clubs.")
+        parser.add_argument('--rounds', type=int, default=0, help="Generated rounds, grouped in competitions of five.")
+        parser.add_argument('--scores-per-archer', type=int, default=0, help="Rounds shot by every generated archer.")
+        parser.add_argument('--seed', type=int, default=None, help="Seed for reproducible data.")
+        parser.add_argument('--batch-size', type=int, default=2000, help="Rows per bulk insert.")
+
     def handle(self, *args, **kwargs):
+        self.random = random.Random(kwargs.get('seed'))
         self.create_sample_archers()
         self.create_sample_clubs()
         self.create_sample_club_memberships()
@@ -78,6 +89,63 @@ class Command(BaseCommand):
         self.create_sample_agegroups()
         self.create_sample_competitions()
 
+        counts = {name: kwargs.get(name) or 0 for name in ('archers', 'clubs', 'rounds', 'scores_per_archer')}
+        if any(counts.values()):
+            factory = BulkFixtureFactory(
+                self.user,
+                seed=kwargs.get('seed'),
+                batch_size=kwargs.get('batch_size') or 2000,
+                stdout=self.stdout if SCREEN_OUTPUT else None,
+            )
+            factory.run(**counts)
+            if SCREEN_OUTPUT:
+                self.stdout.write(self.style.SUCCESS(
+                    'Bulk data created, run "manage.py rebuild_leaderboards" to rank the new scores.'
+                ))
+
+    def save_missing(self, model, objects, key='name'):
+        """
+        Save the ``objects`` whose ``key`` is not in the database yet. The
+        existing keys are read in one query instead of one per object.
+        """
+        existing = set(model.all_objects.filter(
+            **{f'{key}__in': [getattr(obj, key) for obj in objects]}
+        ).values_list(key, flat=True))
+        created = [obj for obj in objects if getattr(obj, key) not in existing]
+        for obj in created:
+            obj.save()
+        if SCREEN_OUTPUT:
+            self.stdout.write(self.style.SUCCESS(f'{model.__name__}: {len(created)} created'))
+        return created
+
+    def create_sample_memberships(self, model, group_model, group_field, count=9):
+        """
+        Add up to ``count`` random archer/group memberships. Both sides are
+        drawn from pk pools read once, already existing pairs are skipped.
+        """
+        archer_ids = list(Archer.objects.values_list('pk', flat=True))
+        group_ids = list(group_model.objects.values_list('pk', flat=True))
+        if not archer_ids or not group_ids:
+            return []
+        pairs = set(model.all_objects.values_list('archer_id', f'{group_field}_id'))
+        created = []
+        for i in range(count):
+            pair = (self.random.choice(archer_ids), self.random.choice(group_ids))
+            if pair in pairs:
+                continue
+            pairs.add(pair)
+            membership = model(
+                author=self.user,
+                archer_id=pair[0],
+                info=lorem_ipsum.paragraph(),
+                **{f'{group_field}_id': pair[1]},
+            )
+            membership.save()
+            created.append(membership)
+        if SCREEN_OUTPUT:
+            self.stdout.write(self.style.SUCCESS(f'{model.__name__}: {len(created)} created'))
+        return created
+
     def create_sample_archers(self):
         archers = [
             Archer(
@@ -102,11 +170,7 @@ class Command(BaseCommand):
                 info=lorem_ipsum.paragraph(),
             ),
         ]
-        for archer in archers:
-            if not Archer.objects.filter(union_number=archer.union_number):
-                archer.save()
-                if SCREEN_OUTPUT:
-                    self.stdout.write(self.style.SUCCESS(f'Archer - {archer.first_name} {archer.last_name} created'))
+        self.save_missing(Archer, archers, key='union_number')
 
     def create_sample_clubs(self):
         clubs = [
@@ -141,29 +205,10 @@ class Command(BaseCommand):
                 info=lorem_ipsum.paragraph(),
             ),
         ]
-        for club in clubs:
-            if not Club.objects.filter(name=club.name):
-                club.save()
-                if SCREEN_OUTPUT:
-                    self.stdout.write(self.style.SUCCESS(f'Club "{club.name} created" '))
+        self.save_missing(Club, clubs)
 
     def create_sample_club_memberships(self):
-        for i in range (1,10):
-            _club = random.choice(Club.objects.all())
-            _archer = random.choice(Archer.objects.all())
-            club_membership = ClubMembership.objects.filter(
-                archer=_archer,
-                club=_club,
-            )
-            if not club_membership:
-                club_membership = ClubMembership.objects.create(
-                    author=self.user,
-                    club=_club,
-                    archer=_archer,
-                    info=lorem_ipsum.paragraph(),
-                )
-                if SCREEN_OUTPUT:
-                    self.stdout.write(self.style.SUCCESS(f'New ClubMembership created: Club - {club_membership.club.name} ; Archer - {club_membership.archer.first_name} {club_membership.archer.last_name}'))
+        self.create_sample_memberships(ClubMembership, Club, 'club')
 
     def create_sample_disciplines(self):
         disciplines = [
@@ -218,30 +263,11 @@ class Command(BaseCommand):
                 info=lorem_ipsum.paragraph(),
             ),
         ]
-        for discipline in disciplines:
-            if not Discipline.objects.filter(name=discipline.name):
-                discipline.save()
-                if SCREEN_OUTPUT:
-                    self.stdout.write(self.style.SUCCESS(f'Discipline "{discipline.name} created"'))
+        self.save_missing(Discipline, disciplines)
 
     def create_sample_discipline_memberships(self):
-        for i in range(1, 10):
-            discipline = random.choice(Discipline.objects.all())
-            archer = random.choice(Archer.objects.all())
-            discipline_membership = DisciplineMembership.objects.filter(
-                archer=archer,
-                discipline=discipline,
-            )
-            if not discipline_membership:
-                discipline_membership = DisciplineMembership.objects.create(
-                    author=self.user,
-                    discipline=discipline,
-                    archer=archer,
-                    info=lorem_ipsum.paragraph(),
-                )
-                if SCREEN_OUTPUT:
-                    self.stdout.write(self.style.SUCCESS(f'New DisciplineMembership created: Discipline - {discipline_membership.discipline.name} ; Archer - {discipline_membership.archer.first_name} {discipline_membership.archer.last_name}'))
-                
+        self.create_sample_memberships(DisciplineMembership, Discipline, 'discipline')
+
     def create_sample_categories(self):
         categories = [
             Category(
@@ -270,30 +296,11 @@ class Command(BaseCommand):
                 info=lorem_ipsum.paragraph(),
             ),
         ]
-        for category in categories:
-            if not Category.objects.filter(name=category.name):
-                category.save()
-                if SCREEN_OUTPUT:
-                    self.stdout.write(self.style.SUCCESS(f'Category - {category.name} created'))
+        self.save_missing(Category, categories)
        
     def create_sample_category_memberships(self):
-        for i in range(1, 10):
-            category = random.choice(Category.objects.all())
-            archer = random.choice(Archer.objects.all())
-            category_membership = CategoryMembership.objects.filter(
-                archer=archer,
-                category=category,
-            )
-            if not category_membership:
-                category_membership = CategoryMembership.objects.create(
-                    author=self.user,
-                    category=category,
-                    archer=archer,
-                    info=lorem_ipsum.paragraph(),
-                )
-                if SCREEN_OUTPUT:
-                    self.stdout.write(self.style.SUCCESS(f'New CategoryMembership created: Category - {category_membership.category.name} ; Archer - {category_membership.archer.first_name} {category_membership.archer.last_name}'))                
-        
+        self.create_sample_memberships(CategoryMembership, Category, 'category')
+
     def create_sample_teams(self):
         teams = [
             Team(
@@ -322,30 +329,11 @@ class Command(BaseCommand):
                 info=lorem_ipsum.paragraph(),              
             ),
         ]
-        for team in teams:
-            if not Team.objects.filter(name=team.name):
-                team.save()
-                if SCREEN_OUTPUT:
-                    self.stdout.write(self.style.SUCCESS(f'Team "{team.name} created"'))
+        self.save_missing(Team, teams)
                          
     def create_sample_team_memberships(self):
-        for i in range(1, 10):
-            team = random.choice(Team.objects.all())
-            archer = random.choice(Archer.objects.all())
-            team_membership = TeamMembership.objects.filter(
-                archer=archer,
-                team=team,
-            )
-            if not team_membership:
-                team_membership = TeamMembership.objects.create(
-                    author=self.user,
-                    team=team,
-                    archer=archer,
-                    info=lorem_ipsum.paragraph(),
-                )
-                if SCREEN_OUTPUT:
-                    self.stdout.write(self.style.SUCCESS(f'New TeamMembership created: Discipline - {team_membership.team.name} ; Archer - {team_membership.archer.first_name} {team_membership.archer.last_name}'))
-                
+        self.create_sample_memberships(TeamMembership, Team, 'team')
+
     def create_sample_scoringsheets(self):
         scoringsheets = [
             ScoringSheet(
@@ -398,11 +386,7 @@ class Command(BaseCommand):
                 info=lorem_ipsum.paragraph(),
             ),
         ]
-        for scoringsheet in scoringsheets:
-            if not ScoringSheet.objects.filter(name=scoringsheet.name):
-                scoringsheet.save()
-                if SCREEN_OUTPUT:
-                    self.stdout.write(self.style.SUCCESS(f'Scoringsheet - {scoringsheet.name} created'))
+        self.save_missing(ScoringSheet, scoringsheets)
 
     # TODO: Finish create_sample_target_face_name_choices
     def create_sample_target_face_name_choices(self):
@@ -473,12 +457,8 @@ class Command(BaseCommand):
             ),
         ]
         for targetfacenamechoice in targetfacenamechoices:
-            new_name = f"{targetfacenamechoice.environment} {targetfacenamechoice.discipline} {targetfacenamechoice.targetsize} {targetfacenamechoice.keyfeature}"
-            if not TargetFaceNameChoice.objects.filter(name=new_name):
-                targetfacenamechoice.name = new_name
-                targetfacenamechoice.save()
-                if SCREEN_OUTPUT:
-                    self.stdout.write(self.style.SUCCESS(f'TargetFaceNameChoice "{new_name} created" '))
+            targetfacenamechoice.name = f"{targetfacenamechoice.environment} {targetfacenamechoice.discipline} {targetfacenamechoice.targetsize} {targetfacenamechoice.keyfeature}"
+        self.save_missing(TargetFaceNameChoice, targetfacenamechoices)
     
     # TODO: Finish create_sample_target_faces
     def create_sample_target_faces(self):
@@ -524,11 +504,7 @@ class Command(BaseCommand):
                 info=lorem_ipsum.paragraph(),
             ),
         ]
-        for round in rounds:
-            if not Round.objects.filter(name=round.name):
-                round.save()
-                if SCREEN_OUTPUT:
-                    self.stdout.write(self.style.SUCCESS(f'Round - {round.name} created'))
+        self.save_missing(Round, rounds)
 
     # Pupils    -   Pupillen 
     # Aspirants -   Aspiranten
@@ -575,11 +551,7 @@ class Command(BaseCommand):
                 info=lorem_ipsum.paragraph(),
             ),
         ]
-        for  agegroup in  agegroups:
-            if not AgeGroup.objects.filter(name=agegroup.name):
-                agegroup.save()
-                if SCREEN_OUTPUT:
-                    self.stdout.write(self.style.SUCCESS(f'AgeGroup - {agegroup.name} created'))
+        self.save_missing(AgeGroup, agegroups)
 
     def create_sample_competitions(self):
         competitions = [
@@ -634,8 +606,4 @@ class Command(BaseCommand):
                 info=lorem_ipsum.paragraph(),
             ),
         ]
-        for  competition in  competitions:
-            if not Competition.objects.filter(name=competition.name):
-                competition.save()
-                if SCREEN_OUTPUT:
-                    self.stdout.write(self.style.SUCCESS(f'Competition - {competition.name} created'))
+        self.save_missing(Competition, competitions)
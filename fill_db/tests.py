@@ -1,3 +1,62 @@
 from django.test import TestCase
+from silk.collector import DataCollector
 
-# Create your tests here.
+from scoring.models import (
+    Archer,
+    Club,
+    ClubMembership,
+    Competition,
+    CompetitionMembership,
+    Round,
+    RoundMembership,
+    Score,
+    ScoringSheet,
+)
+from userauth.models import CustomUser
+
+from .factory import BulkFixtureFactory
+
+
+class BulkFixtureFactoryTestCase(TestCase):
+    def setUp(self):
+        # A request silk recorded in an earlier test would have it EXPLAIN
+        # every query counted below
+        DataCollector().clear()
+        self.user = CustomUser.objects.create_superuser(
+            username='admin', display_name='Admin User', password='abcd@1234', email='me@mail.com',
+        )
+        ScoringSheet.objects.create(author=self.user, name='Indoor 18 meter', columns=3, rows=10)
+
+    def test_run_creates_requested_rows(self):
+        factory = BulkFixtureFactory(self.user, seed=1, batch_size=7)
+        factory.run(archers=20, clubs=3, rounds=10, scores_per_archer=4)
+
+        self.assertEqual(Archer.objects.count(), 20)
+        self.assertEqual(Club.objects.count(), 3)
+        self.assertEqual(Round.objects.count(), 10)
+        self.assertEqual(Competition.objects.count(), 2)
+        self.assertEqual(CompetitionMembership.objects.count(), 10)
+        self.assertEqual(ClubMembership.objects.count(), 20)
+        self.assertEqual(RoundMembership.objects.count(), 80)
+        self.assertEqual(Score.objects.count(), 80)
+        self.assertEqual(factory.created[Score], 80)
+        self.assertFalse(Score.objects.filter(number_of_arrows__gt=30).exists())
+
+    def test_bulk_insert_query_count(self):
+        factory = BulkFixtureFactory(self.user, seed=1, batch_size=100)
+        # One max(union_number) lookup, one slug prefix lookup, one INSERT and
+        # the transaction savepoints
+        with self.assertNumQueries(5):
+            factory.create_archers(100)
+
+    def test_same_seed_same_data(self):
+        first = BulkFixtureFactory(self.user, seed=42)
+        first.create_archers(10)
+        first_names = list(Archer.objects.order_by('union_number').values_list('first_name', 'last_name', 'city'))
+
+        Archer.objects.all().delete()
+        second = BulkFixtureFactory(self.user, seed=42)
+        second.create_archers(10)
+        second_names = list(Archer.objects.order_by('union_number').values_list('first_name', 'last_name', 'city'))
+
+        self.assertEqual(first_names, second_names)
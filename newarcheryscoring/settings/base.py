@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
+import os
 from pathlib import Path
 
 PROJECT_DIR = Path(__file__).resolve().parent.parent
@@ -76,6 +77,7 @@ SITE_ID = 1
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "scoring.middleware.SQLiteWriteQueueMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -125,6 +127,55 @@ DATABASES = {
     }
 }
 
+# SQLite performance mode for single-node deployments: WAL so readers never
+# wait for the writer, fsync at checkpoints only (synchronous=NORMAL), a 256 MB
+# memory map, a 64 MB page cache and a 20 s busy timeout. Transactions take
+# the write lock when they begin (IMMEDIATE) instead of failing halfway with
+# "database is locked". SCORING_SQLITE_TUNING=0 turns it off.
+SCORING_SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+    "busy_timeout": 20000,
+    "temp_store": "MEMORY",
+}
+if os.environ.get("SCORING_SQLITE_TUNING", "1") != "0":
+    DATABASES["default"]["OPTIONS"] = {
+        "init_command": "; ".join(f"PRAGMA {name}={value}" for name, value in SCORING_SQLITE_PRAGMAS.items()),
+        "transaction_mode": "IMMEDIATE",
+    }
+
+# Serialize write requests (POST, PUT, PATCH, DELETE) of all gunicorn workers on
+# a lock file next to the SQLite database (scoring/middleware.py). A request
+# that waited SCORING_SQLITE_WRITE_TIMEOUT seconds gets 503 Service Unavailable.
+SCORING_SQLITE_WRITE_QUEUE = os.environ.get("SCORING_SQLITE_WRITE_QUEUE") == "1"
+SCORING_SQLITE_WRITE_TIMEOUT = 30
+
+# PostgreSQL when POSTGRES_DB is set (the variables of the postgres Docker
+# image). Connections are kept open between requests and every statement is
+# cancelled after SCORING_DB_STATEMENT_TIMEOUT milliseconds; production.py
+# replaces the persistent connections with a pool. Copy an existing SQLite
+# database over with "python manage.py copy_sqlite_to_postgres db.sqlite3".
+if os.environ.get("POSTGRES_DB"):
+    DATABASES["default"] = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.environ["POSTGRES_DB"],
+        "USER": os.environ.get("POSTGRES_USER", "postgres"),
+        "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+        "HOST": os.environ.get("POSTGRES_HOST", "localhost"),
+        "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+        "CONN_MAX_AGE": int(os.environ.get("SCORING_DB_CONN_MAX_AGE", 600)),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "connect_timeout": 5,
+            "options": "-c statement_timeout={} -c idle_in_transaction_session_timeout={}".format(
+                int(os.environ.get("SCORING_DB_STATEMENT_TIMEOUT", 10000)),
+                int(os.environ.get("SCORING_DB_IDLE_TIMEOUT", 60000)),
+            ),
+        },
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -236,13 +287,50 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
-    ]
+    ],
 }
 
+# Live score push (scoring/live.py): broker class and SSE keepalive interval
+SCORING_LIVE_BROKER = 'scoring.live.InMemoryBroker'
+SCORING_LIVE_HEARTBEAT = 15
+
+# Delta sync (scoring/sync.py): changes younger than LAG seconds wait for the
+# next request, so rows of transactions still committing are not skipped.
+# Deletions are kept TOMBSTONE_DAYS days, older cursors get 410 Gone.
+SCORING_SYNC_LAG = 2
+SCORING_SYNC_PAGE_SIZE = 500
+SCORING_SYNC_MAX_PAGE_SIZE = 5000
+SCORING_SYNC_TOMBSTONE_DAYS = 90
+
+# Classifications (scoring/classifications.py): qualifying scores are counted
+# per season, which starts on the first of this month and is named after the
+# year it starts in.
+SCORING_SEASON_START_MONTH = 1
+
+# Cache (scoring/cache.py): a per-process LRU in front of the cache shared by
+# all workers. Values written by other processes are seen within LOCAL_TIMEOUT
+# seconds. The shared cache is Redis when SCORING_CACHE_REDIS_URL is set, else
+# the database table made by "python manage.py createcachetable".
+SCORING_CACHE_REDIS_URL = os.environ.get("SCORING_CACHE_REDIS_URL")
+
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
-        "LOCATION": BASE_DIR / ".cache",
-    }
+        "BACKEND": "scoring.cache.TieredCache",
+        "LOCATION": "shared",
+        "OPTIONS": {
+            "MAX_ENTRIES": 1000,
+            "LOCAL_TIMEOUT": 1,
+        },
+    },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": SCORING_CACHE_REDIS_URL,
+    } if SCORING_CACHE_REDIS_URL else {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "scoring_cache",
+        "OPTIONS": {
+            "MAX_ENTRIES": 50000,
+        },
+    },
 }
 
@@ -8,6 +8,17 @@ DEBUG = False
 # See https://docs.djangoproject.com/en/6.0/ref/contrib/staticfiles/#manifeststaticfilesstorage
 STORAGES["staticfiles"]["BACKEND"] = "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"
 
+# A connection pool shared by the threads of every gunicorn worker instead of
+# one persistent connection per thread. A request waits at most "timeout"
+# seconds for a free connection.
+if DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.environ.get("SCORING_DB_POOL_MIN_SIZE", 2)),
+        "max_size": int(os.environ.get("SCORING_DB_POOL_MAX_SIZE", 10)),
+        "timeout": int(os.environ.get("SCORING_DB_POOL_TIMEOUT", 10)),
+    }
+
 try:
     from .local import *
 except ImportError:
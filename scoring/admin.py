@@ -1,12 +1,15 @@
 from django.conf import settings
 from django.contrib import admin
 from django.db import models
+from django.db.models import F
+from django.utils import timezone
 from django import forms
 from .models import (
     Archer,
     AgeGroup,
     Category,
     CategoryMembership,
+    Classification,
     Club,
     ClubMembership,
     Competition,
@@ -22,6 +25,9 @@ from .models import (
     Score,
     ScoringSheet,
 )
+from . import classifications, leaderboard, reference
+from .ingest import refresh_leaderboards
+from .summaries import invalidate_summary
 from modelcluster.fields import ParentalKey
 
 from wagtail.models import Page, Orderable
@@ -40,13 +46,60 @@ from wagtail.admin.panels import (
     TitleFieldPanel,
 )
 
+def set_active(queryset, is_active):
+    # update() sends no signals and the cached summaries count active rows only
+    model = queryset.model
+    changes = {'is_active': is_active, 'modified_at': timezone.now()}
+    if model is Score:
+        # Clients holding the old version must not pass If-Match
+        changes['version'] = F('version') + 1
+    refresh = get_refresh(model, queryset)
+    queryset.update(**changes)
+    invalidate_summary(model)
+    reference.invalidate(model)
+    if refresh is not None:
+        refresh()
+
+def get_refresh(model, queryset):
+    """
+    What the signals would have brought up to date for the rows of
+    ``queryset``: leaderboards and classifications. The rows are read before
+    the update, which may take them out of a filtered changelist.
+    """
+    if model in (Score, RoundMembership):
+        field = 'round_archer_id' if model is Score else 'pk'
+        round_archer_ids = set(queryset.values_list(field, flat=True))
+        round_archer_ids.discard(None)
+
+        def refresh():
+            refresh_leaderboards(round_archer_ids)
+            classifications.update_round_archers(round_archer_ids)
+        return refresh
+    if model is CompetitionMembership:
+        competition_ids = set(queryset.values_list('competition_id', flat=True))
+
+        def refresh():
+            for competition_id in competition_ids:
+                leaderboard.rebuild_competition(competition_id)
+        return refresh
+    if model in (CategoryMembership, ClubMembership, TeamMembership):
+        archer_ids = set(queryset.values_list('archer_id', flat=True))
+
+        def refresh():
+            for archer_id in archer_ids:
+                leaderboard.update_archer(archer_id)
+            if model is CategoryMembership:
+                classifications.evaluate(archer_ids)
+        return refresh
+    return None
+
 @admin.action(description="Activate selected Archers")
 def activate_archers(modeladmin, request, queryset):
-    queryset.update(is_active=True)
+    set_active(queryset, True)
 
 @admin.action(description="Deactivate selected Archers")
 def deactivate_archers(modeladmin, request, queryset):
-    queryset.update(is_active=False)
+    set_active(queryset, False)
 
 @admin.register(Archer)
 class ArcherAdmin(admin.ModelAdmin):
@@ -78,11 +131,11 @@ class ArcherAdmin(admin.ModelAdmin):
 
 @admin.action(description="Activate selected Age Groups")
 def activate_agegroups(modeladmin, request, queryset):
-    queryset.update(is_active=True)
+    set_active(queryset, True)
 
 @admin.action(description="Deactivate selected Age Groups")
 def deactivate_agegroups(modeladmin, request, queryset):
-    queryset.update(is_active=False)
+    set_active(queryset, False)
 
 @admin.register(AgeGroup)
 class AgeGroupAdmin(admin.ModelAdmin):
@@ -114,11 +167,11 @@ class AgeGroupAdmin(admin.ModelAdmin):
 
 @admin.action(description="Activate selected Clubs")
 def activate_clubs(modeladmin, request, queryset):
-    queryset.update(is_active=True)
+    set_active(queryset, True)
 
 @admin.action(description="Deactivate selected Clubs")
 def deactivate_clubs(modeladmin, request, queryset):
-    queryset.update(is_active=False)
+    set_active(queryset, False)
 
 class ClubMembershipInline(admin.TabularInline):
     model = ClubMembership
@@ -169,11 +222,11 @@ class ClubAdmin(admin.ModelAdmin):
 
 @admin.action(description="Activate selected Club Memberships")
 def activate_clubmemberships(modeladmin, request, queryset):
-    queryset.update(is_active=True)
+    set_active(queryset, True)
 
 @admin.action(description="Deactivate selected Club Memberships")
 def deactivate_clubmemberships(modeladmin, request, queryset):
-    queryset.update(is_active=False)
+    set_active(queryset, False)
 
 @admin.register(ClubMembership)
 class ClubMembershipAdmin(admin.ModelAdmin):
@@ -206,11 +259,11 @@ class ClubMembershipAdmin(admin.ModelAdmin):
 
 @admin.action(description="Activate selected Categories")
 def activate_categories(modeladmin, request, queryset):
-    queryset.update(is_active=True)
+    set_active(queryset, True)
 
 @admin.action(description="Deactivate selected Categories")
 def deactivate_categories(modeladmin, request, queryset):
-    queryset.update(is_active=False)
+    set_active(queryset, False)
 
 class CategoryMembershipInline(admin.TabularInline):
     model = CategoryMembership
@@ -249,23 +302,56 @@ class CategoryAdmin(admin.ModelAdmin):
     )
     search_fields = ('name', 'info')
 
+@admin.action(description="Activate selected Classifications")
+def activate_classifications(modeladmin, request, queryset):
+    set_active(queryset, True)
+
+@admin.action(description="Deactivate selected Classifications")
+def deactivate_classifications(modeladmin, request, queryset):
+    set_active(queryset, False)
+
+@admin.register(Classification)
+class ClassificationAdmin(admin.ModelAdmin):
+    actions=[activate_classifications, deactivate_classifications]
+    list_display = ('name', 'category', 'agegroup', 'max_handicap', 'qualifying_scores', 'is_active',)
+    list_editable = ('is_active',)
+    list_filter = ('is_active', 'category',)
+    list_display_links = ('name',)
+    list_per_page = 20
+    ordering = ('category', 'max_handicap')
+    fieldsets = (
+        (None, {
+            'fields': ('name', 'category', 'agegroup', 'max_handicap', 'qualifying_scores', 'info',)
+        }),
+        ('Extra Information', {
+            'classes': ['collapse'],
+            'fields': ('author',),
+        }),
+        ('Special', {
+            'classes': ['collapse'],
+            'fields': ('is_active',),
+        }),
+    )
+    search_fields = ('name', 'category__name', 'info')
+
 @admin.action(description="Activate selected Category Memberships")
 def activate_category_memberships(modeladmin, request, queryset):
-    queryset.update(is_active=True)
+    set_active(queryset, True)
 
 @admin.action(description="Deactivate selected Category Memberships")
 def deactivate_category_memberships(modeladmin, request, queryset):
-    queryset.update(is_active=False)
+    set_active(queryset, False)
 
 @admin.register(CategoryMembership)
 class CategoryMembershipAdmin(admin.ModelAdmin):
     actions=[activate_category_memberships, deactivate_category_memberships]
-    list_display = ('category', 'archer', 'agegroup', 'is_active',)
+    list_display = ('category', 'archer', 'agegroup', 'classification', 'is_active',)
     list_editable = ('is_active',)
     list_filter = ('is_active', 'archer',)
     list_display_links = ('category', 'archer',)
     list_per_page = 20
     ordering = ('category', 'archer')
+    readonly_fields = ('classification', 'classification_season')
     fieldsets = (
         (None, {
             'fields': (
@@ -277,7 +363,7 @@ class CategoryMembershipAdmin(admin.ModelAdmin):
         }),
         ('Extra Information', {
             'classes': ['collapse'],
-            'fields': ('slug', 'author'),
+            'fields': ('classification', 'classification_season', 'slug', 'author'),
         }),
         ('Special', {
             'classes': ['collapse'],
@@ -288,11 +374,11 @@ class CategoryMembershipAdmin(admin.ModelAdmin):
 
 @admin.action(description="Activate selected Disciplines")
 def activate_disciplines(modeladmin, request, queryset):
-    queryset.update(is_active=True)
+    set_active(queryset, True)
 
 @admin.action(description="Deactivate selected Disciplines")
 def deactivate_disciplines(modeladmin, request, queryset):
-    queryset.update(is_active=False)
+    set_active(queryset, False)
 
 class DisciplineMembershipInline(admin.TabularInline):
     model = DisciplineMembership
@@ -333,11 +419,11 @@ class DisciplineAdmin(admin.ModelAdmin):
 
 @admin.action(description="Activate selected Discipline Memberships")
 def activate_discipline_memberships(modeladmin, request, queryset):
-    queryset.update(is_active=True)
+    set_active(queryset, True)
 
 @admin.action(description="Deactivate selected Discipline Memberships")
 def deactivate_discipline_memberships(modeladmin, request, queryset):
-    queryset.update(is_active=False)
+    set_active(queryset, False)
 
 @admin.register(DisciplineMembership)
 class DisciplineMembershipAdmin(admin.ModelAdmin):
@@ -369,11 +455,11 @@ class DisciplineMembershipAdmin(admin.ModelAdmin):
     
 @admin.action(description="Activate selected Teams")
 def activate_teams(modeladmin, request, queryset):
-    queryset.update(is_active=True)
+    set_active(queryset, True)
 
 @admin.action(description="Deactivate selected Teams")
 def deactivate_teams(modeladmin, request, queryset):
-    queryset.update(is_active=False)
+    set_active(queryset, False)
 
 
 class TeamMembershipInline(admin.TabularInline):
@@ -412,11 +498,11 @@ class TeamAdmin(admin.ModelAdmin):
 
 admin.action(description="Activate selected Team Memberships")
 def activate_team_memberships(modeladmin, request, queryset):
-    queryset.update(is_active=True)
+    set_active(queryset, True)
 
 @admin.action(description="Deactivate selected Team Memberships")
 def deactivate_team_memberships(modeladmin, request, queryset):
-    queryset.update(is_active=False)
+    set_active(queryset, False)
 
 @admin.register(TeamMembership)
 class TeamMembershipAdmin(admin.ModelAdmin):
@@ -444,11 +530,11 @@ class TeamMembershipAdmin(admin.ModelAdmin):
 
 @admin.action(description="Activate selected Scoring Sheets")
 def activate_scoring_sheets(modeladmin, request, queryset):
-    queryset.update(is_active=True)
+    set_active(queryset, True)
 
 @admin.action(description="Deactivate selected Scoring Sheets")
 def deactivate_scoring_sheets(modeladmin, request, queryset):
-    queryset.update(is_active=False)
+    set_active(queryset, False)
  
 @admin.register(ScoringSheet)
 class ScoringSheetAdmin(admin.ModelAdmin):
@@ -495,7 +581,7 @@ class TargetFaceNameChoiceAdminForm(forms.ModelForm):
             targetsize = data['targetsize']
             keyfeature = data['keyfeature']
             new_name = f"{environment} {discipline} {targetsize} {keyfeature}"
-            if TargetFaceNameChoice.objects.filter(name=new_name):
+            if TargetFaceNameChoice.all_objects.filter(name=new_name):
                 raise forms.ValidationError(f"Name '{new_name}' already exists.")
             else:
                 self.cleaned_data['name'] = new_name
@@ -548,7 +634,10 @@ class TargetFaceAdminForm(forms.ModelForm):
         CHOICES = []
         CHOICES.append((None, None),)
         
-        objs = TargetFaceNameChoice.objects.all()
+        objs = sorted(
+            (obj for obj in reference.get_rows(TargetFaceNameChoice).values() if obj.is_active),
+            key=lambda obj: obj.name,
+        )
         if objs:
             for obj in objs:
                 CHOICES.append((obj.name, obj.name),)    
@@ -585,11 +674,11 @@ class TargetFaceAdmin(admin.ModelAdmin):
 
 @admin.action(description="Activate selected Rounds")
 def activate_selected_rounds(modeladmin, request, queryset):
-    queryset.update(is_active=True)
+    set_active(queryset, True)
 
 @admin.action(description="Deactivate selected Rounds")
 def deactivate_selected_rounds(modeladmin, request, queryset):
-    queryset.update(is_active=False)
+    set_active(queryset, False)
 
 # TODO: Scores_for_selected_rounds
 @admin.action(description="Scores for selected Rounds")
@@ -627,7 +716,7 @@ class RoundAdmin(admin.ModelAdmin):
     search_fields = ('name', 'info',)
     fieldsets = (
         (None, {
-            'fields': ('name', 'start_date', 'start_time', 'end_date', 'end_time', 'info',)
+            'fields': ('name', 'start_date', 'start_time', 'end_date', 'end_time', 'targetface', 'distance', 'info',)
         }),
         ('Extra Information', {
             'classes': ['collapse'],
@@ -641,11 +730,11 @@ class RoundAdmin(admin.ModelAdmin):
 
 @admin.action(description="Activate selected Round Memberships")
 def activate_round_memberships(modeladmin, request, queryset):
-    queryset.update(is_active=True)
+    set_active(queryset, True)
 
 @admin.action(description="Deactivate selected Round Memberships")
 def deactivate_round_memberships(modeladmin, request, queryset):
-    queryset.update(is_active=False)
+    set_active(queryset, False)
 
 @admin.register(RoundMembership)
 class RoundMembershipAdmin(admin.ModelAdmin):
@@ -714,11 +803,11 @@ class ScoreAdmin(admin.ModelAdmin):
 
 @admin.action(description="Activate selected Competitions")
 def activate_competitions(modeladmin, request, queryset):
-    queryset.update(is_active=True)
+    set_active(queryset, True)
 
 @admin.action(description="Deactivate selected Competitions")
 def deactivate_competitions(modeladmin, request, queryset):
-    queryset.update(is_active=False)
+    set_active(queryset, False)
 
 class CompetitionMembershipInline(admin.TabularInline):
     model = CompetitionMembership
@@ -761,11 +850,11 @@ class CompetitionAdmin(admin.ModelAdmin):
 
 @admin.action(description="Activate selected Competition Memberships")
 def activate_competition_memberships(modeladmin, request, queryset):
-    queryset.update(is_active=True)
+    set_active(queryset, True)
 
 @admin.action(description="Deactivate selected Competition Memberships")
 def deactivate_competition_memberships(modeladmin, request, queryset):
-    queryset.update(is_active=False)
+    set_active(queryset, False)
 
 @admin.register(CompetitionMembership)
 class CompetitionMembershipAdmin(admin.ModelAdmin):
@@ -1329,6 +1418,8 @@ class RoundSnippetViewSet(SnippetViewSet):
         FieldPanel('start_time'),
         FieldPanel('end_date'),
         FieldPanel('end_time'),
+        FieldPanel('targetface'),
+        FieldPanel('distance'),
         FieldPanel('archers', widget=forms.CheckboxSelectMultiple),
         MultiFieldPanel(
             [
@@ -0,0 +1,85 @@
+"""
+Compact arrow values.
+
+Every arrow is stored as one byte: 0 is a miss, 1 to 10 the ring value and
+11 an X (an inner 10). An end is the ``bytes`` of its arrows, so a 6 arrow
+end takes 6 bytes and all figures of a score are derived with C level
+``bytes`` operations (``translate``, ``count``, ``sum``) on the joined ends
+instead of parsing table cells one by one.
+"""
+from django.db import transaction
+
+from .models import Score, ScoreEnd
+
+ARROW_MISS = 0
+ARROW_TEN = 10
+ARROW_X = 11
+
+LABELS = {ARROW_MISS: 'M', ARROW_X: 'X', **{value: str(value) for value in range(1, 11)}}
+VALUES = {label: value for value, label in LABELS.items()}
+
+# byte -> points, an X counts as 10. Unused byte values map to 0 and are
+# rejected by ``pack_arrows`` before they can reach the database.
+POINTS = bytes(min(value, ARROW_TEN) if value <= ARROW_X else 0 for value in range(256))
+
+
+def parse_arrow(value):
+    """
+    Return the byte value of an arrow given as a label (``'X'``, ``'10'``,
+    ``'m'``) or an integer 0-11.
+    """
+    if isinstance(value, int) and not isinstance(value, bool):
+        if ARROW_MISS <= value <= ARROW_X:
+            return value
+    elif isinstance(value, str):
+        label = value.strip().upper()
+        if label in VALUES:
+            return VALUES[label]
+    raise ValueError(f"Invalid arrow value: {value!r}")
+
+
+def pack_arrows(values):
+    return bytes(parse_arrow(value) for value in values)
+
+
+def unpack_arrows(data):
+    return [LABELS[value] for value in bytes(data)]
+
+
+def end_total(data):
+    return sum(bytes(data).translate(POINTS))
+
+
+def summarize_ends(ends):
+    """
+    Return the totals of a sequence of packed ends: ``score``,
+    ``number_of_arrows``, ``tens`` (Xs included), ``xs`` and ``end_totals``.
+    """
+    ends = [bytes(end) for end in ends]
+    arrows = b''.join(ends)
+    xs = arrows.count(ARROW_X)
+    return {
+        'score': sum(arrows.translate(POINTS)),
+        'number_of_arrows': len(arrows),
+        'tens': arrows.count(ARROW_TEN) + xs,
+        'xs': xs,
+        'end_totals': [sum(end.translate(POINTS)) for end in ends],
+    }
+
+
+def update_score_from_ends(score_id):
+    """
+    Recompute the denormalized totals of a score from its ends. Saving the
+    score also brings its leaderboards up to date.
+    """
+    with transaction.atomic():
+        score = Score.all_objects.select_for_update().filter(pk=score_id).first()
+        if score is None:
+            return None
+        totals = summarize_ends(
+            ScoreEnd.objects.filter(score_id=score_id).values_list('arrows', flat=True)
+        )
+        for field in ('score', 'number_of_arrows', 'tens', 'xs'):
+            setattr(score, field, totals[field])
+        score.save(update_fields=['score', 'number_of_arrows', 'tens', 'xs', 'modified_at'])
+    return score
@@ -0,0 +1,268 @@
+"""
+Tiered cache backend: a per-process LRU in front of a shared cache.
+
+Every read of the shared cache (the database cache table, Redis, ...) costs a
+round trip. ``TieredCache`` keeps recently used values in memory for at most
+``LOCAL_TIMEOUT`` seconds, which bounds how long a write made by another
+process goes unseen here; writes made by this process are seen at once.
+``LOCATION`` names the shared cache alias::
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'scoring.cache.TieredCache',
+            'LOCATION': 'shared',
+            'OPTIONS': {'MAX_ENTRIES': 1000, 'LOCAL_TIMEOUT': 1},
+        },
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'scoring_cache',
+        },
+    }
+
+``get_or_set`` recomputes a missing value once: one thread per process
+loads it while the others wait, and a lock key added to the shared cache
+keeps other processes waiting for the value instead of loading it too.
+
+Hits, misses and loads are counted per key prefix, the first
+``METRICS_DEPTH`` colon separated parts of the key, see :func:`get_stats`.
+"""
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+MISSING = object()
+EVENTS = ('local_hits', 'shared_hits', 'misses', 'loads', 'waits', 'sets', 'deletes')
+
+
+class LocalStore:
+    """
+    The values, counters and single-flight locks of one tiered cache, shared
+    by the threads of a process (Django creates a backend per thread).
+    """
+    def __init__(self):
+        self.values = OrderedDict()
+        self.counters = Counter()
+        self.flights = {}
+        self.lock = threading.Lock()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(name):
+    with _stores_lock:
+        return _stores.setdefault(name, LocalStore())
+
+
+class TieredCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = location or 'shared'
+        self.local_timeout = float(options.get('LOCAL_TIMEOUT', 1))
+        self.lock_timeout = int(options.get('LOCK_TIMEOUT', 30))
+        self.lock_wait = float(options.get('LOCK_WAIT', 5))
+        self.metrics_depth = int(options.get('METRICS_DEPTH', 3))
+        shared_settings = caches.settings[self.shared_alias]
+        self.store = get_store(
+            f"{self.shared_alias}:{shared_settings['BACKEND']}:{shared_settings.get('LOCATION', '')}"
+        )
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def prefix(self, key):
+        return ':'.join(str(key).split(':')[:self.metrics_depth])
+
+    def count(self, key, event):
+        with self.store.lock:
+            self.store.counters[(self.prefix(key), event)] += 1
+
+    # Local layer
+
+    def local_get(self, key, version):
+        local_key = self.make_and_validate_key(key, version)
+        with self.store.lock:
+            entry = self.store.values.get(local_key)
+            if entry is None:
+                return MISSING
+            if entry[0] <= time.monotonic():
+                del self.store.values[local_key]
+                return MISSING
+            self.store.values.move_to_end(local_key)
+            return entry[1]
+
+    def local_set(self, key, value, timeout, version):
+        local_key = self.make_and_validate_key(key, version)
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        ttl = self.local_timeout if timeout is None else min(self.local_timeout, timeout)
+        with self.store.lock:
+            if ttl <= 0:
+                self.store.values.pop(local_key, None)
+                return
+            self.store.values[local_key] = (time.monotonic() + ttl, value)
+            self.store.values.move_to_end(local_key)
+            while len(self.store.values) > self._max_entries:
+                self.store.values.popitem(last=False)
+
+    def local_delete(self, key, version):
+        with self.store.lock:
+            self.store.values.pop(self.make_and_validate_key(key, version), None)
+
+    def lookup(self, key, version):
+        """
+        Return ``(value, event)`` from the local layer or the shared cache,
+        copying shared hits into the local layer.
+        """
+        value = self.local_get(key, version)
+        if value is not MISSING:
+            return value, 'local_hits'
+        value = self.shared.get(key, MISSING, version=version)
+        if value is MISSING:
+            return MISSING, 'misses'
+        # The shared cache keeps its own expiry, hold the copy for LOCAL_TIMEOUT
+        self.local_set(key, value, None, version)
+        return value, 'shared_hits'
+
+    # Cache API
+
+    def get(self, key, default=None, version=None):
+        value, event = self.lookup(key, version)
+        self.count(key, event)
+        return default if value is MISSING else value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        self.local_set(key, value, timeout, version)
+        self.count(key, 'sets')
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if not self.shared.add(key, value, timeout, version=version):
+            return False
+        self.local_set(key, value, timeout, version)
+        self.count(key, 'sets')
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self.local_delete(key, version)
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self.local_delete(key, version)
+        self.count(key, 'deletes')
+        return self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        for key in keys:
+            self.local_delete(key, version)
+            self.count(key, 'deletes')
+        self.shared.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None):
+        if self.local_get(key, version) is not MISSING:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self.local_delete(key, version)
+        return self.shared.incr(key, delta, version=version)
+
+    def clear(self):
+        self.clear_local()
+        self.shared.clear()
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        """
+        Return the cached value of ``key`` or compute it with ``default()``,
+        once for all threads and processes asking at the same time. A
+        ``None`` result is returned but not cached.
+        """
+        value = self.get(key, MISSING, version)
+        if value is not MISSING:
+            return value
+        if not callable(default):
+            self.add(key, default, timeout, version)
+            return self.get(key, default, version)
+
+        with self.store.lock:
+            flight = self.store.flights.setdefault(key, [threading.Lock(), 0])
+            flight[1] += 1
+        try:
+            with flight[0]:
+                # Filled by the thread that held the lock before us
+                value, _event = self.lookup(key, version)
+                if value is not MISSING:
+                    return value
+                return self.load(key, default, timeout, version)
+        finally:
+            with self.store.lock:
+                flight[1] -= 1
+                if not flight[1]:
+                    self.store.flights.pop(key, None)
+
+    def load(self, key, default, timeout, version):
+        lock_key = f'{key}:lock'
+        locked = self.shared.add(lock_key, 1, self.lock_timeout, version=version)
+        if not locked:
+            value = self.wait(key, version)
+            if value is not MISSING:
+                return value
+            # The other process is too slow or died, load it anyway
+        try:
+            value = default()
+            self.count(key, 'loads')
+            if value is not None:
+                self.set(key, value, timeout, version)
+            return value
+        finally:
+            if locked:
+                self.shared.delete(lock_key, version=version)
+
+    def wait(self, key, version):
+        self.count(key, 'waits')
+        deadline = time.monotonic() + self.lock_wait
+        delay = 0.01
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            value = self.shared.get(key, MISSING, version=version)
+            if value is not MISSING:
+                self.local_set(key, value, None, version)
+                return value
+            delay = min(delay * 2, 0.2)
+        return MISSING
+
+    # Introspection
+
+    def clear_local(self):
+        with self.store.lock:
+            self.store.values.clear()
+
+    def reset_stats(self):
+        with self.store.lock:
+            self.store.counters.clear()
+
+    def get_stats(self):
+        """
+        ``{prefix: {event: count}}`` of this process.
+        """
+        with self.store.lock:
+            snapshot = dict(self.store.counters)
+            entries = len(self.store.values)
+        stats = {}
+        for (prefix, event), total in sorted(snapshot.items()):
+            stats.setdefault(prefix, dict.fromkeys(EVENTS, 0))[event] = total
+        return {'local_entries': entries, 'prefixes': stats}
+
+
+def get_stats(alias='default'):
+    backend = caches[alias]
+    if isinstance(backend, TieredCache):
+        return backend.get_stats()
+    return {}
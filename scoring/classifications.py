@@ -0,0 +1,203 @@
+"""
+Classifications.
+
+A ``Classification`` of a category (e.g. "Bowman") is earned in a season
+with ``qualifying_scores`` scores of at most ``max_handicap`` each, shot
+on any round with a known definition (see :mod:`scoring.handicaps`). The
+best classification an archer holds in a category is kept on the
+``CategoryMembership`` together with the season it was earned in.
+
+A season starts on the first of ``SCORING_SEASON_START_MONTH`` and is named
+after the year it starts in. A score belongs to the season of its round's
+start date, or of the day it was made when the round has none.
+
+Evaluating an archer is one pass over their season's scores: new scores
+update their archers as they are saved or ingested
+(:func:`update_round_archers`), a whole season is rebuilt in chunks of
+archers, in parallel processes when asked (:func:`rebuild_season`).
+"""
+import datetime
+import multiprocessing
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+
+from . import handicaps, reference
+from .models import CategoryMembership, Classification, RoundMembership, Score
+from .summaries import invalidate_summary
+
+CHUNK_SIZE = 500
+
+
+def get_season(value=None):
+    """
+    The season of a date or datetime (default: today).
+    """
+    if value is None:
+        value = timezone.localdate()
+    elif isinstance(value, datetime.datetime):
+        value = timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    start_month = getattr(settings, 'SCORING_SEASON_START_MONTH', 1)
+    return value.year if value.month >= start_month else value.year - 1
+
+
+def season_range(season):
+    """
+    The first day of ``season`` and the first day of the next one.
+    """
+    start_month = getattr(settings, 'SCORING_SEASON_START_MONTH', 1)
+    return datetime.date(season, start_month, 1), datetime.date(season + 1, start_month, 1)
+
+
+def season_filter(season, prefix=''):
+    """
+    ``Q`` of the scores of ``season``, with ``prefix`` the lookup path from
+    the queried model to ``Score``.
+    """
+    start, end = season_range(season)
+    start_date = f'{prefix}round_archer__round__start_date'
+    current_timezone = timezone.get_current_timezone()
+    return Q(**{f'{start_date}__gte': start, f'{start_date}__lt': end}) | Q(**{
+        f'{start_date}__isnull': True,
+        f'{prefix}created_at__gte': datetime.datetime.combine(start, datetime.time.min, current_timezone),
+        f'{prefix}created_at__lt': datetime.datetime.combine(end, datetime.time.min, current_timezone),
+    })
+
+
+def get_season_handicaps(archer_ids, season):
+    """
+    The handicaps of the active scores of ``archer_ids`` in ``season``, best
+    first, by archer. Scores on rounds without a definition are left out.
+    """
+    results = {archer_id: [] for archer_id in archer_ids}
+    scores = Score.objects.filter(round_archer__archer_id__in=archer_ids).filter(season_filter(season))
+    for row in handicaps.get_score_rows(scores.order_by()):
+        if row['handicap'] is not None:
+            results[row['archer']].append(row['handicap'])
+    for values in results.values():
+        values.sort()
+    return results
+
+
+def best_classification(levels, agegroup_id, season_handicaps):
+    """
+    The best of ``levels`` (ordered by ``max_handicap``) that
+    ``season_handicaps`` (sorted) qualify for, ``None`` when there is none.
+    """
+    for level in levels:
+        if level.agegroup_id not in (None, agegroup_id):
+            continue
+        count = level.qualifying_scores
+        if len(season_handicaps) >= count and season_handicaps[count - 1] <= level.max_handicap:
+            return level
+    return None
+
+
+def _evaluate(archer_ids, season):
+    now = timezone.now()
+    memberships = list(CategoryMembership.all_objects.filter(
+        archer_id__in=archer_ids, is_active=True,
+    ).only('id', 'archer_id', 'category_id', 'agegroup_id', 'classification_id', 'classification_season'))
+    if not memberships:
+        return 0
+    levels = {}
+    for level in Classification.objects.filter(category_id__in={m.category_id for m in memberships}):
+        levels.setdefault(level.category_id, []).append(level)
+    season_handicaps = get_season_handicaps({m.archer_id for m in memberships}, season)
+
+    changed = []
+    for membership in memberships:
+        level = best_classification(
+            levels.get(membership.category_id, []), membership.agegroup_id, season_handicaps[membership.archer_id],
+        )
+        level_id = level.pk if level is not None else None
+        stored = membership.classification_season
+        if stored is not None and stored > season:
+            # A later season has already been evaluated
+            continue
+        if stored == season:
+            if level_id == membership.classification_id:
+                continue
+        elif level is None:
+            # The classification of an earlier season stands until a new one is earned
+            continue
+        membership.classification_id = level_id
+        membership.classification_season = season
+        membership.modified_at = now
+        changed.append(membership)
+    CategoryMembership.all_objects.bulk_update(
+        changed, ['classification', 'classification_season', 'modified_at'], batch_size=CHUNK_SIZE,
+    )
+    return len(changed)
+
+
+def invalidate():
+    invalidate_summary(CategoryMembership)
+    reference.invalidate(CategoryMembership)
+
+
+def evaluate(archer_ids, season=None):
+    """
+    Evaluate the category memberships of ``archer_ids`` for ``season``
+    (default: the current one) and store the classifications that changed.
+    Returns the number of memberships updated.
+    """
+    if season is None:
+        season = get_season()
+    archer_ids = list(set(archer_ids))
+    updated = 0
+    for start in range(0, len(archer_ids), CHUNK_SIZE):
+        updated += _evaluate(archer_ids[start:start + CHUNK_SIZE], season)
+    if updated:
+        invalidate()
+    return updated
+
+
+def update_round_archers(round_archer_ids, default_date=None):
+    """
+    Evaluate the archers of ``round_archer_ids`` in the season of each
+    round; a round without a start date counts as shot on ``default_date``
+    (default: today).
+    """
+    round_archer_ids = list(set(round_archer_ids))
+    by_season = {}
+    for start in range(0, len(round_archer_ids), CHUNK_SIZE):
+        rows = RoundMembership.all_objects.filter(
+            pk__in=round_archer_ids[start:start + CHUNK_SIZE],
+        ).values_list('archer_id', 'round__start_date')
+        for archer_id, start_date in rows:
+            by_season.setdefault(get_season(start_date or default_date), set()).add(archer_id)
+    return sum(evaluate(archer_ids, season) for season, archer_ids in sorted(by_season.items()))
+
+
+def _evaluate_chunk(args):
+    archer_ids, season = args
+    return _evaluate(archer_ids, season)
+
+
+def rebuild_season(season=None, workers=1, chunk_size=CHUNK_SIZE):
+    """
+    Evaluate every archer with an active category membership for ``season``,
+    ``chunk_size`` archers at a time, spread over ``workers`` forked
+    processes. Returns the number of memberships updated.
+    """
+    if season is None:
+        season = get_season()
+    archer_ids = list(CategoryMembership.all_objects.filter(
+        is_active=True,
+    ).order_by('archer_id').values_list('archer_id', flat=True).distinct())
+    chunks = [(archer_ids[start:start + chunk_size], season) for start in range(0, len(archer_ids), chunk_size)]
+    if workers > 1 and len(chunks) > 1:
+        context = multiprocessing.get_context('fork')
+        # Children must open their own connections
+        connections.close_all()
+        with context.Pool(min(workers, len(chunks))) as pool:
+            updated = sum(pool.imap_unordered(_evaluate_chunk, chunks))
+    else:
+        updated = sum(_evaluate_chunk(chunk) for chunk in chunks)
+    # Caches are invalidated once, by the parent
+    if updated:
+        invalidate()
+    return updated
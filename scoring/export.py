@@ -0,0 +1,249 @@
+"""
+Streaming exports of archers, club memberships, round registrations and
+scores as CSV, NDJSON or XLSX.
+
+Rows are read with ``values_list(...).iterator(chunk_size=CHUNK_SIZE)`` and
+written one at a time, so memory stays flat whatever the number of rows.
+XLSX is built by openpyxl's write-only workbook in a temporary file and
+streamed from there.
+"""
+import csv
+import datetime
+import json
+import tempfile
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_date
+
+from .ingest import parse_uuid
+from .models import Archer, ClubMembership, CompetitionMembership, RoundMembership, Score
+
+try:
+    import openpyxl
+except ImportError:  # openpyxl is only needed for XLSX exports
+    openpyxl = None
+
+CHUNK_SIZE = 2000
+FILE_CHUNK_SIZE = 64 * 1024
+
+ARCHER_COLUMNS = [
+    ('archer_id', 'archer_id'),
+    ('union_number', 'archer__union_number'),
+    ('last_name', 'archer__last_name'),
+    ('first_name', 'archer__first_name'),
+]
+
+# Export name -> model, (header, lookup) columns and the lookups the filters
+# use: the archer, the round (None: through the archer's registrations) and
+# the date of the date range filter.
+EXPORTS = {
+    'archers': {
+        'model': Archer,
+        'columns': [
+            ('id', 'id'),
+            ('union_number', 'union_number'),
+            ('last_name', 'last_name'),
+            ('first_name', 'first_name'),
+            ('middle_name', 'middle_name'),
+            ('birth_date', 'birth_date'),
+            ('email', 'email'),
+            ('phone', 'phone'),
+            ('address', 'address'),
+            ('zip_code', 'zip_code'),
+            ('city', 'city'),
+            ('province', 'province'),
+            ('is_active', 'is_active'),
+            ('created_at', 'created_at'),
+            ('modified_at', 'modified_at'),
+        ],
+        'archer': 'id',
+        'round': None,
+        'date': 'modified_at',
+    },
+    'clubmemberships': {
+        'model': ClubMembership,
+        'columns': [
+            ('id', 'id'),
+            ('club_id', 'club_id'),
+            ('club', 'club__name'),
+            *ARCHER_COLUMNS,
+            ('start_date', 'start_date'),
+            ('end_date', 'end_date'),
+            ('is_active', 'is_active'),
+        ],
+        'archer': 'archer_id',
+        'round': None,
+        'date': 'start_date',
+    },
+    'registrations': {
+        'model': RoundMembership,
+        'columns': [
+            ('id', 'id'),
+            ('round_id', 'round_id'),
+            ('round', 'round__name'),
+            ('round_date', 'round__start_date'),
+            *ARCHER_COLUMNS,
+            ('is_active', 'is_active'),
+        ],
+        'archer': 'archer_id',
+        'round': 'round_id',
+        'date': 'round__start_date',
+    },
+    'scores': {
+        'model': Score,
+        'columns': [
+            ('id', 'id'),
+            ('round_id', 'round_archer__round_id'),
+            ('round', 'round_archer__round__name'),
+            ('round_date', 'round_archer__round__start_date'),
+            *[(header, 'round_archer__' + lookup) for header, lookup in ARCHER_COLUMNS],
+            ('score', 'score'),
+            ('number_of_arrows', 'number_of_arrows'),
+            ('tens', 'tens'),
+            ('xs', 'xs'),
+            ('is_active', 'is_active'),
+            ('created_at', 'created_at'),
+            ('modified_at', 'modified_at'),
+        ],
+        'archer': 'round_archer__archer_id',
+        'round': 'round_archer__round_id',
+        'date': 'round_archer__round__start_date',
+    },
+}
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def clean_filters(params):
+    """
+    Turn ``competition``, ``round``, ``club`` (ids) and ``from``/``to``
+    (``YYYY-MM-DD``) strings into :func:`get_queryset` arguments. Returns
+    ``(filters, errors)``.
+    """
+    filters = {}
+    errors = {}
+    for name in ('competition', 'round', 'club'):
+        if params.get(name):
+            filters[name] = parse_uuid(params[name])
+            if filters[name] is None:
+                errors[name] = ["Must be a valid UUID."]
+    for name, argument in (('from', 'date_from'), ('to', 'date_to')):
+        if params.get(name):
+            try:
+                filters[argument] = parse_date(params[name])
+            except ValueError:
+                filters[argument] = None
+            if filters[argument] is None:
+                errors[name] = ["Date has wrong format. Use YYYY-MM-DD."]
+    return filters, errors
+
+
+def get_queryset(name, competition=None, round=None, club=None, date_from=None, date_to=None, include_inactive=False):
+    """
+    The rows of export ``name``, filtered by the ids of a competition, round
+    or club and an inclusive date range. Memberships are matched through
+    subqueries on their active rows, so no row comes out twice.
+    """
+    spec = EXPORTS[name]
+    model = spec['model']
+    queryset = (model.all_objects if include_inactive else model.objects).all()
+
+    if club is not None:
+        queryset = queryset.filter(**{
+            f"{spec['archer']}__in": ClubMembership.objects.filter(club_id=club).values('archer_id'),
+        })
+
+    rounds = None
+    if round is not None:
+        rounds = [round]
+    if competition is not None:
+        in_competition = CompetitionMembership.objects.filter(competition_id=competition).values('round_id')
+        rounds = in_competition.filter(round_id__in=rounds) if rounds is not None else in_competition
+    if rounds is not None:
+        if spec['round'] is not None:
+            queryset = queryset.filter(**{f"{spec['round']}__in": rounds})
+        else:
+            queryset = queryset.filter(**{
+                f"{spec['archer']}__in": RoundMembership.objects.filter(round_id__in=rounds).values('archer_id'),
+            })
+
+    date_lookup = spec['date']
+    if model._meta.get_field(date_lookup.split('__')[0]).get_internal_type() == 'DateTimeField':
+        date_lookup += '__date'
+    if date_from is not None:
+        queryset = queryset.filter(**{f'{date_lookup}__gte': date_from})
+    if date_to is not None:
+        queryset = queryset.filter(**{f'{date_lookup}__lte': date_to})
+    return queryset.order_by('pk')
+
+
+def get_headers(name):
+    return [header for header, _lookup in EXPORTS[name]['columns']]
+
+
+def iter_rows(name, queryset):
+    lookups = [lookup for _header, lookup in EXPORTS[name]['columns']]
+    return queryset.values_list(*lookups).iterator(chunk_size=CHUNK_SIZE)
+
+
+class Echo:
+    """
+    A file for ``csv.writer`` that hands every written line back.
+    """
+    def write(self, value):
+        return value
+
+
+def write_csv(headers, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_ndjson(headers, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(headers, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+def xlsx_value(value):
+    if isinstance(value, datetime.datetime) and value.tzinfo is not None:
+        # Excel has no time zones
+        return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    if isinstance(value, (str, int, float, bool, datetime.date, datetime.time)) or value is None:
+        return value
+    return str(value)
+
+
+def write_xlsx(headers, rows, sheet_title='export'):
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_title)
+    sheet.append(headers)
+    for row in rows:
+        sheet.append([xlsx_value(value) for value in row])
+    with tempfile.TemporaryFile() as output:
+        workbook.save(output)
+        output.seek(0)
+        while chunk := output.read(FILE_CHUNK_SIZE):
+            yield chunk
+
+
+def write_export(name, file_format, queryset):
+    """
+    Yield export ``name`` of ``queryset`` as ``file_format``, in pieces.
+    """
+    headers = get_headers(name)
+    rows = iter_rows(name, queryset)
+    if file_format == 'csv':
+        return write_csv(headers, rows)
+    if file_format == 'ndjson':
+        return write_ndjson(headers, rows)
+    if file_format == 'xlsx':
+        if openpyxl is None:
+            raise ValueError("XLSX exports need openpyxl, pip install openpyxl.")
+        return write_xlsx(headers, rows, sheet_title=name)
+    raise ValueError(f"Unknown format: {file_format}")
@@ -0,0 +1,205 @@
+"""
+Archery handicaps.
+
+A handicap (0 best, 150 worst) stands for a spread of arrows: the angular
+error of an archer of handicap ``h`` follows the Archery GB model
+
+    sigma_t = ANGLE_0 * (1 + STEP / 100) ** (h + DATUM) * exp(KD * d)
+
+at distance ``d`` metres, so the radial spread on the face is
+``sigma = d * sigma_t``. An arrow lands inside radius ``R`` with probability
+``1 - exp(-(R + r_arrow) ** 2 / sigma ** 2)``, which gives the expected
+points per arrow of every handicap on a face of known rings.
+
+A round definition is the face (discipline, zones, size), the environment
+(arrow size) and the distance of a ``Round``. Its table of the 151 expected
+arrow averages is computed once, with NumPy in one vectorized pass when it
+is installed, and cached per process. A score is turned into a handicap by
+a binary search of its arrow average in the table: the handicap is the best
+one whose expected score the score reaches.
+"""
+import bisect
+import math
+import re
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:  # numpy builds the tables and converts scores in bulk, math and bisect do it one by one
+    np = None
+
+MAX_HANDICAP = 150
+
+# Archery GB 2023 model constants
+ANGLE_0 = 5.0e-4
+STEP = 3.5
+DATUM = 6.0
+KD = 0.00365
+
+# Arrow diameter in metres per environment
+ARROW_DIAMETERS = {
+    'Indoor': 9.3e-3,
+    'Outdoor': 5.5e-3,
+}
+
+# (discipline, key feature) -> rings from the centre out as (radius as part
+# of the face diameter, points lost outside it). The points add up to the
+# best arrow of scoring.validation.MAX_ARROW_POINTS.
+TEN_ZONE = tuple((ring / 20, 1) for ring in range(1, 11))
+FACE_RINGS = {
+    ('Target Archery', '5-Zone'): tuple((ring / 10, 2) for ring in range(1, 5)) + ((0.5, 1),),
+    ('Target Archery', '6-Zone'): tuple((ring / 20, 1) for ring in range(1, 6)) + ((0.3, 5),),
+    ('Target Archery', '10-Zone'): TEN_ZONE,
+    ('Field Archery', '5-Zone'): tuple((ring / 10, 1) for ring in range(1, 6)),
+    ('Field Archery', '6-Zone'): ((0.05, 1),) + tuple((ring / 10, 1) for ring in range(1, 6)),
+    ('Field Archery', '10-Zone'): TEN_ZONE,
+}
+
+# The distance in metres a face size is usually shot at, for rounds without
+# a distance of their own.
+DEFAULT_DISTANCES = {
+    122: 70,
+    80: 50,
+    65: 40,
+    60: 25,
+    50: 30,
+    40: 18,
+    35: 20,
+    30: 15,
+    20: 10,
+}
+
+# Lookups of the round definition, from a Round
+DEFINITION_LOOKUPS = (
+    'targetface__discipline',
+    'targetface__keyfeature',
+    'targetface__targetsize',
+    'targetface__environment',
+    'distance',
+)
+
+
+def parse_target_size(value):
+    """
+    The diameter in centimetres of a ``TargetFaceNameChoice.targetsize``
+    such as ``'122 cm'``.
+    """
+    match = re.match(r'\s*(\d+)\s*cm', value or '')
+    return int(match.group(1)) if match else None
+
+
+def get_definition(discipline, keyfeature, targetsize, environment, distance=None):
+    """
+    The round definition ``(rings, diameter in metres, distance in metres,
+    arrow radius in metres)`` of a target face and distance, ``None`` when
+    the face is unknown.
+    """
+    rings = FACE_RINGS.get((discipline, keyfeature))
+    size = parse_target_size(targetsize)
+    if rings is None or size is None:
+        return None
+    distance = distance or DEFAULT_DISTANCES.get(size)
+    if not distance:
+        return None
+    arrow_radius = ARROW_DIAMETERS.get(environment, ARROW_DIAMETERS['Outdoor']) / 2
+    return rings, size / 100, distance, arrow_radius
+
+
+def get_round_definition(round):
+    targetface = round.targetface
+    if targetface is None:
+        return None
+    return get_definition(
+        targetface.discipline, targetface.keyfeature, targetface.targetsize, targetface.environment, round.distance,
+    )
+
+
+def sigma(handicap, distance):
+    return distance * ANGLE_0 * (1 + STEP / 100) ** (handicap + DATUM) * math.exp(KD * distance)
+
+
+class HandicapTable:
+    """
+    The expected points per arrow of every handicap for one round definition.
+    ``averages`` falls from handicap 0 to ``MAX_HANDICAP``.
+    """
+    def __init__(self, definition):
+        rings, diameter, distance, arrow_radius = definition
+        self.max_points = sum(points for _radius, points in rings)
+        if np is not None:
+            handicaps = np.arange(MAX_HANDICAP + 1, dtype=float)
+            sigmas = distance * ANGLE_0 * (1 + STEP / 100) ** (handicaps + DATUM) * math.exp(KD * distance)
+            radii = np.array([radius for radius, _points in rings]) * diameter + arrow_radius
+            points = np.array([points for _radius, points in rings], dtype=float)
+            missed = np.exp(-(radii[np.newaxis, :] ** 2) / sigmas[:, np.newaxis] ** 2)
+            self.array = self.max_points - (missed * points).sum(axis=1)
+            self.averages = self.array.tolist()
+            # Ascending, for searchsorted
+            self.descending = -self.array
+        else:
+            self.array = None
+            self.averages = []
+            for handicap in range(MAX_HANDICAP + 1):
+                spread = sigma(handicap, distance)
+                self.averages.append(self.max_points - sum(
+                    points * math.exp(-((radius * diameter + arrow_radius) ** 2) / spread ** 2)
+                    for radius, points in rings
+                ))
+        self.negated = [-average for average in self.averages]
+
+    def expected_scores(self, number_of_arrows, digits=1):
+        return [round(average * number_of_arrows, digits) for average in self.averages]
+
+    def handicap(self, score, number_of_arrows):
+        """
+        The best handicap whose expected score ``score`` reaches, ``None``
+        without arrows.
+        """
+        if score is None or not number_of_arrows:
+            return None
+        index = bisect.bisect_left(self.negated, -score / number_of_arrows)
+        return min(index, MAX_HANDICAP)
+
+    def handicaps(self, scores, numbers_of_arrows):
+        """
+        :meth:`handicap` of many scores at once.
+        """
+        if self.array is None:
+            return [self.handicap(score, arrows) for score, arrows in zip(scores, numbers_of_arrows)]
+        scores = np.array([-1 if score is None else score for score in scores], dtype=float)
+        arrows = np.array(numbers_of_arrows, dtype=float)
+        valid = (scores >= 0) & (arrows > 0)
+        averages = np.divide(scores, arrows, out=np.zeros_like(scores), where=valid)
+        indexes = np.minimum(np.searchsorted(self.descending, -averages, side='left'), MAX_HANDICAP)
+        return [int(index) if ok else None for index, ok in zip(indexes, valid)]
+
+
+@lru_cache(maxsize=256)
+def get_table(definition):
+    return HandicapTable(definition)
+
+
+def get_score_rows(queryset):
+    """
+    Return ``{id, archer, round, score, number_of_arrows, handicap}`` for the
+    scores of ``queryset`` in its order. The scores of one round definition
+    are converted together.
+    """
+    prefix = 'round_archer__round__'
+    fields = ('id', 'archer', 'round', 'score', 'number_of_arrows')
+    lookups = ('id', 'round_archer__archer_id', 'round_archer__round_id', 'score', 'number_of_arrows')
+    results = []
+    groups = {}
+    for row in queryset.values_list(*lookups, *[prefix + lookup for lookup in DEFINITION_LOOKUPS]):
+        result = dict(zip(fields, row), handicap=None)
+        definition = get_definition(*row[len(lookups):])
+        if definition is not None:
+            groups.setdefault(definition, []).append(result)
+        results.append(result)
+    for definition, group in groups.items():
+        handicaps = get_table(definition).handicaps(
+            [result['score'] for result in group], [result['number_of_arrows'] for result in group],
+        )
+        for result, handicap in zip(group, handicaps):
+            result['handicap'] = handicap
+    return results
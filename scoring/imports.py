@@ -0,0 +1,400 @@
+"""
+Bulk imports of archers, clubs and club, category and round memberships
+from CSV or XLSX files.
+
+Files are read one row at a time and handled ``BATCH_SIZE`` rows at a time.
+Clubs, categories, age groups and rounds are looked up by name in dicts
+built once per import, archers by ``union_number`` once per batch, and each
+batch is written with one ``bulk_create`` and one ``bulk_update``; the slugs
+of new rows come from a ``SlugAllocator``. With ``dry_run`` nothing is
+written, the report tells which rows would be created or updated (with the
+changed values) and which are in conflict.
+
+Columns an import does not know are ignored, so the files of
+:mod:`scoring.export` can be imported again.
+"""
+import csv
+import io
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from . import classifications, reference
+from .ingest import BATCH_SIZE, chunked, refresh_leaderboards
+from .models import (
+    AgeGroup,
+    Archer,
+    Category,
+    CategoryMembership,
+    Club,
+    ClubMembership,
+    Round,
+    RoundMembership,
+    SortKeyModel,
+)
+from .slugs import SlugAllocator
+from .summaries import invalidate_summary
+
+try:
+    import openpyxl
+except ImportError:  # openpyxl is only needed for XLSX imports
+    openpyxl = None
+
+ARCHER_RELATION = ('archer', Archer, 'union_number', 'union_number')
+
+# Import name -> model, the field columns, the relations as (field, model,
+# lookup field, column) and the fields that find the existing row. Archers
+# are matched among all rows (union numbers are unique), the others among
+# the active rows.
+IMPORTS = {
+    'archers': {
+        'model': Archer,
+        'fields': [
+            'union_number', 'last_name', 'first_name', 'middle_name', 'birth_date', 'email', 'phone',
+            'address', 'city', 'zip_code', 'province', 'info', 'is_active',
+        ],
+        'relations': [],
+        'key': ['union_number'],
+        'all_rows': True,
+    },
+    'clubs': {
+        'model': Club,
+        'fields': ['name', 'address', 'zip_code', 'town', 'email', 'phone', 'website', 'social_media', 'info', 'is_active'],
+        'relations': [],
+        'key': ['name'],
+    },
+    'clubmemberships': {
+        'model': ClubMembership,
+        'fields': ['start_date', 'end_date', 'info'],
+        'relations': [('club', Club, 'name', 'club'), ARCHER_RELATION],
+        'key': ['club', 'archer'],
+    },
+    'categorymemberships': {
+        'model': CategoryMembership,
+        'fields': ['info'],
+        'relations': [
+            ('category', Category, 'name', 'category'),
+            ('agegroup', AgeGroup, 'name', 'agegroup'),
+            ARCHER_RELATION,
+        ],
+        'key': ['category', 'archer'],
+    },
+    'registrations': {
+        'model': RoundMembership,
+        'fields': ['info'],
+        'relations': [('round', Round, 'name', 'round'), ARCHER_RELATION],
+        'key': ['round', 'archer'],
+    },
+}
+
+FORMATS = ('csv', 'xlsx')
+
+BOOLEANS = {
+    'true': True, 'yes': True, '1': True, 't': True,
+    'false': False, 'no': False, '0': False, 'f': False,
+}
+
+
+def get_format(filename):
+    return 'xlsx' if str(filename).lower().endswith('.xlsx') else 'csv'
+
+
+def read_rows(file, file_format):
+    """
+    Yield ``(line, {column: value})`` for the rows of an open binary file,
+    the first row holding the column names.
+    """
+    if file_format == 'xlsx':
+        if openpyxl is None:
+            raise ValueError("XLSX imports need openpyxl, pip install openpyxl.")
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            headers = [str(header).strip() if header is not None else '' for header in next(rows, ())]
+            for line, row in enumerate(rows, start=2):
+                if any(value not in (None, '') for value in row):
+                    yield line, dict(zip(headers, row))
+        finally:
+            workbook.close()
+        return
+    if file_format != 'csv':
+        raise ValueError(f"Unknown format: {file_format}")
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        reader = csv.DictReader(text)
+        reader.fieldnames = [header.strip() for header in reader.fieldnames or []]
+        for row in reader:
+            if any(value not in (None, '') for value in row.values()):
+                yield reader.line_num, row
+    finally:
+        text.detach()
+
+
+def clean_value(field, value):
+    """
+    A cell as a value of the model ``field``; empty cells are ``None`` or
+    ``''``. Raises ``ValidationError``.
+    """
+    if isinstance(value, str):
+        value = value.strip()
+    if value is None or value == '':
+        value = None if field.null else ''
+    elif field.get_internal_type() == 'BooleanField' and isinstance(value, str):
+        value = BOOLEANS.get(value.lower(), value)
+    return field.clean(value, None)
+
+
+class BulkImporter:
+    """
+    Validate and upsert the rows of one import. ``run()`` returns the report:
+    the counts per status and one result per row, in file order. Rows with
+    errors or conflicts are reported and skipped, the others are written in
+    one transaction.
+    """
+    def __init__(self, name, author, dry_run=False, batch_size=BATCH_SIZE):
+        self.spec = IMPORTS[name]
+        self.model = self.spec['model']
+        self.author = author
+        self.dry_run = dry_run
+        self.batch_size = batch_size
+        self.names = {}
+        self.seen = {}
+        self.touched_archers = set()
+        self.slugs = SlugAllocator(self.model)
+        self.key_fields = [self.model._meta.get_field(name) for name in self.spec['key']]
+
+    def run(self, rows):
+        rows = iter(rows)
+        first = next(rows, None)
+        columns = [column for column in first[1] if column] if first is not None else []
+        self.check_columns(columns)
+        self.columns = [name for name in self.spec['fields'] if name in columns]
+        self.relations = [relation for relation in self.spec['relations'] if relation[3] in columns]
+        known = set(self.spec['fields']).union(relation[3] for relation in self.spec['relations'])
+
+        results = []
+        batch = [first] if first is not None else []
+        with transaction.atomic():
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    results += self.import_batch(batch)
+                    batch = []
+            if batch:
+                results += self.import_batch(batch)
+            if not self.dry_run:
+                self.finish(results)
+
+        counts = dict.fromkeys(('created', 'updated', 'unchanged', 'conflict', 'error'), 0)
+        for result in results:
+            counts[result['status']] += 1
+        return {
+            'dry_run': self.dry_run,
+            'created': counts['created'],
+            'updated': counts['updated'],
+            'unchanged': counts['unchanged'],
+            'conflicts': counts['conflict'],
+            'errors': counts['error'],
+            'ignored_columns': [column for column in columns if column not in known],
+            'results': results,
+        }
+
+    def check_columns(self, columns):
+        key_columns = {relation[0]: relation[3] for relation in self.spec['relations']}
+        missing = [key_columns.get(name, name) for name in self.spec['key'] if key_columns.get(name, name) not in columns]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    # Lookups
+
+    def get_names(self, model, lookup):
+        """
+        ``{lookup value: [rows]}`` of the active rows of a reference model,
+        loaded once per import.
+        """
+        if model not in self.names:
+            names = defaultdict(list)
+            for obj in model.objects.only('pk', lookup):
+                names[getattr(obj, lookup)].append(obj)
+            self.names[model] = names
+        return self.names[model]
+
+    def get_archers(self, rows):
+        """
+        ``{union_number: [archer]}`` of the active archers a batch refers to.
+        """
+        field = Archer._meta.get_field('union_number')
+        numbers = set()
+        for _line, row in rows:
+            try:
+                numbers.add(clean_value(field, row.get('union_number')))
+            except ValidationError:
+                pass
+        numbers.discard(None)
+        archers = defaultdict(list)
+        for chunk in chunked(numbers):
+            for archer in Archer.objects.filter(union_number__in=chunk).only('pk', 'union_number', 'last_name'):
+                archers[archer.union_number].append(archer)
+        return archers
+
+    def get_existing(self, keys):
+        manager = self.model.all_objects if self.spec.get('all_rows') else self.model.objects
+        existing = defaultdict(list)
+        for chunk in chunked(keys):
+            filters = {
+                f'{field.attname}__in': {key[index] for key in chunk}
+                for index, field in enumerate(self.key_fields)
+            }
+            for obj in manager.filter(**filters):
+                existing[tuple(getattr(obj, field.attname) for field in self.key_fields)].append(obj)
+        return existing
+
+    # Rows
+
+    def clean_row(self, row, archers):
+        """
+        Return ``(values, errors, conflicts)``, ``values`` keyed by field
+        name with related rows for the relations.
+        """
+        values = {}
+        errors = {}
+        conflicts = []
+        for name in self.columns:
+            try:
+                values[name] = clean_value(self.model._meta.get_field(name), row.get(name))
+            except ValidationError as exc:
+                errors[name] = exc.messages
+
+        for name, model, lookup, column in self.relations:
+            raw = row.get(column)
+            if raw is None or str(raw).strip() == '':
+                if self.model._meta.get_field(name).null:
+                    values[name] = None
+                else:
+                    errors[column] = ["This field is required."]
+                continue
+            try:
+                value = clean_value(model._meta.get_field(lookup), raw)
+            except ValidationError as exc:
+                errors[column] = exc.messages
+                continue
+            matches = archers.get(value, []) if model is Archer else self.get_names(model, lookup).get(value, [])
+            if not matches:
+                errors[column] = [f"No {model._meta.verbose_name} with {lookup} \"{value}\"."]
+            elif len(matches) > 1:
+                conflicts.append(f"{len(matches)} {model._meta.verbose_name_plural} with {lookup} \"{value}\".")
+            else:
+                values[name] = matches[0]
+        return values, errors, conflicts
+
+    def get_key(self, values):
+        key = []
+        for field in self.key_fields:
+            value = values.get(field.name)
+            if value is None:
+                return None
+            key.append(value.pk if field.is_relation else value)
+        return tuple(key)
+
+    def import_batch(self, rows):
+        archers = self.get_archers(rows) if ARCHER_RELATION in self.relations else {}
+        cleaned = []
+        for line, row in rows:
+            values, errors, conflicts = self.clean_row(row, archers)
+            cleaned.append((line, values, errors, conflicts, None if errors else self.get_key(values)))
+        existing = self.get_existing([key for *_row, key in cleaned if key is not None])
+
+        results = []
+        created = []
+        updated = []
+        for line, values, errors, conflicts, key in cleaned:
+            if errors:
+                results.append({'line': line, 'status': 'error', 'errors': errors})
+                continue
+            if key in self.seen:
+                conflicts.append(f"Same {', '.join(self.spec['key'])} as line {self.seen[key]}.")
+            elif len(existing.get(key, [])) > 1:
+                conflicts.append(f"{len(existing[key])} {self.model._meta.verbose_name_plural} match.")
+            if conflicts:
+                results.append({'line': line, 'status': 'conflict', 'conflicts': conflicts})
+                continue
+            self.seen[key] = line
+
+            if key in existing:
+                obj = existing[key][0]
+                changes = self.apply(obj, values)
+                if changes:
+                    updated.append(obj)
+                    results.append({'line': line, 'status': 'updated', 'id': obj.pk, 'changes': changes})
+                else:
+                    results.append({'line': line, 'status': 'unchanged', 'id': obj.pk})
+                continue
+
+            missing = [
+                field.name for field in self.model._meta.concrete_fields
+                if field.name in self.spec['fields'] and not field.blank and not field.has_default()
+                and values.get(field.name) in (None, '')
+            ]
+            if missing:
+                results.append({'line': line, 'status': 'error', 'errors': {
+                    name: ["This field is required."] for name in missing
+                }})
+                continue
+            obj = self.model(author=self.author, **values)
+            if isinstance(obj, SortKeyModel):
+                obj.sort_key = getattr(obj, self.model.sort_key_from).name
+            created.append(obj)
+            results.append({'line': line, 'status': 'created', 'id': obj.pk})
+
+        if not self.dry_run:
+            self.write(created, updated)
+        return results
+
+    def apply(self, obj, values):
+        """
+        Set the imported values on an existing row, returning the changes as
+        ``{field: [old, new]}`` (ids for relations).
+        """
+        changes = {}
+        for name, value in values.items():
+            field = self.model._meta.get_field(name)
+            if field.is_relation:
+                value = value.pk if value is not None else None
+            old = getattr(obj, field.attname)
+            if old != value:
+                changes[name] = [old, value]
+                setattr(obj, field.attname, value)
+        return changes
+
+    def write(self, created, updated):
+        self.slugs.assign(created)
+        self.model.objects.bulk_create(created, batch_size=self.batch_size)
+        if updated:
+            now = timezone.now()
+            for obj in updated:
+                obj.modified_at = now
+            fields = self.columns + [relation[0] for relation in self.relations if relation[0] not in self.spec['key']]
+            self.model.all_objects.bulk_update(updated, [*fields, 'modified_at'], batch_size=self.batch_size)
+        if self.model in (ClubMembership, CategoryMembership):
+            self.touched_archers.update(obj.archer_id for obj in [*created, *updated])
+
+    def finish(self, results):
+        if any(result['status'] in ('created', 'updated') for result in results):
+            invalidate_summary(self.model)
+            reference.invalidate(self.model)
+        if self.touched_archers:
+            # Club and category leaderboards of the rounds the archers shot
+            round_archer_ids = set()
+            for ids in chunked(self.touched_archers):
+                round_archer_ids.update(
+                    RoundMembership.all_objects.filter(archer_id__in=ids).values_list('pk', flat=True)
+                )
+            refresh_leaderboards(round_archer_ids)
+        if self.model is CategoryMembership and self.touched_archers:
+            classifications.evaluate(self.touched_archers)
+
+
+def import_file(name, file, file_format, author, dry_run=False):
+    return BulkImporter(name, author, dry_run=dry_run).run(read_rows(file, file_format))
@@ -0,0 +1,254 @@
+import uuid
+from functools import partial
+
+from django.db import transaction
+
+from . import classifications, leaderboard, live
+from .ids import uuid7
+from .models import CompetitionMembership, RoundMembership, Score
+from .summaries import invalidate_summary
+from .validation import check_score, get_limits
+
+# Rows per IN (...) lookup and per INSERT, below SQLite's bound variable limit.
+BATCH_SIZE = 500
+
+SCORE_FIELDS = ('round_archer', 'score', 'number_of_arrows', 'info', 'is_active', 'idempotency_key')
+
+
+def chunked(values, size=BATCH_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def parse_uuid(value):
+    if isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def parse_count(value, required=False):
+    if value is None and not required:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError("A positive integer is required.")
+    return value
+
+
+def clean_row(row, limits, existing=()):
+    """
+    Validate one incoming row against the round limits of
+    :func:`scoring.validation.get_limits` and the ids of the scores that
+    already exist. Return ``(values, errors)``; ``values`` holds model field
+    values keyed by attribute name.
+    """
+    if not isinstance(row, dict):
+        return None, {'non_field_errors': ["Expected an object."]}
+
+    errors = {}
+    values = {}
+    unknown = set(row).difference(SCORE_FIELDS + ('id',))
+    if unknown:
+        errors['non_field_errors'] = [f"Unknown field: {name}" for name in sorted(unknown)]
+
+    if row.get('id') is not None:
+        values['id'] = parse_uuid(row['id'])
+        if values['id'] is None:
+            errors['id'] = ["Must be a valid UUID."]
+
+    round_archer_id = parse_uuid(row.get('round_archer'))
+    if round_archer_id is None:
+        errors['round_archer'] = ["Must be a valid UUID."]
+    elif round_archer_id not in limits:
+        errors['round_archer'] = [f"Invalid pk \"{round_archer_id}\" - object does not exist."]
+    values['round_archer_id'] = round_archer_id
+
+    for name, required in (('score', False), ('number_of_arrows', True)):
+        try:
+            values[name] = parse_count(row.get(name, 0 if required else None), required)
+        except ValueError as exc:
+            errors[name] = [str(exc)]
+
+    info = row.get('info')
+    if info is not None and not isinstance(info, str):
+        errors['info'] = ["Not a valid string."]
+    values['info'] = info
+
+    idempotency_key = row.get('idempotency_key')
+    if idempotency_key is not None and (not isinstance(idempotency_key, str) or len(idempotency_key) > 64):
+        errors['idempotency_key'] = ["Not a valid string of at most 64 characters."]
+    values['idempotency_key'] = idempotency_key or None
+
+    is_active = row.get('is_active', True)
+    if not isinstance(is_active, bool):
+        errors['is_active'] = ["Must be a valid boolean."]
+    values['is_active'] = is_active
+
+    if not errors:
+        errors = check_score(
+            limits[round_archer_id],
+            score=values['score'],
+            number_of_arrows=values['number_of_arrows'],
+            adding=values.get('id') not in existing,
+        )
+    return values, errors
+
+
+def get_round_archer_limits(rows):
+    requested = {
+        parse_uuid(row.get('round_archer'))
+        for row in rows if isinstance(row, dict)
+    }
+    requested.discard(None)
+    return get_limits(requested)
+
+
+def get_existing(rows):
+    """
+    The stored values of the scores the rows name by ``id``, keyed by id and
+    in the form of an incoming row.
+    """
+    requested = {
+        parse_uuid(row.get('id'))
+        for row in rows if isinstance(row, dict) and row.get('id') is not None
+    }
+    requested.discard(None)
+    existing = {}
+    for ids in chunked(requested):
+        stored = Score.all_objects.filter(pk__in=ids).values_list(
+            'pk', 'round_archer_id', 'score', 'number_of_arrows', 'info', 'is_active',
+        )
+        for pk, round_archer_id, score, number_of_arrows, info, is_active in stored:
+            existing[pk] = {
+                'round_archer': str(round_archer_id) if round_archer_id is not None else None,
+                'score': score,
+                'number_of_arrows': number_of_arrows,
+                'info': info,
+                'is_active': is_active,
+            }
+    return existing
+
+
+def with_stored_values(row, existing):
+    # A resent score only changes the fields it carries
+    if isinstance(row, dict) and row.get('id') is not None:
+        stored = existing.get(parse_uuid(row['id']))
+        if stored is not None:
+            return {**stored, **row}
+    return row
+
+
+def get_replayed_keys(rows):
+    """
+    Map the idempotency keys of the batch that were already used to the id
+    of the score they created.
+    """
+    keys = {
+        row['idempotency_key'] for row in rows
+        if isinstance(row, dict) and isinstance(row.get('idempotency_key'), str)
+    }
+    replayed = {}
+    for chunk in chunked(keys):
+        replayed.update(
+            Score.all_objects.filter(idempotency_key__in=chunk).values_list('idempotency_key', 'pk')
+        )
+    return replayed
+
+
+def refresh_leaderboards(round_archer_ids):
+    """
+    Rebuild the round and competition leaderboards touched by a batch once,
+    instead of once per score as the model signals would.
+    """
+    round_ids = set()
+    for ids in chunked(round_archer_ids):
+        round_ids.update(RoundMembership.all_objects.filter(pk__in=ids).values_list('round_id', flat=True))
+    competition_ids = set()
+    for ids in chunked(round_ids):
+        competition_ids.update(
+            CompetitionMembership.all_objects.filter(round_id__in=ids).values_list('competition_id', flat=True)
+        )
+    for round_id in round_ids:
+        leaderboard.rebuild_round(round_id)
+    for competition_id in competition_ids:
+        leaderboard.rebuild_competition(competition_id)
+
+
+def ingest_scores(rows, author):
+    """
+    Validate and upsert a batch of scores in one transaction.
+
+    Rows are checked against the limits of their rounds (see
+    ``scoring.validation``) preloaded in a handful of queries, valid rows are written with a single
+    ``bulk_create(update_conflicts=True)`` per batch (rows carrying a known
+    ``id`` are updated, the fields they leave out keep their stored
+    values), invalid rows are reported and skipped and rows whose
+    ``idempotency_key`` was already used are replayed instead of inserted.
+    Returns one result per input row, in input order.
+    """
+    existing = get_existing(rows)
+    rows = [with_stored_values(row, existing) for row in rows]
+    limits = get_round_archer_limits(rows)
+    replayed = get_replayed_keys(rows)
+
+    results = []
+    scores = []
+    seen = set()
+    seen_keys = {}
+    for index, row in enumerate(rows):
+        values, errors = clean_row(row, limits, existing)
+        key = values.get('idempotency_key') if values else None
+        if key is not None and key in replayed:
+            results.append({'index': index, 'status': 'replayed', 'id': replayed[key]})
+            continue
+        if key is not None and key in seen_keys:
+            results.append({'index': index, 'status': 'replayed', 'id': seen_keys[key]})
+            continue
+        if values and values.get('id') in seen:
+            errors['id'] = ["Duplicate id in this batch."]
+        if errors:
+            results.append({'index': index, 'status': 'error', 'errors': errors})
+            continue
+        values.setdefault('id', uuid7())
+        seen.add(values['id'])
+        if key is not None:
+            seen_keys[key] = values['id']
+        scores.append(Score(author=author, **values))
+        results.append({'index': index, 'status': 'created', 'id': values['id']})
+
+    with transaction.atomic():
+        previous = {}
+        for ids in chunked(score.pk for score in scores):
+            previous.update(
+                (pk, (round_archer_id, version))
+                for pk, round_archer_id, version in Score.all_objects.filter(
+                    pk__in=ids,
+                ).values_list('pk', 'round_archer_id', 'version')
+            )
+        for score in scores:
+            if score.pk in previous:
+                score.version = previous[score.pk][1] + 1
+        Score.objects.bulk_create(
+            scores,
+            batch_size=BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['id'],
+            update_fields=[
+                'round_archer', 'score', 'number_of_arrows', 'info', 'is_active', 'version', 'modified_at',
+            ],
+        )
+        if scores:
+            invalidate_summary(Score)
+            touched = {score.round_archer_id for score in scores}
+            touched.update(round_archer_id for round_archer_id, _version in previous.values() if round_archer_id)
+            refresh_leaderboards(touched)
+            classifications.update_round_archers(touched)
+            transaction.on_commit(partial(live.publish_scores, scores))
+
+    for result in results:
+        if result['status'] == 'created' and result['id'] in previous:
+            result['status'] = 'updated'
+    return results
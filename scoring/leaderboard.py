@@ -0,0 +1,220 @@
+from django.db import transaction
+from django.db.models import Count, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import (
+    CategoryMembership,
+    ClubMembership,
+    CompetitionMembership,
+    LeaderboardEntry,
+    RoundMembership,
+    Score,
+    TeamMembership,
+)
+
+# Higher totals rank first, on equal totals more 10s, then more Xs and then
+# fewer arrows. Archers equal on all of them share the rank (1, 2, 2, 4).
+RANKING_ORDER = ('-total_score', '-total_tens', '-total_xs', 'total_arrows', 'archer_id')
+TIE_FIELDS = ('total_score', 'total_tens', 'total_xs', 'total_arrows')
+
+
+def round_scope(round_id):
+    return {'competition_id': None, 'round_id': round_id}
+
+
+def competition_scope(competition_id):
+    return {'competition_id': competition_id, 'round_id': None}
+
+
+def get_archer_groups(archer_id):
+    """
+    Return the ``(group_type, group_id)`` leaderboards an archer appears in,
+    starting with the overall one.
+    """
+    return get_groups_by_archer([archer_id])[archer_id]
+
+
+def get_groups_by_archer(archer_ids):
+    groups = {
+        archer_id: [(LeaderboardEntry.GROUP_OVERALL, None)]
+        for archer_id in archer_ids
+    }
+    categories = CategoryMembership.all_objects.filter(
+        archer_id__in=archer_ids, is_active=True,
+    ).values_list('archer_id', 'category_id', 'agegroup_id')
+    for archer_id, category_id, agegroup_id in categories:
+        groups[archer_id].append((LeaderboardEntry.GROUP_CATEGORY, category_id))
+        if agegroup_id is not None:
+            groups[archer_id].append((LeaderboardEntry.GROUP_AGEGROUP, agegroup_id))
+    clubs = ClubMembership.all_objects.filter(
+        archer_id__in=archer_ids, is_active=True,
+    ).values_list('archer_id', 'club_id')
+    for archer_id, club_id in clubs:
+        groups[archer_id].append((LeaderboardEntry.GROUP_CLUB, club_id))
+    teams = TeamMembership.all_objects.filter(
+        archer_id__in=archer_ids, is_active=True,
+    ).values_list('archer_id', 'team_id')
+    for archer_id, team_id in teams:
+        groups[archer_id].append((LeaderboardEntry.GROUP_TEAM, team_id))
+    return {
+        archer_id: list(dict.fromkeys(archer_groups))
+        for archer_id, archer_groups in groups.items()
+    }
+
+
+def get_scope_scores(scope):
+    scores = Score.objects.all()
+    if scope['round_id'] is not None:
+        return scores.filter(round_archer__round_id=scope['round_id'])
+    return scores.filter(
+        round_archer__round_id__in=CompetitionMembership.objects.filter(
+            competition_id=scope['competition_id'],
+        ).values('round_id'),
+    )
+
+
+def rerank(scope, group_type, group_id):
+    """
+    Recompute the ranks of one leaderboard, only writing rows whose rank
+    actually moved.
+    """
+    entries = LeaderboardEntry.objects.filter(
+        group_type=group_type, group_id=group_id, **scope,
+    ).order_by(*RANKING_ORDER).values_list('pk', 'rank', *TIE_FIELDS)
+
+    changed = []
+    rank = 0
+    previous = None
+    for position, (pk, current_rank, *totals) in enumerate(entries, start=1):
+        if totals != previous:
+            rank = position
+            previous = totals
+        if rank != current_rank:
+            changed.append(LeaderboardEntry(pk=pk, rank=rank))
+    LeaderboardEntry.objects.bulk_update(changed, ['rank'], batch_size=500)
+
+
+def refresh_archer(scope, archer_id, groups=None):
+    """
+    Recompute one archer's totals in every group leaderboard of ``scope`` and
+    rerank the leaderboards the archer entered, left or moved in.
+    """
+    if groups is None:
+        groups = get_archer_groups(archer_id)
+    totals = get_scope_scores(scope).filter(round_archer__archer_id=archer_id).aggregate(
+        total_score=Coalesce(Sum('score'), Value(0)),
+        total_arrows=Coalesce(Sum('number_of_arrows'), Value(0)),
+        total_tens=Coalesce(Sum('tens'), Value(0)),
+        total_xs=Coalesce(Sum('xs'), Value(0)),
+        number_of_scores=Count('pk'),
+    )
+
+    existing = LeaderboardEntry.objects.filter(archer_id=archer_id, **scope)
+    touched = set(existing.values_list('group_type', 'group_id'))
+    existing.delete()
+    if totals['number_of_scores']:
+        LeaderboardEntry.objects.bulk_create([
+            LeaderboardEntry(
+                archer_id=archer_id,
+                group_type=group_type,
+                group_id=group_id,
+                **scope,
+                **totals,
+            )
+            for group_type, group_id in groups
+        ])
+        touched.update(groups)
+
+    for group_type, group_id in touched:
+        rerank(scope, group_type, group_id)
+
+
+def update_round_archer(round_id, archer_id):
+    """
+    Bring the round leaderboards and the leaderboards of every competition
+    the round belongs to up to date for one archer.
+    """
+    groups = get_archer_groups(archer_id)
+    competition_ids = CompetitionMembership.all_objects.filter(
+        round_id=round_id,
+    ).values_list('competition_id', flat=True).distinct()
+    with transaction.atomic():
+        refresh_archer(round_scope(round_id), archer_id, groups)
+        for competition_id in competition_ids:
+            refresh_archer(competition_scope(competition_id), archer_id, groups)
+
+
+def update_round_membership(round_archer_id):
+    membership = RoundMembership.all_objects.filter(
+        pk=round_archer_id,
+    ).values('round_id', 'archer_id').first()
+    if membership is not None:
+        update_round_archer(membership['round_id'], membership['archer_id'])
+
+
+def update_archer(archer_id):
+    """
+    Refresh every leaderboard of an archer, e.g. after they joined or left a
+    club, team or category.
+    """
+    groups = get_archer_groups(archer_id)
+    round_ids = set(RoundMembership.all_objects.filter(
+        archer_id=archer_id,
+    ).values_list('round_id', flat=True))
+    competition_ids = set(CompetitionMembership.all_objects.filter(
+        round_id__in=round_ids,
+    ).values_list('competition_id', flat=True))
+    with transaction.atomic():
+        for round_id in round_ids:
+            refresh_archer(round_scope(round_id), archer_id, groups)
+        for competition_id in competition_ids:
+            refresh_archer(competition_scope(competition_id), archer_id, groups)
+
+
+def rebuild_scope(scope):
+    """
+    Rebuild a whole round or competition leaderboard from its scores with
+    one aggregate query, then rank each group once.
+    """
+    totals = list(
+        get_scope_scores(scope)
+        .exclude(round_archer=None)
+        .values('round_archer__archer_id')
+        .annotate(
+            total_score=Coalesce(Sum('score'), Value(0)),
+            total_arrows=Coalesce(Sum('number_of_arrows'), Value(0)),
+            total_tens=Coalesce(Sum('tens'), Value(0)),
+            total_xs=Coalesce(Sum('xs'), Value(0)),
+            number_of_scores=Count('pk'),
+        )
+        .order_by()
+    )
+    groups = get_groups_by_archer([row['round_archer__archer_id'] for row in totals])
+
+    entries = []
+    for row in totals:
+        archer_id = row.pop('round_archer__archer_id')
+        entries += [
+            LeaderboardEntry(
+                archer_id=archer_id,
+                group_type=group_type,
+                group_id=group_id,
+                **scope,
+                **row,
+            )
+            for group_type, group_id in groups[archer_id]
+        ]
+
+    with transaction.atomic():
+        LeaderboardEntry.objects.filter(**scope).delete()
+        LeaderboardEntry.objects.bulk_create(entries, batch_size=500)
+        for group_type, group_id in {(entry.group_type, entry.group_id) for entry in entries}:
+            rerank(scope, group_type, group_id)
+
+
+def rebuild_round(round_id):
+    rebuild_scope(round_scope(round_id))
+
+
+def rebuild_competition(competition_id):
+    rebuild_scope(competition_scope(competition_id))
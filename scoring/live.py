@@ -0,0 +1,200 @@
+"""
+Live score deltas for spectator screens.
+
+Saving a score publishes one small event per round and competition channel
+it belongs to. Every open ``/live/`` stream of that channel receives the
+event from the broker, so a thousand viewers cost the two queries that built
+the event and one JSON encoding instead of a thousand polls.
+
+The broker is pluggable through ``settings.SCORING_LIVE_BROKER``. The
+default ``InMemoryBroker`` fans out inside one process, which suits the
+single gunicorn/runserver process setups this project ships; a multi process
+deployment plugs in a broker with the same three methods backed by e.g.
+Redis pub/sub.
+"""
+import itertools
+import json
+import queue
+import threading
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+from .models import CompetitionMembership, RoundMembership
+
+DEFAULT_BROKER = 'scoring.live.InMemoryBroker'
+RECONNECT_DELAY_MS = 3000
+
+
+def round_channel(round_id):
+    return f'round:{round_id}'
+
+
+def competition_channel(competition_id):
+    return f'competition:{competition_id}'
+
+
+class Subscription:
+    """
+    The receiving end of one stream. Keeps at most ``max_pending`` messages, a
+    viewer that does not keep up loses the oldest ones rather than growing
+    the server's memory.
+    """
+    def __init__(self, broker, channel, max_pending=100):
+        self.broker = broker
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=max_pending)
+
+    def put(self, message):
+        while True:
+            try:
+                self.queue.put_nowait(message)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """
+        Return the next message, or ``None`` when none arrived within ``timeout``.
+        """
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InMemoryBroker:
+    """
+    Thread safe in-process publish/subscribe.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = {}
+        self.ids = itertools.count(1)
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self.lock:
+            self.subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscriptions.get(subscription.channel, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self.subscriptions.pop(subscription.channel, None)
+
+    def publish(self, channel, event):
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(channel, ()))
+        if subscriptions:
+            # Encoded once, every subscriber receives the same string.
+            message = format_event(next(self.ids), event)
+            for subscription in subscriptions:
+                subscription.put(message)
+        return len(subscriptions)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(getattr(settings, 'SCORING_LIVE_BROKER', DEFAULT_BROKER))()
+    return _broker
+
+
+def reset_broker():
+    global _broker
+    with _broker_lock:
+        _broker = None
+
+
+def score_delta(score, round_id, archer_id, action):
+    return {
+        'event': 'score',
+        'action': action,
+        'score': {
+            'id': score.pk,
+            'round_archer': score.round_archer_id,
+            'round': round_id,
+            'archer': archer_id,
+            'score': score.score,
+            'number_of_arrows': score.number_of_arrows,
+            'tens': score.tens,
+            'xs': score.xs,
+            'version': score.version,
+            'is_active': score.is_active,
+            'modified_at': score.modified_at,
+        },
+    }
+
+
+def publish_scores(scores, action='saved'):
+    """
+    Publish a delta for every score to its round channel and to the channel
+    of every competition containing that round. Costs two queries however
+    many scores or viewers there are.
+    """
+    scores = [score for score in scores if score.round_archer_id]
+    if not scores:
+        return
+    memberships = dict(
+        (pk, (round_id, archer_id))
+        for pk, round_id, archer_id in RoundMembership.all_objects.filter(
+            pk__in={score.round_archer_id for score in scores},
+        ).values_list('pk', 'round_id', 'archer_id')
+    )
+    competitions = {}
+    for round_id, competition_id in CompetitionMembership.all_objects.filter(
+        round_id__in={round_id for round_id, _archer_id in memberships.values()},
+    ).values_list('round_id', 'competition_id'):
+        competitions.setdefault(round_id, set()).add(competition_id)
+
+    broker = get_broker()
+    for score in scores:
+        if score.round_archer_id not in memberships:
+            continue
+        round_id, archer_id = memberships[score.round_archer_id]
+        delta = score_delta(score, round_id, archer_id, action)
+        broker.publish(round_channel(round_id), delta)
+        for competition_id in competitions.get(round_id, ()):
+            broker.publish(competition_channel(competition_id), delta)
+
+
+def format_event(event_id, event):
+    return (
+        f"id: {event_id}\n"
+        f"event: {event['event']}\n"
+        f"data: {json.dumps(event, cls=DjangoJSONEncoder)}\n\n"
+    )
+
+
+def event_stream(channel, heartbeat=None):
+    """
+    Yield Server-Sent Events for ``channel`` until the client disconnects,
+    with a comment line every ``heartbeat`` seconds to keep proxies from
+    closing an idle connection.
+    """
+    if heartbeat is None:
+        heartbeat = getattr(settings, 'SCORING_LIVE_HEARTBEAT', 15)
+    subscription = get_broker().subscribe(channel)
+    try:
+        yield f"retry: {RECONNECT_DELAY_MS}\n\n"
+        while True:
+            message = subscription.get(timeout=heartbeat)
+            yield message if message is not None else ": keepalive\n\n"
+    finally:
+        subscription.close()
@@ -0,0 +1,48 @@
+import json
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+
+from scoring.models import CompetitionMembership, Score
+from scoring.validation import RULES, audit_scores
+
+
+class Command(BaseCommand):
+    help = (
+        "Check every score against the target face, scoring sheet and end date of its round and "
+        "report the implausible ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--round', action='append', default=[], help="Only audit this round (repeatable).")
+        parser.add_argument('--competition', action='append', default=[], help="Only audit the rounds of this competition (repeatable).")
+        parser.add_argument('--include-inactive', action='store_true', help="Also audit inactive scores.")
+        parser.add_argument('--json', action='store_true', help="Write one JSON object per violation.")
+
+    def handle(self, *args, **options):
+        queryset = (Score.all_objects if options['include_inactive'] else Score.objects).all()
+        round_ids = list(options['round'])
+        if options['competition']:
+            round_ids += CompetitionMembership.all_objects.filter(
+                competition_id__in=options['competition'],
+            ).values_list('round_id', flat=True)
+        if options['round'] or options['competition']:
+            queryset = queryset.filter(round_archer__round_id__in=round_ids)
+
+        counts = Counter()
+        for violation in audit_scores(queryset):
+            counts.update(violation['rules'])
+            counts['scores'] += 1
+            if options['json']:
+                self.stdout.write(json.dumps(violation, cls=DjangoJSONEncoder))
+            else:
+                self.stdout.write(
+                    f"{violation['id']}: {violation['score']} with {violation['number_of_arrows']} arrows "
+                    f"({violation['max_arrow_points']} per arrow), {', '.join(violation['rules'])}"
+                )
+
+        if not options['json']:
+            summary = ', '.join(f'{counts[rule]} {rule}' for rule in RULES if counts[rule])
+            style = self.style.WARNING if counts['scores'] else self.style.SUCCESS
+            self.stderr.write(style(f"{counts['scores']} implausible scores" + (f': {summary}' if summary else '.')))
@@ -0,0 +1,340 @@
+import json
+import re
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+
+from fill_db.factory import BulkFixtureFactory
+from scoring import leaderboard
+from scoring.arrows import pack_arrows
+from scoring.models import (
+    Competition,
+    CompetitionMembership,
+    Round,
+    RoundMembership,
+    Score,
+    ScoreEnd,
+    ScoringSheet,
+    TargetFaceNameChoice,
+)
+from scoring.urls import urlpatterns
+from userauth.models import CustomUser
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'api-baseline.json'
+SCORES_PER_ARCHER = 10
+# Streams never finish, they are listed in the results as skipped
+SKIPPED_ROUTES = {'rounds/<uuid:pk>/live/', 'competitions/<uuid:pk>/live/'}
+BULK_ROWS = 100
+# Values of the converters the samples do not fill in, per route
+ROUTE_KWARGS = {
+    'export/<str:name>.<str:file_format>': {'name': 'scores', 'file_format': 'csv'},
+}
+
+
+def parse_scale(value):
+    """
+    ``1k``, ``100k``, ``1m`` or a plain number of scores.
+    """
+    match = re.fullmatch(r'(\d+)([km]?)', value.strip().lower())
+    if not match:
+        raise ValueError(f"Not a scale: {value}")
+    return int(match.group(1)) * {'': 1, 'k': 1000, 'm': 1000000}[match.group(2)]
+
+
+def format_scale(scores):
+    for unit, size in (('m', 1000000), ('k', 1000)):
+        if scores % size == 0:
+            return f'{scores // size}{unit}'
+    return str(scores)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def get_route_models():
+    """
+    Map every url prefix to the model of its list view, e.g. ``rounds`` to
+    ``Round``, to fill in the ``<uuid:pk>`` of the detail routes.
+    """
+    models = {}
+    for pattern in urlpatterns:
+        route = str(pattern.pattern)
+        view_class = getattr(pattern.callback, 'view_class', None)
+        queryset = getattr(view_class, 'queryset', None)
+        if route.count('/') == 1 and queryset is not None:
+            models[route.rstrip('/')] = queryset.model
+    return models
+
+
+def compare_results(baseline, results, threshold=0.2, max_extra_queries=0, min_delta_ms=1.0, min_delta_kb=64):
+    """
+    Return a line per endpoint that regressed against ``baseline``. An
+    endpoint answering other than 2xx, or with another status than in the
+    baseline, always regressed. Query counts are deterministic and may grow
+    by ``max_extra_queries``; the p95 latency and the peak memory may grow by
+    ``threshold`` (a fraction) and are ignored below
+    ``min_delta_ms``/``min_delta_kb`` to stay clear of noise.
+    """
+    regressions = []
+    for scale, endpoints in results.items():
+        for name, current in endpoints.items():
+            if 'skipped' in current:
+                continue
+            status = current.get('status')
+            if status is not None and not 200 <= status < 300:
+                regressions.append(f"{scale} {name}: status {status}")
+                continue
+            previous = baseline.get(scale, {}).get(name)
+            if previous is None or 'skipped' in previous:
+                continue
+            if previous.get('status', status) != status:
+                regressions.append(f"{scale} {name}: status {previous['status']} -> {status}")
+            if current['queries'] > previous['queries'] + max_extra_queries:
+                regressions.append(f"{scale} {name}: {previous['queries']} -> {current['queries']} queries")
+            for key, unit, floor in (('p95_ms', 'ms', min_delta_ms), ('peak_kb', 'kB', min_delta_kb)):
+                delta = current[key] - previous[key]
+                if delta > floor and current[key] > previous[key] * (1 + threshold):
+                    regressions.append(f"{scale} {name}: {key} {previous[key]:.1f} -> {current[key]:.1f} {unit}")
+    return regressions
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a test database at one or more scales and measure query count, p50/p95 latency and "
+        "peak memory of every route in scoring/urls.py. Compares the run with a baseline file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', action='append', dest='scales',
+            help="Number of scores, e.g. 1k, 100k or 1m. Repeat for several scales (default 1k).",
+        )
+        parser.add_argument('--repeat', type=int, default=20, help="Timed requests per route.")
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help="Baseline JSON file.")
+        parser.add_argument('--output', help="Also write this run's results to this JSON file.")
+        parser.add_argument(
+            '--update-baseline', action='store_true',
+            help="Write the results to the baseline file instead of comparing.",
+        )
+        parser.add_argument('--threshold', type=float, default=0.2, help="Allowed p95 and memory growth, 0.2 = 20%%.")
+        parser.add_argument('--max-extra-queries', type=int, default=0, help="Allowed growth of the query count.")
+        parser.add_argument('--seed', type=int, default=1, help="Seed for the generated data.")
+        parser.add_argument('--keepdb', action='store_true', help="Keep and reuse the seeded test database.")
+        parser.add_argument('--with-silk', action='store_true', help="Keep django-silk profiling enabled.")
+
+    def handle(self, *args, **options):
+        try:
+            scales = sorted({parse_scale(value) for value in options['scales'] or ['1k']})
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        middleware = settings.MIDDLEWARE
+        if not options['with_silk']:
+            middleware = [m for m in middleware if not m.startswith('silk.')]
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            with override_settings(MIDDLEWARE=middleware):
+                results = self.run_scales(scales, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        if options['output']:
+            self.write(options['output'], results)
+
+        baseline_path = Path(options['baseline'])
+        if options['update_baseline'] or not baseline_path.exists():
+            failures = compare_results({}, results)
+            if failures:
+                raise CommandError('Not written as a baseline, routes failed:\n' + '\n'.join(failures))
+            self.write(baseline_path, results)
+            self.stdout.write(self.style.SUCCESS(f'Baseline written to {baseline_path}'))
+            return
+
+        baseline = json.loads(baseline_path.read_text())
+        regressions = compare_results(
+            baseline, results, options['threshold'], options['max_extra_queries'],
+        )
+        if regressions:
+            raise CommandError('Regressions against the baseline:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS(f'No regressions against {baseline_path}'))
+
+    def write(self, path, results):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(results, indent=2, sort_keys=True) + '\n')
+
+    def run_scales(self, scales, options):
+        user = CustomUser.objects.filter(is_superuser=True).first()
+        if user is None:
+            user = CustomUser.objects.create_superuser(
+                username='benchmark', display_name='Benchmark', password='benchmark', email='benchmark@mail.com',
+            )
+        if not ScoringSheet.objects.exists():
+            ScoringSheet.objects.create(author=user, name='Indoor 18 meter', columns=3, rows=10)
+
+        client = Client()
+        client.force_login(user)
+        results = {}
+        for scores in scales:
+            self.seed(user, scores, options['seed'])
+            # Summaries cached for another database must not leak in
+            cache.clear()
+            label = format_scale(scores)
+            self.stdout.write(f'Scale {label}: {Score.objects.count()} scores')
+            results[label] = self.run_routes(client, user, options['repeat'])
+        return results
+
+    def seed(self, user, scores, seed):
+        """
+        Top the database up to ``scores`` scores, so the scales build on each
+        other and a kept database is only seeded once.
+        """
+        missing = scores - Score.objects.count()
+        if missing <= 0:
+            return
+        archers = max(1, missing // SCORES_PER_ARCHER)
+        factory = BulkFixtureFactory(user, seed=seed + scores)
+        factory.run(
+            archers=archers,
+            clubs=max(1, archers // 50),
+            # About 200 scores per round
+            rounds=max(SCORES_PER_ARCHER, missing // 200),
+            scores_per_archer=SCORES_PER_ARCHER,
+        )
+
+    def get_samples(self, user):
+        """
+        The objects the detail routes are measured on: a score in a round of
+        a competition, with ends and ranked leaderboards.
+        """
+        membership = CompetitionMembership.objects.order_by('pk').first()
+        score = Score.objects.filter(
+            round_archer__round_id=membership.round_id,
+        ).select_related('round_archer').order_by('pk').first()
+        round_archer = score.round_archer
+        if not score.ends.exists():
+            ScoreEnd.objects.bulk_create(
+                ScoreEnd(author=user, score=score, end_number=number, arrows=pack_arrows(['10', '9', '8']))
+                for number in range(1, 11)
+            )
+        round = Round.objects.get(pk=membership.round_id)
+        if round.targetface_id is None or round.scoringsheet_id is None:
+            # The handicap routes need a target face and a scoring sheet
+            round.targetface = round.targetface or TargetFaceNameChoice.objects.create(
+                author=user, name='Benchmark 40 cm', environment='Indoor', discipline='Target Archery',
+                targetsize='40 cm', keyfeature='10-Zone',
+            )
+            round.scoringsheet = round.scoringsheet or ScoringSheet.objects.order_by('pk').first()
+            round.save()
+        leaderboard.rebuild_round(membership.round_id)
+        leaderboard.rebuild_competition(membership.competition_id)
+        return {
+            Score: score,
+            RoundMembership: round_archer,
+            Round: round,
+            Competition: Competition.objects.get(pk=membership.competition_id),
+        }
+
+    def get_requests(self, user):
+        """
+        One request per route of scoring/urls.py: ``(name, method, url, body)``.
+        Routes that cannot be read with GET, or whose arguments no sample
+        fills in, are skipped.
+        """
+        samples = self.get_samples(user)
+        models = get_route_models()
+        requests = []
+        for pattern in urlpatterns:
+            route = str(pattern.pattern)
+            view_class = getattr(pattern.callback, 'view_class', None)
+            if route in SKIPPED_ROUTES or (
+                route != 'scores/bulk/' and view_class is not None and not hasattr(view_class, 'get')
+            ):
+                requests.append((f'GET {route}', None, None, None))
+                continue
+            model = models.get(route.split('/')[0])
+            if '<uuid:pk>' in route:
+                sample = samples.get(model) or model._default_manager.order_by('pk').first()
+                if sample is None:
+                    requests.append((f'GET {route}', None, None, None))
+                    continue
+            else:
+                sample = None
+            url = route.replace('<uuid:pk>', str(getattr(sample, 'pk', '')))
+            url = url.replace('<uuid:score_pk>', str(samples[Score].pk)).replace('<int:end_number>', '1')
+            for key, value in ROUTE_KWARGS.get(route, {}).items():
+                url = re.sub(rf'<\w+:{key}>', value, url)
+            if '<' in url:
+                requests.append((f'GET {route}', None, None, None))
+                continue
+            if route == 'scores/bulk/':
+                body = '\n'.join(
+                    json.dumps({'round_archer': str(samples[RoundMembership].pk), 'score': 280, 'number_of_arrows': 30})
+                    for _index in range(BULK_ROWS)
+                )
+                requests.append((f'POST {route}', 'post', f'/scoring/{url}', body))
+            else:
+                requests.append((f'GET {route}', 'get', f'/scoring/{url}', None))
+        return requests
+
+    def request(self, client, method, url, body):
+        if method == 'post':
+            # Writes are rolled back so every repetition sees the same data
+            with transaction.atomic():
+                response = client.post(url, body, content_type='application/x-ndjson')
+                transaction.set_rollback(True)
+            return response
+        return client.get(url)
+
+    def run_routes(self, client, user, repeat):
+        results = {}
+        for name, method, url, body in self.get_requests(user):
+            if method is None:
+                results[name] = {'skipped': True}
+                continue
+
+            # Warm up caches and lazy imports, then count the queries
+            self.request(client, method, url, body)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.request(client, method, url, body)
+
+            timings = []
+            for _index in range(repeat):
+                start = time.perf_counter()
+                self.request(client, method, url, body)
+                timings.append((time.perf_counter() - start) * 1000)
+
+            tracemalloc.start()
+            try:
+                self.request(client, method, url, body)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+            results[name] = {
+                'status': response.status_code,
+                'queries': len(queries),
+                'p50_ms': round(statistics.median(timings), 3),
+                'p95_ms': round(percentile(timings, 0.95), 3),
+                'peak_kb': round(peak / 1024, 1),
+            }
+            self.stdout.write(
+                f"{name:<55} {response.status_code} {len(queries):>4} queries "
+                f"p50 {results[name]['p50_ms']:>8.2f}ms p95 {results[name]['p95_ms']:>8.2f}ms "
+                f"peak {results[name]['peak_kb']:>9.1f}kB"
+            )
+        return results
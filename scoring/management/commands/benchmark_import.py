@@ -0,0 +1,96 @@
+import csv
+import io
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from django.test import Client, override_settings
+
+from scoring.imports import BulkImporter, read_rows
+from scoring.models import Archer, Round, RoundMembership
+from userauth.models import CustomUser
+
+BENCHMARK_NAME = 'benchmark-import'
+
+
+def make_csv(headers, rows):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(headers)
+    writer.writerows(rows)
+    return output.getvalue().encode()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare POSTing archers one by one to /scoring/archers/ with the bulk CSV import, "
+        "and time a dry run and a bulk import of round registrations."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help="Archers to import with each method.")
+        parser.add_argument('--with-silk', action='store_true', help="Keep django-silk profiling enabled.")
+        parser.add_argument('--keep', action='store_true', help="Keep the benchmark rows afterwards.")
+
+    def handle(self, *args, **options):
+        middleware = settings.MIDDLEWARE
+        if not options['with_silk']:
+            middleware = [m for m in middleware if not m.startswith('silk.')]
+
+        user = CustomUser.objects.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError('A superuser is needed, run load_initial_data first.')
+
+        count = options['rows']
+        first = (Archer.all_objects.aggregate(Max('union_number'))['union_number__max'] or 0) + 1
+        per_row_numbers = range(first, first + count)
+        bulk_numbers = range(first + count, first + 2 * count)
+        round = Round.objects.create(author=user, name=f'{BENCHMARK_NAME}-{time.time_ns()}')
+
+        timings = []
+        try:
+            with override_settings(MIDDLEWARE=middleware):
+                client = Client()
+                client.force_login(user)
+                timings.append(('per-row POST', self.run_per_row(client, user, per_row_numbers)))
+
+            archers = make_csv(
+                ['union_number', 'last_name', 'first_name', 'city'],
+                ([number, BENCHMARK_NAME, f'Archer {number}', 'Eindhoven'] for number in bulk_numbers),
+            )
+            timings.append(('dry run', self.run_import('archers', archers, user, dry_run=True)))
+            timings.append(('import', self.run_import('archers', archers, user)))
+            timings.append(('re-import', self.run_import('archers', archers, user)))
+            registrations = make_csv(['round', 'union_number'], ([round.name, number] for number in bulk_numbers))
+            timings.append(('registrations', self.run_import('registrations', registrations, user)))
+        finally:
+            if not options['keep']:
+                RoundMembership.all_objects.filter(round=round).delete()
+                round.delete()
+                Archer.all_objects.filter(last_name=BENCHMARK_NAME).delete()
+
+        for label, seconds in timings:
+            self.stdout.write(f'{label:>14}: {count} rows in {seconds:.3f}s ({count / seconds:,.0f} rows/s)')
+        self.stdout.write(self.style.SUCCESS(f'bulk import is {timings[0][1] / timings[2][1]:.1f}x faster'))
+
+    def run_per_row(self, client, user, numbers):
+        start = time.perf_counter()
+        for number in numbers:
+            response = client.post('/scoring/archers/', {
+                'union_number': number,
+                'last_name': BENCHMARK_NAME,
+                'first_name': f'Archer {number}',
+                'city': 'Eindhoven',
+                'author': user.pk,
+            }, content_type='application/json')
+            if response.status_code != 201:
+                raise CommandError(f'per-row POST failed: {response.status_code} {response.content[:200]}')
+        return time.perf_counter() - start
+
+    def run_import(self, name, content, user, dry_run=False):
+        start = time.perf_counter()
+        report = BulkImporter(name, user, dry_run=dry_run).run(read_rows(io.BytesIO(content), 'csv'))
+        if report['errors'] or report['conflicts']:
+            raise CommandError(f'{name} import failed: {report["results"][:3]}')
+        return time.perf_counter() - start
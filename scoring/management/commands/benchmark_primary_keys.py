@@ -0,0 +1,90 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, transaction
+
+from scoring.ids import uuid7
+
+TABLE = 'benchmark_primary_keys'
+KEYS = {
+    'uuid4': uuid.uuid4,
+    'uuid7': uuid7,
+}
+
+
+def get_column_type():
+    # The column types of a Django UUIDField
+    if connection.vendor == 'sqlite':
+        return 'char(32)'
+    if connection.vendor == 'postgresql':
+        return 'uuid'
+    raise CommandError(f'Not supported for {connection.vendor}.')
+
+
+def to_db(value):
+    return value.hex if connection.vendor == 'sqlite' else value
+
+
+def get_index_size(table):
+    """
+    Bytes of the primary key index of ``table``, ``None`` when the database
+    cannot tell.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_relation_size(%s)', [f'{table}_pkey'])
+            return cursor.fetchone()[0]
+        try:
+            cursor.execute(
+                'SELECT SUM(pgsize) FROM dbstat WHERE name IN '
+                '(SELECT name FROM sqlite_master WHERE type = %s AND tbl_name = %s)',
+                ['index', table],
+            )
+        except DatabaseError:
+            # SQLite built without the dbstat table
+            return None
+        return cursor.fetchone()[0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert rows keyed by uuid4 and by time-ordered uuid7 primary keys into scratch tables of the "
+        "default database (SQLite or PostgreSQL) and compare insert throughput and primary key index size."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help="Rows per key type.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows per INSERT batch and transaction.")
+
+    def handle(self, *args, **options):
+        column_type = get_column_type()
+        self.stdout.write(f"{connection.vendor}, {options['rows']} rows in batches of {options['batch_size']}")
+        for name, make_key in KEYS.items():
+            table = f'{TABLE}_{name}'
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP TABLE IF EXISTS {table}')
+                cursor.execute(
+                    f'CREATE TABLE {table} (id {column_type} NOT NULL PRIMARY KEY, '
+                    f'score integer NOT NULL, number_of_arrows integer NOT NULL)'
+                )
+            try:
+                elapsed = self.insert(table, make_key, options['rows'], options['batch_size'])
+                size = get_index_size(table)
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute(f'DROP TABLE {table}')
+            size = f'{size / 1024 / 1024:.1f} MiB' if size is not None else 'n/a'
+            self.stdout.write(f'{name}: {options["rows"] / elapsed:10.0f} rows/s, primary key index {size}')
+
+    def insert(self, table, make_key, rows, batch_size):
+        sql = f'INSERT INTO {table} (id, score, number_of_arrows) VALUES (%s, %s, %s)'
+        start = time.perf_counter()
+        for offset in range(0, rows, batch_size):
+            batch = [
+                (to_db(make_key()), index % 300, 30)
+                for index in range(offset, min(offset + batch_size, rows))
+            ]
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(sql, batch)
+        return time.perf_counter() - start
@@ -0,0 +1,78 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from scoring.models import Archer, Round, RoundMembership, Score
+from userauth.models import CustomUser
+
+BENCHMARK_NAME = 'benchmark-score-ingestion'
+
+
+class Command(BaseCommand):
+    help = "Compare POSTing scores one by one to /scoring/scores/ with /scoring/scores/bulk/."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help="Scores to write with each endpoint.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Scores per bulk request.")
+        parser.add_argument('--with-silk', action='store_true', help="Keep django-silk profiling enabled.")
+        parser.add_argument('--keep', action='store_true', help="Keep the benchmark rows afterwards.")
+
+    def handle(self, *args, **options):
+        middleware = settings.MIDDLEWARE
+        if not options['with_silk']:
+            middleware = [m for m in middleware if not m.startswith('silk.')]
+
+        user = CustomUser.objects.filter(is_superuser=True).first()
+        if user is None:
+            self.stderr.write(self.style.ERROR('A superuser is needed, run load_initial_data first.'))
+            return
+
+        archer = Archer.objects.create(author=user, last_name=BENCHMARK_NAME, first_name='Benchmark')
+        round = Round.objects.create(author=user, name=f'{BENCHMARK_NAME}-{time.time_ns()}')
+        round_archer = RoundMembership.objects.create(author=user, round=round, archer=archer)
+        rows = [
+            {'round_archer': str(round_archer.pk), 'score': index % 300, 'number_of_arrows': 30, 'author': user.pk}
+            for index in range(options['rows'])
+        ]
+
+        try:
+            with override_settings(MIDDLEWARE=middleware):
+                client = Client()
+                client.force_login(user)
+                per_row = self.run_per_row(client, rows)
+                bulk = self.run_bulk(client, rows, options['batch_size'])
+        finally:
+            if not options['keep']:
+                Score.objects.filter(round_archer=round_archer).delete()
+                round_archer.delete()
+                round.delete()
+                archer.delete()
+
+        for label, seconds in (('per-row', per_row), ('bulk', bulk)):
+            self.stdout.write(
+                f'{label:>8}: {len(rows)} scores in {seconds:.3f}s ({len(rows) / seconds:,.0f} scores/s)'
+            )
+        self.stdout.write(self.style.SUCCESS(f'bulk is {per_row / bulk:.1f}x faster'))
+
+    def run_per_row(self, client, rows):
+        start = time.perf_counter()
+        for row in rows:
+            response = client.post('/scoring/scores/', row, content_type='application/json')
+            if response.status_code != 201:
+                raise RuntimeError(f'per-row POST failed: {response.status_code} {response.content[:200]}')
+        return time.perf_counter() - start
+
+    def run_bulk(self, client, rows, batch_size):
+        start = time.perf_counter()
+        for offset in range(0, len(rows), batch_size):
+            body = '\n'.join(
+                json.dumps({key: value for key, value in row.items() if key != 'author'})
+                for row in rows[offset:offset + batch_size]
+            )
+            response = client.post('/scoring/scores/bulk/', body, content_type='application/x-ndjson')
+            if response.status_code != 200 or response.json()['errors']:
+                raise RuntimeError(f'bulk POST failed: {response.status_code} {response.content[:200]}')
+        return time.perf_counter() - start
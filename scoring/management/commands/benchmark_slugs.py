@@ -0,0 +1,93 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from scoring.models import Archer, Round, RoundMembership
+from scoring.slugs import SlugAllocator
+from userauth.models import CustomUser
+
+BENCHMARK_NAME = 'benchmark-slugs'
+# Archers per last name, so most slugs need a number (AutoSlugField gives up after 100 tries)
+NAMESAKES = 20
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare writing archers and round registrations with save() per row, with bulk_create and "
+        "AutoSlugField's per-row slugs, and with bulk_create and slugs from a SlugAllocator."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help="Rows to write with each method.")
+        parser.add_argument('--batch-size', type=int, default=500, help="Rows per bulk_create.")
+
+    def handle(self, *args, **options):
+        user = CustomUser.objects.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError('A superuser is needed, run load_initial_data first.')
+        self.user = user
+        self.rows = options['rows']
+        self.batch_size = options['batch_size']
+        round = Round.objects.create(author=user, name=f'{BENCHMARK_NAME}-{time.time_ns()}')
+
+        try:
+            results = []
+            for label, method in (('save()', self.save_rows), ('bulk_create', self.bulk_create), ('allocator', self.allocate)):
+                archers, archer_timing = self.measure(method, Archer, self.new_archers(label))
+                # Uncached relations: the slug needs archer__last_name and round__name
+                registrations = [
+                    RoundMembership(author=user, round_id=round.pk, archer_id=archer.pk, sort_key=round.name)
+                    for archer in archers
+                ]
+                _rows, registration_timing = self.measure(method, RoundMembership, registrations)
+                results.append((label, archer_timing, registration_timing))
+        finally:
+            RoundMembership.all_objects.filter(round=round).delete()
+            round.delete()
+            Archer.all_objects.filter(last_name__startswith=BENCHMARK_NAME).delete()
+
+        for label, *timings in results:
+            for model, (seconds, queries, duplicates) in zip(('archers', 'registrations'), timings):
+                self.stdout.write(
+                    f'{label:>12} {model:>13}: {self.rows / seconds:8,.0f} rows/s, '
+                    f'{queries / self.rows:5.2f} queries/row, {duplicates} duplicate slugs'
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f'the allocator is {results[0][1][0] / results[2][1][0]:.1f}x faster than save() for archers'
+        ))
+
+    def new_archers(self, label):
+        # Names of their own per method, the methods do not number after each other
+        return [
+            Archer(author=self.user, last_name=f'{BENCHMARK_NAME} {label} {index // NAMESAKES}', first_name=f'Archer {index}')
+            for index in range(self.rows)
+        ]
+
+    def measure(self, method, model, rows):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            with transaction.atomic():
+                method(model, rows)
+            seconds = time.perf_counter() - start
+        slugs = []
+        for start in range(0, len(rows), 500):
+            slugs += model.all_objects.filter(
+                pk__in=[row.pk for row in rows[start:start + 500]],
+            ).values_list('slug', flat=True)
+        return rows, (seconds, len(queries), len(slugs) - len(set(slugs)))
+
+    def save_rows(self, model, rows):
+        for row in rows:
+            row.save()
+
+    def bulk_create(self, model, rows):
+        model.objects.bulk_create(rows, batch_size=self.batch_size)
+
+    def allocate(self, model, rows):
+        allocator = SlugAllocator(model)
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            allocator.assign(batch)
+            model.objects.bulk_create(batch, batch_size=self.batch_size)
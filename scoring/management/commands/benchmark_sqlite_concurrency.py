@@ -0,0 +1,138 @@
+import multiprocessing
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+from django.test import Client, override_settings
+
+from scoring.models import Archer, Round, RoundMembership, Score
+from userauth.models import CustomUser
+
+from .benchmark_api import percentile
+
+BENCHMARK_NAME = 'benchmark-sqlite-concurrency'
+MODES = ('default', 'tuned', 'queue')
+
+
+def get_mode_options(mode):
+    """
+    The database OPTIONS of a mode: SQLite's defaults (rollback journal,
+    full fsync, deferred transactions) or the performance mode of settings.
+    """
+    if mode == 'default':
+        return {'init_command': 'PRAGMA journal_mode=DELETE; PRAGMA synchronous=FULL'}
+    return {
+        'init_command': '; '.join(
+            f'PRAGMA {name}={value}' for name, value in settings.SCORING_SQLITE_PRAGMAS.items()
+        ),
+        'transaction_mode': 'IMMEDIATE',
+    }
+
+
+def run_client(mode, role, count, user_pk, round_archer_pk, middleware, barrier, results):
+    """
+    One worker process: ``count`` score POSTs or score list GETs through the
+    full middleware stack.
+    """
+    connections['default'].settings_dict['OPTIONS'] = get_mode_options(mode)
+    timings = []
+    errors = 0
+    with override_settings(MIDDLEWARE=middleware, SCORING_SQLITE_WRITE_QUEUE=mode == 'queue'):
+        client = Client()
+        client.force_login(CustomUser.objects.get(pk=user_pk))
+        barrier.wait()
+        for index in range(count):
+            start = time.perf_counter()
+            try:
+                if role == 'writer':
+                    response = client.post('/scoring/scores/', {
+                        'round_archer': str(round_archer_pk),
+                        'score': index % 300,
+                        'number_of_arrows': 30,
+                        'author': user_pk,
+                    }, content_type='application/json')
+                    ok = response.status_code == 201
+                else:
+                    ok = client.get('/scoring/scores/', {'page_size': 50}).status_code == 200
+            except OperationalError:
+                ok = False
+            if ok:
+                timings.append((time.perf_counter() - start) * 1000)
+            else:
+                errors += 1
+    connections.close_all()
+    results.put((role, timings, errors))
+
+
+class Command(BaseCommand):
+    help = (
+        "Run concurrent score writes and reads from several processes against the SQLite database "
+        "with SQLite's defaults, the performance mode and the performance mode with the write queue."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4, help="Processes posting scores.")
+        parser.add_argument('--readers', type=int, default=2, help="Processes reading the score list.")
+        parser.add_argument('--requests', type=int, default=100, help="Requests per process.")
+        parser.add_argument('--mode', action='append', dest='modes', choices=MODES, help="Only run this mode (repeatable).")
+        parser.add_argument('--with-silk', action='store_true', help="Keep django-silk profiling enabled.")
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor != 'sqlite':
+            raise CommandError('The default database is not SQLite.')
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise CommandError('Needs the fork start method of multiprocessing (Linux, macOS).')
+
+        middleware = settings.MIDDLEWARE
+        if not options['with_silk']:
+            middleware = [m for m in middleware if not m.startswith('silk.')]
+
+        user = CustomUser.objects.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError('A superuser is needed, run load_initial_data first.')
+        archer = Archer.objects.create(author=user, last_name=BENCHMARK_NAME, first_name='Benchmark')
+        round = Round.objects.create(author=user, name=f'{BENCHMARK_NAME}-{time.time_ns()}')
+        round_archer = RoundMembership.objects.create(author=user, round=round, archer=archer)
+
+        try:
+            for mode in options['modes'] or MODES:
+                self.run_mode(mode, user, round_archer, middleware, options)
+        finally:
+            Score.all_objects.filter(round_archer=round_archer).delete()
+            round_archer.delete()
+            round.delete()
+            archer.delete()
+
+    def run_mode(self, mode, user, round_archer, middleware, options):
+        context = multiprocessing.get_context('fork')
+        roles = ['writer'] * options['writers'] + ['reader'] * options['readers']
+        barrier = context.Barrier(len(roles) + 1)
+        results = context.Queue()
+        # Children must open their own connections
+        connections.close_all()
+        processes = [
+            context.Process(target=run_client, args=(
+                mode, role, options['requests'], user.pk, round_archer.pk, middleware, barrier, results,
+            ))
+            for role in roles
+        ]
+        for process in processes:
+            process.start()
+        barrier.wait()
+        start = time.perf_counter()
+        collected = [results.get() for _process in processes]
+        elapsed = time.perf_counter() - start
+        for process in processes:
+            process.join()
+
+        for role in ('writer', 'reader'):
+            timings = [timing for name, values, _errors in collected if name == role for timing in values]
+            errors = sum(errors for name, _values, errors in collected if name == role)
+            if not timings and not errors:
+                continue
+            line = f'{mode:>8} {role}s: {len(timings) / elapsed:8.1f} req/s, {errors} failed'
+            if timings:
+                line += f', p50 {statistics.median(timings):.1f}ms p95 {percentile(timings, 0.95):.1f}ms'
+            self.stdout.write(line)
@@ -0,0 +1,203 @@
+from itertools import islice
+from pathlib import Path
+
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.utils import load_backend
+from django.db.migrations.executor import MigrationExecutor
+
+from scoring import reference
+from scoring.summaries import invalidate_summary
+
+SOURCE_ALIAS = 'sqlite_source'
+DEFAULT_APPS = ['userauth', 'scoring']
+
+
+def open_sqlite(alias, path):
+    """
+    Connect to the SQLite database at ``path`` as ``connections[alias]``,
+    without adding it to ``settings.DATABASES``. The caller closes it and
+    deletes the alias once done.
+    """
+    settings_dict = dict(
+        connections.databases[DEFAULT_DB_ALIAS],
+        ENGINE='django.db.backends.sqlite3',
+        NAME=str(path),
+        USER='', PASSWORD='', HOST='', PORT='',
+        CONN_MAX_AGE=0,
+        OPTIONS={},
+    )
+    connections[alias] = load_backend(settings_dict['ENGINE']).DatabaseWrapper(settings_dict, alias)
+    return connections[alias]
+
+
+def batched(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def get_copied_models(app_labels):
+    """
+    The tables of ``app_labels`` that can be copied on their own: a table is
+    left out when a required foreign key points outside the copied set, like
+    the Wagtail pages and their tags. Parents come before children.
+    """
+    models = {
+        model
+        for label in app_labels
+        for model in apps.get_app_config(label).get_models(include_auto_created=True)
+        if model._meta.managed and not model._meta.proxy
+    }
+    changed = True
+    while changed:
+        changed = False
+        for model in list(models):
+            if any(
+                field.is_relation and not field.null and field.related_model not in models
+                for field in model._meta.concrete_fields
+            ):
+                models.discard(model)
+                changed = True
+
+    ordered = []
+    pending = sorted(models, key=lambda model: model._meta.label)
+    while pending:
+        for model in pending:
+            parents = {
+                field.related_model for field in model._meta.concrete_fields
+                if field.is_relation and field.related_model in models and field.related_model is not model
+            }
+            if parents.issubset(ordered):
+                break
+        else:
+            # A cycle, the deferred foreign key checks settle it at commit
+            model = pending[0]
+        ordered.append(model)
+        pending.remove(model)
+    return ordered
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the scoring data of a SQLite database file into the default database (PostgreSQL) in "
+        "batches, in one transaction, and check the row counts of every table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help="Path of the SQLite database file.")
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help="Target database alias.")
+        parser.add_argument('--app', action='append', dest='app_labels', help="Copy this app (repeatable).")
+        parser.add_argument('--batch-size', type=int, default=2000, help="Rows per INSERT batch.")
+        parser.add_argument(
+            '--truncate', action='store_true',
+            help="Empty the copied tables of the target first instead of refusing to copy into them.",
+        )
+        parser.add_argument(
+            '--migrate-source', action='store_true',
+            help="Apply missing migrations to the SQLite file first.",
+        )
+
+    def handle(self, *args, **options):
+        source_path = Path(options['source'])
+        if not source_path.is_file():
+            raise CommandError(f"No SQLite database at {source_path}")
+
+        source = open_sqlite(SOURCE_ALIAS, source_path)
+        try:
+            self.check_migrations(options['migrate_source'])
+            models = get_copied_models(options['app_labels'] or DEFAULT_APPS)
+            self.copy(models, connections[options['database']], options)
+        finally:
+            source.close()
+            del connections[SOURCE_ALIAS]
+
+        for model in models:
+            invalidate_summary(model)
+            reference.invalidate(model)
+
+    def check_migrations(self, migrate):
+        if migrate:
+            call_command('migrate', database=SOURCE_ALIAS, verbosity=0)
+            return
+        executor = MigrationExecutor(connections[SOURCE_ALIAS])
+        if executor.migration_plan(executor.loader.graph.leaf_nodes()):
+            raise CommandError(
+                "The SQLite database has unapplied migrations, run again with --migrate-source."
+            )
+
+    def copy(self, models, target, options):
+        tables = [model._meta.db_table for model in models]
+        with transaction.atomic(using=target.alias):
+            with target.cursor() as cursor:
+                if options['truncate']:
+                    for sql in target.ops.sql_flush(no_style(), tables):
+                        cursor.execute(sql)
+                else:
+                    filled = [model._meta.db_table for model in models if model._base_manager.using(target.alias).exists()]
+                    if filled:
+                        raise CommandError(
+                            f"Target tables are not empty: {', '.join(filled)}. Use --truncate to replace them."
+                        )
+
+                mismatches = []
+                for model in models:
+                    copied, cleared = self.copy_model(model, models, cursor, target, options['batch_size'])
+                    expected = model._base_manager.using(SOURCE_ALIAS).count()
+                    found = model._base_manager.using(target.alias).count()
+                    if not copied == expected == found:
+                        mismatches.append(f'{model._meta.db_table}: {expected} in SQLite, {found} copied')
+                    note = f', {cleared} links to tables not copied cleared' if cleared else ''
+                    self.stdout.write(f'{model._meta.db_table}: {found} rows{note}')
+                if mismatches:
+                    raise CommandError('Row counts differ, nothing was copied:\n' + '\n'.join(mismatches))
+
+                for sql in target.ops.sequence_reset_sql(no_style(), models):
+                    cursor.execute(sql)
+
+        self.stdout.write(self.style.SUCCESS(f'Copied {len(models)} tables to {target.alias}.'))
+
+    def copy_model(self, model, copied_models, cursor, target, batch_size):
+        """
+        Stream the rows of ``model`` from SQLite with raw INSERTs, so
+        ``auto_now`` fields, slugs and signals leave the copied values alone.
+        Optional foreign keys to rows the target does not have, in tables
+        that are not copied (archer images), are cleared.
+        """
+        fields = model._meta.concrete_fields
+        outside = {
+            index: field for index, field in enumerate(fields)
+            if field.is_relation and field.null and field.related_model not in copied_models
+        }
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            target.ops.quote_name(model._meta.db_table),
+            ', '.join(target.ops.quote_name(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields)),
+        )
+        rows = model._base_manager.using(SOURCE_ALIAS).order_by('pk').values_list(
+            *[field.attname for field in fields],
+        ).iterator(chunk_size=batch_size)
+
+        copied = cleared = 0
+        for batch in batched(rows, batch_size):
+            batch = [list(row) for row in batch]
+            for index, field in outside.items():
+                linked = {row[index] for row in batch if row[index] is not None}
+                if not linked:
+                    continue
+                existing = set(field.related_model._base_manager.using(target.alias).filter(
+                    pk__in=linked,
+                ).values_list('pk', flat=True))
+                for row in batch:
+                    if row[index] is not None and row[index] not in existing:
+                        row[index] = None
+                        cleared += 1
+            cursor.executemany(sql, [
+                [field.get_db_prep_save(value, target) for field, value in zip(fields, row)]
+                for row in batch
+            ])
+            copied += len(batch)
+        return copied, cleared
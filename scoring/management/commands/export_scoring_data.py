@@ -0,0 +1,50 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scoring import export
+
+
+class Command(BaseCommand):
+    help = "Write an export of archers, club memberships, registrations or scores as CSV, NDJSON or XLSX."
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=sorted(export.EXPORTS), help="What to export.")
+        parser.add_argument('--format', dest='file_format', choices=sorted(export.FORMATS), default='csv')
+        parser.add_argument('--output', '-o', help="File to write, standard output by default.")
+        parser.add_argument('--competition', help="Only rows of this competition (id).")
+        parser.add_argument('--round', help="Only rows of this round (id).")
+        parser.add_argument('--club', help="Only rows of archers of this club (id).")
+        parser.add_argument('--from', dest='from', help="First date, YYYY-MM-DD.")
+        parser.add_argument('--to', help="Last date, YYYY-MM-DD.")
+        parser.add_argument('--include-inactive', action='store_true', help="Also export inactive rows.")
+
+    def handle(self, *args, **options):
+        filters, errors = export.clean_filters(options)
+        if errors:
+            raise CommandError('\n'.join(f'--{name}: {" ".join(messages)}' for name, messages in errors.items()))
+        queryset = export.get_queryset(options['name'], include_inactive=options['include_inactive'], **filters)
+        try:
+            content = export.write_export(options['name'], options['file_format'], queryset)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        binary = options['file_format'] == 'xlsx'
+        if options['output']:
+            if binary:
+                output = open(options['output'], 'wb')
+            else:
+                output = open(options['output'], 'w', encoding='utf-8', newline='')
+            with output:
+                for chunk in content:
+                    output.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}."))
+        elif binary:
+            if sys.stdout.isatty():
+                raise CommandError('Refusing to write XLSX to a terminal, use --output.')
+            for chunk in content:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+        else:
+            for chunk in content:
+                self.stdout.write(chunk, ending='')
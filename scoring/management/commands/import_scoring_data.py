@@ -0,0 +1,59 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError
+
+from scoring import imports
+from userauth.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Create or update archers, clubs, club or category memberships or round registrations from a CSV or XLSX file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=sorted(imports.IMPORTS), help="What to import.")
+        parser.add_argument('path', help="The CSV or XLSX file.")
+        parser.add_argument('--format', dest='file_format', choices=imports.FORMATS, help="Default: from the file name.")
+        parser.add_argument('--dry-run', action='store_true', help="Only report what would change.")
+        parser.add_argument('--author', help="Username of the author of new rows, default: the first superuser.")
+        parser.add_argument('--report', help="Write the full report as JSON to this file.")
+
+    def handle(self, *args, **options):
+        if options['author']:
+            author = CustomUser.objects.filter(username=options['author']).first()
+        else:
+            author = CustomUser.objects.filter(is_superuser=True).order_by('pk').first()
+        if author is None:
+            raise CommandError('No author found, pass --author or create a superuser.')
+
+        file_format = options['file_format'] or imports.get_format(options['path'])
+        try:
+            with open(options['path'], 'rb') as file:
+                report = imports.import_file(options['name'], file, file_format, author, dry_run=options['dry_run'])
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+        except IntegrityError as exc:
+            raise CommandError(f'The rows changed while importing, nothing was written: {exc}')
+
+        for result in report['results']:
+            if result['status'] in ('error', 'conflict'):
+                problems = result.get('errors') or {'': result['conflicts']}
+                for column, messages in problems.items():
+                    prefix = f'{column}: ' if column else ''
+                    self.stderr.write(f"line {result['line']}: {result['status']}: {prefix}{' '.join(messages)}")
+            elif result['status'] == 'updated' and options['verbosity'] > 1:
+                self.stdout.write(f"line {result['line']}: updated {', '.join(result['changes'])}")
+        if report['ignored_columns']:
+            self.stdout.write(f"Ignored columns: {', '.join(report['ignored_columns'])}")
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, cls=DjangoJSONEncoder, indent=2)
+
+        summary = (
+            f"{report['created']} created, {report['updated']} updated, {report['unchanged']} unchanged, "
+            f"{report['conflicts']} conflicts, {report['errors']} errors"
+        )
+        if options['dry_run']:
+            summary = f'Dry run, nothing written: {summary}'
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from scoring.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = "Delete the sync tombstones older than SCORING_SYNC_TOMBSTONE_DAYS."
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} tombstones older than {settings.SCORING_SYNC_TOMBSTONE_DAYS} days.'
+        ))
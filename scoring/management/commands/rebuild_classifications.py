@@ -0,0 +1,32 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scoring.classifications import CHUNK_SIZE, get_season, rebuild_season
+
+
+class Command(BaseCommand):
+    help = (
+        "Evaluate the classifications of every archer with an active category membership for a season "
+        "and store the ones that changed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--season', type=int, help="Season to evaluate, the year it starts in (default: the current one).")
+        parser.add_argument('--workers', type=int, default=1, help="Processes evaluating chunks of archers.")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Archers per chunk.")
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['chunk_size'] < 1:
+            raise CommandError('--workers and --chunk-size must be at least 1.')
+        if options['workers'] > 1 and 'fork' not in multiprocessing.get_all_start_methods():
+            raise CommandError('Needs the fork start method of multiprocessing (Linux, macOS).')
+
+        season = options['season'] if options['season'] is not None else get_season()
+        start = time.perf_counter()
+        updated = rebuild_season(season, workers=options['workers'], chunk_size=options['chunk_size'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"Season {season}: {updated} category memberships updated in {elapsed:.1f}s."
+        ))
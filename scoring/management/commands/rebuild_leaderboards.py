@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from scoring.leaderboard import rebuild_competition, rebuild_round
+from scoring.models import Competition, Round
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized leaderboards from the scores."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--competition', action='append', default=[], help="Only rebuild this competition (repeatable).")
+        parser.add_argument('--round', action='append', default=[], help="Only rebuild this round (repeatable).")
+
+    def handle(self, *args, **options):
+        competition_ids = options['competition']
+        round_ids = options['round']
+        if not competition_ids and not round_ids:
+            round_ids = Round.all_objects.values_list('pk', flat=True)
+            competition_ids = Competition.all_objects.values_list('pk', flat=True)
+
+        for round_id in round_ids:
+            rebuild_round(round_id)
+        for competition_id in competition_ids:
+            rebuild_competition(competition_id)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {len(round_ids)} round and {len(competition_ids)} competition leaderboards.'
+        ))
@@ -0,0 +1,85 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+
+try:
+    import fcntl
+except ImportError:  # Windows, writes are only serialized within a process
+    fcntl = None
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_process_lock = threading.Lock()
+
+
+@contextmanager
+def write_lock(path, timeout):
+    """
+    Hold an exclusive lock on the file ``path`` for the duration of the
+    block, shared by every process and thread. Yields ``False`` when the lock
+    was not free within ``timeout`` seconds.
+    """
+    if fcntl is None:
+        acquired = _process_lock.acquire(timeout=timeout)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                _process_lock.release()
+        return
+
+    # Every holder opens the file itself, flock() locks exclude each other
+    # per open file, also between threads of one process
+    with open(path, 'a') as lock_file:
+        deadline = time.monotonic() + timeout
+        delay = 0.005
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    yield False
+                    return
+                time.sleep(delay)
+                delay = min(delay * 2, 0.05)
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class SQLiteWriteQueueMiddleware:
+    """
+    Let one write request at a time through to a SQLite database.
+
+    Write requests of every gunicorn worker wait their turn on a lock file
+    next to the database instead of racing for SQLite's write lock and
+    failing with "database is locked". Reads are not held up, with WAL they
+    never wait for the writer. Enabled by ``SCORING_SQLITE_WRITE_QUEUE``
+    when the default database is SQLite.
+    """
+    def __init__(self, get_response):
+        database = settings.DATABASES['default']
+        if not settings.SCORING_SQLITE_WRITE_QUEUE or database['ENGINE'] != 'django.db.backends.sqlite3':
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.lock_path = getattr(settings, 'SCORING_SQLITE_WRITE_LOCK', None) or f"{database['NAME']}.write-lock"
+        self.timeout = settings.SCORING_SQLITE_WRITE_TIMEOUT
+
+    def __call__(self, request):
+        if request.method in SAFE_METHODS:
+            return self.get_response(request)
+        with write_lock(self.lock_path, self.timeout) as acquired:
+            if not acquired:
+                response = JsonResponse(
+                    {'detail': 'The database is busy, try again.'},
+                    status=503,
+                )
+                response['Retry-After'] = '1'
+                return response
+            return self.get_response(request)
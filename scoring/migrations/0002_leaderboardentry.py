@@ -0,0 +1,38 @@
+# Generated by Django 6.0.1 on 2026-02-02 10:15
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scoring', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('group_type', models.CharField(blank=True, choices=[('', 'Overall'), ('category', 'Category'), ('agegroup', 'Age Group'), ('club', 'Club'), ('team', 'Team')], default='', max_length=16, verbose_name='Group type')),
+                ('group_id', models.UUIDField(blank=True, null=True, verbose_name='Group')),
+                ('rank', models.PositiveIntegerField(default=0, verbose_name='Rank')),
+                ('total_score', models.PositiveIntegerField(default=0, verbose_name='Total score')),
+                ('total_arrows', models.PositiveIntegerField(default=0, verbose_name='Total arrows')),
+                ('number_of_scores', models.PositiveIntegerField(default=0, verbose_name='Number of scores')),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+                ('archer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='scoring.archer', verbose_name='Archer')),
+                ('competition', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='scoring.competition', verbose_name='Competition')),
+                ('round', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='scoring.round', verbose_name='Round')),
+            ],
+            options={
+                'verbose_name': 'Leaderboard Entry',
+                'verbose_name_plural': 'Leaderboard Entries',
+                'db_table': 'leaderboardentries',
+                'ordering': ['rank'],
+                'indexes': [models.Index(fields=['competition', 'round', 'group_type', 'group_id', 'rank', 'id'], name='leaderboard_page_idx'), models.Index(fields=['archer', 'round', 'competition'], name='leaderboard_archer_idx')],
+            },
+        ),
+    ]
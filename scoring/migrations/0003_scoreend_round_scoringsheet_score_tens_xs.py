@@ -0,0 +1,51 @@
+# Generated by Django 6.0.1 on 2026-02-04 09:30
+
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scoring', '0002_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='round',
+            name='scoringsheet',
+            field=models.ForeignKey(blank=True, help_text='Shape of the ends, rows x arrows. format: not required', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='round_scoringsheet', to='scoring.scoringsheet', verbose_name='Scoring sheet'),
+        ),
+        migrations.AddField(
+            model_name='score',
+            name='tens',
+            field=models.PositiveIntegerField(default=0, help_text='Number of 10s including Xs, derived from the ends', verbose_name='10s'),
+        ),
+        migrations.AddField(
+            model_name='score',
+            name='xs',
+            field=models.PositiveIntegerField(default=0, help_text='Number of Xs, derived from the ends', verbose_name='Xs'),
+        ),
+        migrations.CreateModel(
+            name='ScoreEnd',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('end_number', models.PositiveSmallIntegerField(help_text='format: required, 1 up to the rows of the scoring sheet', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(20)], verbose_name='End')),
+                ('arrows', models.BinaryField(default=bytes, max_length=20, verbose_name='Arrows')),
+                ('score', models.ForeignKey(help_text='format: required', on_delete=django.db.models.deletion.CASCADE, related_name='ends', to='scoring.score', verbose_name='Score')),
+            ],
+            options={
+                'verbose_name': 'Score End',
+                'verbose_name_plural': 'Score Ends',
+                'db_table': 'scoreends',
+                'ordering': ['end_number'],
+                'constraints': [models.UniqueConstraint(fields=('score', 'end_number'), name='scoreend_score_end_unique')],
+            },
+        ),
+    ]
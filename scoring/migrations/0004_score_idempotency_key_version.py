@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-02-06 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scoring', '0003_scoreend_round_scoringsheet_score_tens_xs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='score',
+            name='idempotency_key',
+            field=models.CharField(blank=True, editable=False, help_text='Client generated key, a retried submission with the same key creates nothing', max_length=64, null=True, verbose_name='Idempotency key'),
+        ),
+        migrations.AddField(
+            model_name='score',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Incremented on every save, used for optimistic concurrency', verbose_name='Version'),
+        ),
+        migrations.AddConstraint(
+            model_name='score',
+            constraint=models.UniqueConstraint(condition=models.Q(('idempotency_key__isnull', False)), fields=('idempotency_key',), name='score_idempotency_key_unique'),
+        ),
+    ]
@@ -0,0 +1,176 @@
+# Generated by Django 6.0.1 on 2026-02-08 10:12
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+SORT_KEYS = {
+    'disciplinemembership': 'discipline',
+    'categorymembership': 'category',
+    'teammembership': 'team',
+    'roundmembership': 'round',
+    'competitionmembership': 'competition',
+}
+
+MEMBERSHIPS = {
+    'disciplinemembership': ('discipline', 'archer'),
+    'categorymembership': ('category', 'archer'),
+    'teammembership': ('team', 'archer'),
+    'clubmembership': ('club', 'archer'),
+    'roundmembership': ('round', 'archer'),
+    'competitionmembership': ('competition', 'round'),
+}
+
+
+def fill_sort_keys(apps, schema_editor):
+    for model_name, parent in SORT_KEYS.items():
+        model = apps.get_model('scoring', model_name)
+        parent_model = model._meta.get_field(parent).related_model
+        model.objects.update(sort_key=Subquery(
+            parent_model.objects.filter(pk=OuterRef(f'{parent}_id')).values('name')[:1]
+        ))
+
+
+def deactivate_duplicates(apps, schema_editor):
+    """
+    Keep the oldest active membership of every pair active, so the unique
+    constraints below can be created on an existing database.
+    """
+    for model_name, fields in MEMBERSHIPS.items():
+        model = apps.get_model('scoring', model_name)
+        duplicates = model.objects.filter(is_active=True).values(*fields).annotate(
+            count=Count('id'),
+        ).filter(count__gt=1)
+        for pair in duplicates:
+            ids = list(model.objects.filter(
+                is_active=True, **{field: pair[field] for field in fields},
+            ).order_by('created_at', 'id').values_list('id', flat=True))
+            model.objects.filter(id__in=ids[1:]).update(is_active=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scoring', '0004_score_idempotency_key_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='disciplinemembership',
+            name='sort_key',
+            field=models.CharField(default='', editable=False, help_text='Copy of the name this membership is ordered by', max_length=128, verbose_name='Sort key'),
+        ),
+        migrations.AddField(
+            model_name='categorymembership',
+            name='sort_key',
+            field=models.CharField(default='', editable=False, help_text='Copy of the name this membership is ordered by', max_length=128, verbose_name='Sort key'),
+        ),
+        migrations.AddField(
+            model_name='teammembership',
+            name='sort_key',
+            field=models.CharField(default='', editable=False, help_text='Copy of the name this membership is ordered by', max_length=128, verbose_name='Sort key'),
+        ),
+        migrations.AddField(
+            model_name='roundmembership',
+            name='sort_key',
+            field=models.CharField(default='', editable=False, help_text='Copy of the name this membership is ordered by', max_length=128, verbose_name='Sort key'),
+        ),
+        migrations.AddField(
+            model_name='competitionmembership',
+            name='sort_key',
+            field=models.CharField(default='', editable=False, help_text='Copy of the name this membership is ordered by', max_length=128, verbose_name='Sort key'),
+        ),
+        migrations.RunPython(fill_sort_keys, migrations.RunPython.noop),
+        migrations.RunPython(deactivate_duplicates, migrations.RunPython.noop),
+        migrations.AlterModelOptions(
+            name='disciplinemembership',
+            options={'ordering': ['sort_key'], 'verbose_name': 'Discipline Membership', 'verbose_name_plural': 'Discipline Memberships'},
+        ),
+        migrations.AlterModelOptions(
+            name='categorymembership',
+            options={'ordering': ['sort_key'], 'verbose_name': 'Category Membership', 'verbose_name_plural': 'Category Memberships'},
+        ),
+        migrations.AlterModelOptions(
+            name='teammembership',
+            options={'ordering': ['sort_key'], 'verbose_name': 'Team Membership', 'verbose_name_plural': 'Team Memberships'},
+        ),
+        migrations.AlterModelOptions(
+            name='roundmembership',
+            options={'ordering': ['sort_key'], 'verbose_name': 'Round Membership', 'verbose_name_plural': 'Round Memberships'},
+        ),
+        migrations.AlterModelOptions(
+            name='competitionmembership',
+            options={'ordering': ['sort_key'], 'verbose_name': 'Competition Membership', 'verbose_name_plural': 'Competition Memberships'},
+        ),
+        migrations.AddIndex(
+            model_name='disciplinemembership',
+            index=models.Index(fields=['sort_key', 'id'], name='discmember_sort_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='disciplinemembership',
+            index=models.Index(fields=['archer', 'discipline'], name='discmember_archer_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='disciplinemembership',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('discipline', 'archer'), name='discmember_active_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='categorymembership',
+            index=models.Index(fields=['sort_key', 'id'], name='catmember_sort_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='categorymembership',
+            index=models.Index(fields=['archer', 'category'], name='catmember_archer_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='categorymembership',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('category', 'archer'), name='catmember_active_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='teammembership',
+            index=models.Index(fields=['sort_key', 'id'], name='teammember_sort_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teammembership',
+            index=models.Index(fields=['archer', 'team'], name='teammember_archer_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='teammembership',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('team', 'archer'), name='teammember_active_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='clubmembership',
+            index=models.Index(fields=['start_date', 'id'], name='clubmember_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clubmembership',
+            index=models.Index(fields=['archer', 'club'], name='clubmember_archer_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='clubmembership',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('club', 'archer'), name='clubmember_active_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='roundmembership',
+            index=models.Index(fields=['sort_key', 'id'], name='roundmember_sort_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='roundmembership',
+            index=models.Index(fields=['archer', 'round'], name='roundmember_archer_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='roundmembership',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('round', 'archer'), name='roundmember_active_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='competitionmembership',
+            index=models.Index(fields=['sort_key', 'id'], name='compmember_sort_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='competitionmembership',
+            index=models.Index(fields=['round', 'competition'], name='compmember_round_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='competitionmembership',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('competition', 'round'), name='compmember_active_unique'),
+        ),
+    ]
@@ -0,0 +1,117 @@
+# Generated by Django 6.0.1 on 2026-02-09 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scoring', '0005_membership_sort_key_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='disciplinemembership',
+            name='discmember_sort_idx',
+        ),
+        migrations.AddIndex(
+            model_name='disciplinemembership',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['sort_key', 'id'], name='discmember_active_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='clubmembership',
+            name='clubmember_start_idx',
+        ),
+        migrations.AddIndex(
+            model_name='clubmembership',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['start_date', 'id'], name='clubmember_active_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='categorymembership',
+            name='catmember_sort_idx',
+        ),
+        migrations.AddIndex(
+            model_name='categorymembership',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['sort_key', 'id'], name='catmember_active_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='teammembership',
+            name='teammember_sort_idx',
+        ),
+        migrations.AddIndex(
+            model_name='teammembership',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['sort_key', 'id'], name='teammember_active_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='roundmembership',
+            name='roundmember_sort_idx',
+        ),
+        migrations.AddIndex(
+            model_name='roundmembership',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['sort_key', 'id'], name='roundmember_active_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='competitionmembership',
+            name='compmember_sort_idx',
+        ),
+        migrations.AddIndex(
+            model_name='competitionmembership',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['sort_key', 'id'], name='compmember_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archer',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['last_name', 'id'], name='archer_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='discipline',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name', 'id'], name='discipline_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='club',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name', 'id'], name='club_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['created_at', 'id'], name='category_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='agegroup',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name', 'id'], name='agegroup_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='team',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name', 'id'], name='team_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scoringsheet',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name', 'id'], name='scoringsheet_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='targetfacenamechoice',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name', 'id'], name='tfnamechoice_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='targetface',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name', 'id'], name='targetface_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='round',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name', 'id'], name='round_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='competition',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name', 'id'], name='competition_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='score',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['created_at', 'id'], name='score_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='score',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['round_archer'], name='score_roundarcher_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scoreend',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['score', 'end_number'], name='scoreend_active_idx'),
+        ),
+    ]
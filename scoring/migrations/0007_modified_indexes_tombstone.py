@@ -0,0 +1,107 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:00
+
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scoring', '0006_active_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('model', models.CharField(max_length=64, verbose_name='Model')),
+                ('object_id', models.UUIDField(verbose_name='Object')),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Deleted at')),
+            ],
+            options={
+                'verbose_name': 'Tombstone',
+                'verbose_name_plural': 'Tombstones',
+                'db_table': 'tombstones',
+                'ordering': ['deleted_at'],
+                'indexes': [models.Index(fields=['deleted_at', 'model', 'object_id'], name='tombstone_deleted_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archer',
+            index=models.Index(fields=['modified_at', 'id'], name='archer_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='discipline',
+            index=models.Index(fields=['modified_at', 'id'], name='discipline_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='disciplinemembership',
+            index=models.Index(fields=['modified_at', 'id'], name='discmember_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='club',
+            index=models.Index(fields=['modified_at', 'id'], name='club_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clubmembership',
+            index=models.Index(fields=['modified_at', 'id'], name='clubmember_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['modified_at', 'id'], name='category_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='agegroup',
+            index=models.Index(fields=['modified_at', 'id'], name='agegroup_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='categorymembership',
+            index=models.Index(fields=['modified_at', 'id'], name='catmember_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='team',
+            index=models.Index(fields=['modified_at', 'id'], name='team_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teammembership',
+            index=models.Index(fields=['modified_at', 'id'], name='teammember_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scoringsheet',
+            index=models.Index(fields=['modified_at', 'id'], name='scoringsheet_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='targetfacenamechoice',
+            index=models.Index(fields=['modified_at', 'id'], name='tfnamechoice_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='targetface',
+            index=models.Index(fields=['modified_at', 'id'], name='targetface_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='round',
+            index=models.Index(fields=['modified_at', 'id'], name='round_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='roundmembership',
+            index=models.Index(fields=['modified_at', 'id'], name='roundmember_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='score',
+            index=models.Index(fields=['modified_at', 'id'], name='score_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scoreend',
+            index=models.Index(fields=['modified_at', 'id'], name='scoreend_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='competition',
+            index=models.Index(fields=['modified_at', 'id'], name='competition_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='competitionmembership',
+            index=models.Index(fields=['modified_at', 'id'], name='compmember_modified_idx'),
+        ),
+    ]
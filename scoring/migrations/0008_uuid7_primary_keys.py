@@ -0,0 +1,117 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:00
+
+import scoring.ids
+from django.db import migrations, models
+
+
+# Django keeps the default of a UUIDField in Python, the columns do not
+# change: only the migration state learns about the new default, and the
+# uuid4 keys of existing rows stay as they are.
+ALTER_IDS = [
+    migrations.AlterField(
+        model_name='archer',
+        name='id',
+        field=models.UUIDField(default=scoring.ids.uuid7, editable=False, primary_key=True, serialize=False),
+    ),
+    migrations.AlterField(
+        model_name='discipline',
+        name='id',
+        field=models.UUIDField(default=scoring.ids.uuid7, editable=False, primary_key=True, serialize=False),
+    ),
+    migrations.AlterField(
+        model_name='disciplinemembership',
+        name='id',
+        field=models.UUIDField(default=scoring.ids.uuid7, editable=False, primary_key=True, serialize=False),
+    ),
+    migrations.AlterField(
+        model_name='club',
+        name='id',
+        field=models.UUIDField(default=scoring.ids.uuid7, editable=False, primary_key=True, serialize=False),
+    ),
+    migrations.AlterField(
+        model_name='clubmembership',
+        name='id',
+        field=models.UUIDField(default=scoring.ids.uuid7, editable=False, primary_key=True, serialize=False),
+    ),
+    migrations.AlterField(
+        model_name='category',
+        name='id',
+        field=models.UUIDField(default=scoring.ids.uuid7, editable=False, primary_key=True, serialize=False),
+    ),
+    migrations.AlterField(
+        model_name='agegroup',
+        name='id',
+        field=models.UUIDField(default=scoring.ids.uuid7, editable=False, primary_key=True, serialize=False),
+    ),
+    migrations.AlterField(
+        model_name='categorymembership',
+        name='id',
+        field=models.UUIDField(default=scoring.ids.uuid7, editable=False, primary_key=True, serialize=False),
+    ),
+    migrations.AlterField(
+        model_name='team',
+        name='id',
+        field=models.UUIDField(default=scoring.ids.uuid7, editable=False, primary_key=True, serialize=False),
+    ),
+    migrations.AlterField(
+        model_name='teammembership',
+        name='id',
+        field=models.UUIDField(default=scoring.ids.uuid7, editable=False, primary_key=True, serialize=False),
+    ),
+    migrations.AlterField(
+        model_name='scoringsheet',
+        name='id',
+        field=models.UUIDField(default=scoring.ids.uuid7, editable=False, primary_key=True, serialize=False),
+    ),
+    migrations.AlterField(
+        model_name='targetfacenamechoice',
+        name='id',
+        field=models.UUIDField(default=scoring.ids.uuid7, editable=False, primary_key=True, serialize=False),
+    ),
+    migrations.AlterField(
+        model_name='targetface',
+        name='id',
+        field=models.UUIDField(default=scoring.ids.uuid7, editable=False, primary_key=True, serialize=False),
+    ),
+    migrations.AlterField(
+        model_name='round',
+        name='id',
+        field=models.UUIDField(default=scoring.ids.uuid7, editable=False, primary_key=True, serialize=False),
+    ),
+    migrations.AlterField(
+        model_name='roundmembership',
+        name='id',
+        field=models.UUIDField(default=scoring.ids.uuid7, editable=False, primary_key=True, serialize=False),
+    ),
+    migrations.AlterField(
+        model_name='score',
+        name='id',
+        field=models.UUIDField(default=scoring.ids.uuid7, editable=False, primary_key=True, serialize=False),
+    ),
+    migrations.AlterField(
+        model_name='scoreend',
+        name='id',
+        field=models.UUIDField(default=scoring.ids.uuid7, editable=False, primary_key=True, serialize=False),
+    ),
+    migrations.AlterField(
+        model_name='competition',
+        name='id',
+        field=models.UUIDField(default=scoring.ids.uuid7, editable=False, primary_key=True, serialize=False),
+    ),
+    migrations.AlterField(
+        model_name='competitionmembership',
+        name='id',
+        field=models.UUIDField(default=scoring.ids.uuid7, editable=False, primary_key=True, serialize=False),
+    ),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scoring', '0007_modified_indexes_tombstone'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(state_operations=ALTER_IDS),
+    ]
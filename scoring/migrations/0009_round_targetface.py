@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-18 14:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scoring', '0008_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='round',
+            name='targetface',
+            field=models.ForeignKey(blank=True, help_text='Sets the most an arrow can score. format: not required', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='round_targetface', to='scoring.targetfacenamechoice', verbose_name='Target face'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:00
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scoring', '0009_round_targetface'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='round',
+            name='distance',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='In metres, for handicaps. format: not required, default: usual for the target face', null=True, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(200)], verbose_name='Distance'),
+        ),
+    ]
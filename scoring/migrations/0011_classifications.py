@@ -0,0 +1,52 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:00
+
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+import scoring.ids
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scoring', '0010_round_distance'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Classification',
+            fields=[
+                ('id', models.UUIDField(default=scoring.ids.uuid7, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('name', models.CharField(help_text='format: required, max-64', max_length=64, verbose_name='Name')),
+                ('max_handicap', models.PositiveSmallIntegerField(help_text='Worst handicap of a qualifying score. format: required, 0-150', validators=[django.core.validators.MaxValueValidator(150)], verbose_name='Handicap')),
+                ('qualifying_scores', models.PositiveSmallIntegerField(default=3, help_text='Scores needed in one season. format: required, default=3', validators=[django.core.validators.MinValueValidator(1)], verbose_name='Qualifying scores')),
+                ('info', models.TextField(blank=True, help_text='format: not required', null=True, verbose_name='Info')),
+                ('agegroup', models.ForeignKey(blank=True, help_text='format: not required, empty: every age group', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='classifications', to='scoring.agegroup', verbose_name='Age Group')),
+                ('author', models.ForeignKey(default=1, help_text='format: required, default=1 (superuser)', on_delete=django.db.models.deletion.PROTECT, related_name='classification_author', to=settings.AUTH_USER_MODEL, verbose_name='Author')),
+                ('category', models.ForeignKey(help_text='format: required', on_delete=django.db.models.deletion.PROTECT, related_name='classifications', to='scoring.category', verbose_name='Category')),
+            ],
+            options={
+                'verbose_name': 'Classification',
+                'verbose_name_plural': 'Classifications',
+                'db_table': 'classifications',
+                'ordering': ['max_handicap', 'name'],
+                'indexes': [models.Index(condition=models.Q(('is_active', True)), fields=['category', 'max_handicap'], name='classification_active_idx'), models.Index(fields=['modified_at', 'id'], name='classification_modified_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='categorymembership',
+            name='classification',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Best classification of the season, kept by scoring.classifications', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='categorymemberships', to='scoring.classification', verbose_name='Classification'),
+        ),
+        migrations.AddField(
+            model_name='categorymembership',
+            name='classification_season',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='Classification season'),
+        ),
+    ]
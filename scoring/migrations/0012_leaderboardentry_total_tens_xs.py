@@ -0,0 +1,74 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:00
+
+from django.db import migrations, models
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def rebuild_tie_breaks(apps, schema_editor):
+    """
+    Fill the 10s and Xs of the existing leaderboard entries from their active
+    scores and rank every leaderboard again, ties now broken on them.
+    """
+    LeaderboardEntry = apps.get_model('scoring', 'LeaderboardEntry')
+    Score = apps.get_model('scoring', 'Score')
+    CompetitionMembership = apps.get_model('scoring', 'CompetitionMembership')
+
+    scopes = LeaderboardEntry.objects.values_list('competition_id', 'round_id').distinct().order_by()
+    for competition_id, round_id in scopes:
+        scores = Score.objects.filter(is_active=True)
+        if round_id is not None:
+            scores = scores.filter(round_archer__round_id=round_id)
+        else:
+            scores = scores.filter(round_archer__round_id__in=CompetitionMembership.objects.filter(
+                competition_id=competition_id, is_active=True,
+            ).values('round_id'))
+        totals = {
+            row['archer']: row
+            for row in scores.values(archer=F('round_archer__archer_id')).annotate(
+                total_tens=Coalesce(Sum('tens'), Value(0)),
+                total_xs=Coalesce(Sum('xs'), Value(0)),
+            ).order_by()
+        }
+
+        groups = {}
+        for entry in LeaderboardEntry.objects.filter(competition_id=competition_id, round_id=round_id):
+            row = totals.get(entry.archer_id, {})
+            entry.total_tens = row.get('total_tens', 0)
+            entry.total_xs = row.get('total_xs', 0)
+            groups.setdefault((entry.group_type, entry.group_id), []).append(entry)
+
+        entries = []
+        for group in groups.values():
+            group.sort(key=lambda entry: (-entry.total_score, -entry.total_tens, -entry.total_xs, entry.total_arrows))
+            rank = 0
+            previous = None
+            for position, entry in enumerate(group, start=1):
+                tie = (entry.total_score, entry.total_tens, entry.total_xs, entry.total_arrows)
+                if tie != previous:
+                    rank = position
+                    previous = tie
+                entry.rank = rank
+            entries += group
+        LeaderboardEntry.objects.bulk_update(entries, ['total_tens', 'total_xs', 'rank'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scoring', '0011_classifications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leaderboardentry',
+            name='total_tens',
+            field=models.PositiveIntegerField(default=0, verbose_name='Total 10s'),
+        ),
+        migrations.AddField(
+            model_name='leaderboardentry',
+            name='total_xs',
+            field=models.PositiveIntegerField(default=0, verbose_name='Total Xs'),
+        ),
+        migrations.RunPython(rebuild_tie_breaks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,330 @@
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import IntegrityError, transaction
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from . import reference
+from .prefetch import apply_prefetch_plan, get_serializer_models
+from .summaries import get_summary
+
+
+class SparseFieldsetMixin:
+    """
+    Honour ``?fields=a,b,c`` on read requests.
+
+    The serializer only renders the requested fields and the queryset only
+    selects the matching columns, so a client asking for ``id,last_name``
+    does not pay for every text column of the table.
+    """
+    fields_query_param = 'fields'
+
+    def get_sparse_fields(self):
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        raw = request.query_params.get(self.fields_query_param)
+        if not raw:
+            return None
+        declared = self.get_serializer_class().Meta.fields
+        requested = {name.strip() for name in raw.split(',') if name.strip()}
+        unknown = requested.difference(declared)
+        if unknown:
+            raise ValidationError({
+                self.fields_query_param: [f"Unknown field: {name}" for name in sorted(unknown)],
+            })
+        return [name for name in declared if name in requested]
+
+    def get_sparse_columns(self, model, fields):
+        columns = {model._meta.pk.name}
+        for name in fields:
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.many_to_many:
+                columns.add(field.name)
+        return columns
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+        return queryset.only(*self.get_sparse_columns(queryset.model, fields))
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+
+class PrefetchPlanMixin:
+    """
+    Apply the ``select_related``/``prefetch_related`` plan derived from the
+    serializer tree (see :mod:`scoring.prefetch`) to the view's queryset.
+    Nested lists only hold active rows unless the request asks for
+    ``?include_inactive=1``.
+    """
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        get_sparse_fields = getattr(self, 'get_sparse_fields', None)
+        fields = get_sparse_fields() if get_sparse_fields is not None else None
+        request = getattr(self, 'request', None)
+        include_inactive = request is not None and includes_inactive(request)
+        return apply_prefetch_plan(
+            queryset, self.get_serializer_class()(fields=fields), include_inactive=include_inactive,
+        )
+
+
+def includes_inactive(request, query_param='include_inactive'):
+    return request.query_params.get(query_param, '').lower() in ('1', 'true', 'yes')
+
+
+class ActiveRowsMixin:
+    """
+    Serve the active rows only, unless the request asks for
+    ``?include_inactive=1``.
+
+    The view's queryset comes from the model's active ``objects`` manager;
+    with the option it is replaced by ``all_objects``. Put this mixin right
+    before the generic view so the other mixins refine the right queryset.
+    """
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if includes_inactive(self.request):
+            queryset = queryset.model.all_objects.all()
+        return queryset
+
+
+class ReferenceCacheMixin:
+    """
+    Serve the GET list and detail responses of reference data from
+    :mod:`scoring.reference`. Only ``200 OK`` responses are cached.
+    """
+    def cached_response(self, render, request, *args, **kwargs):
+        rendered = []
+
+        def load():
+            response = render(request, *args, **kwargs)
+            rendered.append(response)
+            return response.data if response.status_code == status.HTTP_200_OK else None
+
+        data = reference.read_through(self.queryset.model, reference.request_key(request), load)
+        if rendered:
+            return rendered[0]
+        return Response(data)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+
+class ConditionalGetMixin:
+    """
+    Send ``ETag`` and ``Last-Modified`` with GET responses and answer
+    ``304 Not Modified`` to a client whose copy is current, before anything
+    is serialized.
+
+    Lists are validated by the row count and ``MAX(modified_at)`` of the
+    model from the cached summaries (see :mod:`scoring.summaries`), which
+    change with any row of the table, so filtered lists and pages are never
+    served stale. Details are validated by the object's ``modified_at``, or
+    ``version`` for versioned models so the ETag can be sent back in
+    ``If-Match``. The summaries of the models nested in the response are
+    folded in: a new membership changes the archers a club renders.
+    Reference data (see :mod:`scoring.reference`) uses its version token and
+    costs no query at all. Views listing the rows of the requesting user set
+    ``etag_per_user``, so one user's copy never validates another's.
+    """
+    etag_per_user = False
+
+    def get_validator_models(self):
+        get_sparse_fields = getattr(self, 'get_sparse_fields', None)
+        fields = get_sparse_fields() if get_sparse_fields is not None else None
+        return [
+            model for model in get_serializer_models(self.get_serializer_class()(fields=fields))
+            if hasattr(model, 'all_objects')
+        ]
+
+    def get_validators(self, instance=None):
+        """
+        Return ``(etag, last_modified)``, ``last_modified`` may be ``None``.
+        """
+        model = self.queryset.model
+        user_parts = ['user', self.request.user.pk] if self.etag_per_user else []
+        if reference.is_reference_model(model):
+            return self.make_etag(reference.get_version(model), *user_parts), None
+
+        nested = self.get_validator_models()
+        if instance is not None and hasattr(instance, 'version') and not nested:
+            return f'W/"{instance.version}"', instance.modified_at
+
+        if instance is not None:
+            parts = [instance.pk, instance.modified_at]
+            last_modified = instance.modified_at
+        else:
+            summary = get_summary(model, include_inactive=True)
+            parts = [summary['count'], summary['last_modified'], *user_parts]
+            last_modified = summary['last_modified']
+        for related in nested:
+            summary = get_summary(related, include_inactive=True)
+            parts += [related._meta.label_lower, summary['count'], summary['last_modified']]
+            if summary['last_modified'] is not None:
+                last_modified = max(filter(None, (last_modified, summary['last_modified'])))
+        return self.make_etag(*parts), last_modified
+
+    def make_etag(self, *parts):
+        return 'W/"%s"' % hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+    def conditional_response(self, request, etag, last_modified, render):
+        timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = render()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        # The rows and their ETag may depend on who is asking
+        patch_vary_headers(response, ['Accept', 'Cookie', 'Authorization'])
+        return response
+
+    def list(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        return self.conditional_response(
+            request, etag, last_modified, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        if reference.is_reference_model(self.queryset.model):
+            etag, last_modified = self.get_validators()
+            render = lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+        else:
+            instance = self.get_object()
+            etag, last_modified = self.get_validators(instance)
+            render = lambda: Response(self.get_serializer(instance).data)
+        return self.conditional_response(request, etag, last_modified, render)
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The resource was modified by someone else, reload it and try again.'
+    default_code = 'precondition_failed'
+
+
+class IdempotentCreateMixin:
+    """
+    Make POST safe to retry: a create carrying an ``Idempotency-Key`` header
+    (or ``idempotency_key`` field) that was already used returns the row
+    created the first time with ``200 OK`` instead of inserting again.
+
+    The key is looked up through the unique index on ``idempotency_key`` and
+    the unique constraint settles two retries racing each other.
+    """
+    idempotency_key_field = 'idempotency_key'
+    idempotency_key_header = 'HTTP_IDEMPOTENCY_KEY'
+    idempotency_key_max_length = 64
+
+    def get_idempotency_key(self, request):
+        key = request.META.get(self.idempotency_key_header)
+        if not key and hasattr(request.data, 'get'):
+            key = request.data.get(self.idempotency_key_field)
+        if not key:
+            return None
+        key = str(key).strip()
+        if len(key) > self.idempotency_key_max_length:
+            raise ValidationError({
+                self.idempotency_key_field: [
+                    f"Ensure this field has no more than {self.idempotency_key_max_length} characters."
+                ],
+            })
+        return key
+
+    def get_replayed(self, key):
+        return self.get_queryset().model.all_objects.filter(**{self.idempotency_key_field: key}).first()
+
+    def replay_response(self, instance):
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data, status=status.HTTP_200_OK, headers={'Idempotent-Replayed': 'true'})
+
+    def create(self, request, *args, **kwargs):
+        key = self.get_idempotency_key(request)
+        if key is None:
+            return super().create(request, *args, **kwargs)
+
+        replayed = self.get_replayed(key)
+        if replayed is not None:
+            return self.replay_response(replayed)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            with transaction.atomic():
+                serializer.save(**{self.idempotency_key_field: key})
+        except IntegrityError:
+            replayed = self.get_replayed(key)
+            if replayed is None:
+                raise
+            return self.replay_response(replayed)
+        headers = self.get_success_headers(serializer.data)
+        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+
+
+class OptimisticConcurrencyMixin:
+    """
+    Reject PUT/PATCH with ``412 Precondition Failed`` when the client's copy
+    is stale. The expected version comes from an ``If-Match: "<version>"``
+    header or a ``version`` field; without either the update goes through as
+    before. An ``If-Match`` holding another ETag of the detail (see
+    :class:`ConditionalGetMixin`) is compared with the current one.
+    """
+    version_field = 'version'
+
+    def get_expected_version(self, request, instance):
+        raw = request.META.get('HTTP_IF_MATCH')
+        if raw and raw.strip() == '*':
+            return None
+        if raw:
+            etag = raw.strip()
+            raw = etag[2:] if etag.startswith('W/') else etag
+            raw = raw.strip('"')
+            if not raw.isdigit():
+                get_validators = getattr(self, 'get_validators', None)
+                if get_validators is None or get_validators(instance)[0] != etag:
+                    raise PreconditionFailed()
+                return getattr(instance, self.version_field)
+        elif hasattr(request.data, 'get'):
+            raw = request.data.get(self.version_field)
+        if raw in (None, ''):
+            return None
+        try:
+            return int(raw)
+        except (TypeError, ValueError):
+            raise ValidationError({self.version_field: ["A valid integer is required."]})
+
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        expected = self.get_expected_version(self.request, instance)
+        if expected is None:
+            return super().perform_update(serializer)
+
+        with transaction.atomic():
+            # A no-op UPDATE guarded by the version both checks the version and
+            # locks the row (the database on SQLite) until the save commits.
+            locked = type(instance).all_objects.filter(
+                pk=instance.pk, **{self.version_field: expected},
+            ).update(**{self.version_field: expected})
+            if not locked:
+                raise PreconditionFailed()
+            setattr(instance, self.version_field, expected)
+            super().perform_update(serializer)
@@ -3,7 +3,8 @@ from django.db import models
 from django.utils import timezone
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
-from django_extensions.db.fields import AutoSlugField
+from .ids import uuid7
+from .slugs import BatchSlugField
 from django.core.validators import MaxValueValidator, MinValueValidator
 
 from userauth.models import CustomUser
@@ -27,17 +28,54 @@ from common.blocks import (
 
 from wagtail.snippets.models import register_snippet
 
+class ActiveManager(models.Manager):
+    """
+    Only the rows with ``is_active=True``.
+    """
+    def get_queryset(self):
+        return super().get_queryset().filter(is_active=True)
+
 class BaseScoringModel(ClusterableModel):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Time-ordered, new rows are appended to the primary key index
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     created_at = models.DateTimeField(default=timezone.now, editable=False)
     modified_at = models.DateTimeField(auto_now=True)
 
     is_active = models.BooleanField(default=True)
 
+    # all_objects is declared first and so stays the default manager: the
+    # admin, relations and uniqueness checks still see inactive rows.
+    all_objects = models.Manager()
+    objects = ActiveManager()
+
     class Meta:
         abstract = True
 
+class SortKeyModel(BaseScoringModel):
+    """
+    A membership ordered by the name of the object it belongs to. The name is
+    copied into ``sort_key`` on save, so the default ordering needs no join.
+    """
+    sort_key_from = None
+
+    sort_key = models.CharField(
+        max_length=128,
+        default='',
+        editable=False,
+        verbose_name=_("Sort key"),
+        help_text=_("Copy of the name this membership is ordered by"),
+    )
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.sort_key = getattr(self, self.sort_key_from).name
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'sort_key'}
+        super().save(*args, **kwargs)
+
 # TODO: Supercharging Archer Snippet with Advanced Features
 class Archer(BaseScoringModel):
     def __init__(self, *args, **kwargs):
@@ -67,7 +105,7 @@ class Archer(BaseScoringModel):
         verbose_name=_("Middle name"),
         help_text=_("format: not required, max-6")
     )
-    slug = AutoSlugField(populate_from='last_name',editable=True)
+    slug = BatchSlugField(populate_from='last_name',editable=True)
     archer_image = models.ForeignKey(
         'wagtailimages.Image', 
         null=True, 
@@ -169,6 +207,10 @@ class Archer(BaseScoringModel):
         ordering = ['last_name']
         verbose_name = _("Archer")
         verbose_name_plural = _("Archers")
+        indexes = [
+            models.Index(fields=['last_name', 'id'], condition=models.Q(is_active=True), name='archer_active_idx'),
+            models.Index(fields=['modified_at', 'id'], name='archer_modified_idx'),
+        ]
 
     def __str__(self):
         s_middle_name = ""
@@ -206,7 +248,7 @@ class Discipline(BaseScoringModel):
         verbose_name=_("Name"),
         help_text=_("format: required, max-64")
     )
-    slug = AutoSlugField(
+    slug = BatchSlugField(
         populate_from='name',
         editable=True
     )
@@ -239,6 +281,10 @@ class Discipline(BaseScoringModel):
         ordering = ['name']
         verbose_name = _("Discipline")
         verbose_name_plural = _("Disciplines")
+        indexes = [
+            models.Index(fields=['name', 'id'], condition=models.Q(is_active=True), name='discipline_active_idx'),
+            models.Index(fields=['modified_at', 'id'], name='discipline_modified_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -247,7 +293,9 @@ class Discipline(BaseScoringModel):
         return self.name
 
 # TODO: Supercharging DisciplineMembership Snippet with Advanced Features
-class DisciplineMembership(BaseScoringModel):
+class DisciplineMembership(SortKeyModel):
+    sort_key_from = 'discipline'
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -267,7 +315,7 @@ class DisciplineMembership(BaseScoringModel):
         help_text=_("format: required"),
         related_name='archer_disciplinemembership'
     )
-    slug = AutoSlugField(populate_from=('archer__last_name', 'discipline__name'), editable=True)
+    slug = BatchSlugField(populate_from=('archer__last_name', 'discipline__name'), editable=True)
     info = models.TextField(
         null=True,
         blank=True,
@@ -286,9 +334,21 @@ class DisciplineMembership(BaseScoringModel):
 
     class Meta:
         db_table = 'disciplinememberships'
-        ordering = ['discipline__name']
+        ordering = ['sort_key']
         verbose_name = _("Discipline Membership")
         verbose_name_plural = _("Discipline Memberships")
+        indexes = [
+            models.Index(fields=['sort_key', 'id'], condition=models.Q(is_active=True), name='discmember_active_idx'),
+            models.Index(fields=['modified_at', 'id'], name='discmember_modified_idx'),
+            models.Index(fields=['archer', 'discipline'], name='discmember_archer_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['discipline', 'archer'],
+                condition=models.Q(is_active=True),
+                name='discmember_active_unique',
+            ),
+        ]
 
     def __str__(self):
         return f"{str(self.archer)} - {str(self.discipline)}"
@@ -310,7 +370,7 @@ class Club(BaseScoringModel):
         verbose_name=_("Name"),
         help_text=_("format: required, max-64")
     )
-    slug = AutoSlugField(populate_from='name',editable=True)
+    slug = BatchSlugField(populate_from='name',editable=True)
     address = models.CharField(
         max_length=128,
         null=True,
@@ -401,6 +461,10 @@ class Club(BaseScoringModel):
         ordering = ['name']
         verbose_name = _("Club")
         verbose_name_plural = _("Clubs")
+        indexes = [
+            models.Index(fields=['name', 'id'], condition=models.Q(is_active=True), name='club_active_idx'),
+            models.Index(fields=['modified_at', 'id'], name='club_modified_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -429,7 +493,7 @@ class ClubMembership(BaseScoringModel):
         help_text=_("format: required"),
         related_name='clubmember_archer'
     )
-    slug = AutoSlugField(populate_from=('archer__last_name', 'club__name'), editable=True)
+    slug = BatchSlugField(populate_from=('archer__last_name', 'club__name'), editable=True)
     start_date = models.DateField(
         null=True,
         blank=True,
@@ -472,6 +536,18 @@ class ClubMembership(BaseScoringModel):
         ordering = ['start_date']
         verbose_name = _("Club Membership")
         verbose_name_plural = _("Club Memberships")
+        indexes = [
+            models.Index(fields=['start_date', 'id'], condition=models.Q(is_active=True), name='clubmember_active_idx'),
+            models.Index(fields=['modified_at', 'id'], name='clubmember_modified_idx'),
+            models.Index(fields=['archer', 'club'], name='clubmember_archer_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['club', 'archer'],
+                condition=models.Q(is_active=True),
+                name='clubmember_active_unique',
+            ),
+        ]
 
     def __str__(self):
         return f"{str(self.archer)} - {str(self.club)} {self.club.town}"
@@ -498,7 +574,7 @@ class Category(BaseScoringModel):
         verbose_name=_("Name"),
         help_text=_("format: required, max-64")
     )
-    slug = AutoSlugField(populate_from='name',editable=True)
+    slug = BatchSlugField(populate_from='name',editable=True)
     archers = models.ManyToManyField(
         Archer,
         through='CategoryMembership',
@@ -526,6 +602,10 @@ class Category(BaseScoringModel):
     class Meta:
         verbose_name = _("Category")
         verbose_name_plural = _("Categories")
+        indexes = [
+            models.Index(fields=['created_at', 'id'], condition=models.Q(is_active=True), name='category_active_idx'),
+            models.Index(fields=['modified_at', 'id'], name='category_modified_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -547,7 +627,7 @@ class AgeGroup(BaseScoringModel):
         verbose_name=_("Name"),
         help_text=_("format: required, max-32")
     )
-    slug = AutoSlugField(populate_from='name',editable=True)
+    slug = BatchSlugField(populate_from='name',editable=True)
     info = models.TextField(
         null=True,
         blank=True,
@@ -569,6 +649,10 @@ class AgeGroup(BaseScoringModel):
         ordering = ['name']
         verbose_name = _("Age Group")
         verbose_name_plural = _("Age Groups")
+        indexes = [
+            models.Index(fields=['name', 'id'], condition=models.Q(is_active=True), name='agegroup_active_idx'),
+            models.Index(fields=['modified_at', 'id'], name='agegroup_modified_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -576,8 +660,80 @@ class AgeGroup(BaseScoringModel):
     def __unicode__(self):
         return self.name
 
+class Classification(BaseScoringModel):
+    """
+    A classification of a category, e.g. "Bowman", earned with
+    ``qualifying_scores`` scores of at most ``max_handicap`` in one season.
+    Without an age group it applies to every age group of the category.
+    """
+    name = models.CharField(
+        max_length=64,
+        verbose_name=_("Name"),
+        help_text=_("format: required, max-64"),
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.PROTECT,
+        related_name='classifications',
+        verbose_name=_("Category"),
+        help_text=_("format: required"),
+    )
+    agegroup = models.ForeignKey(
+        AgeGroup,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='classifications',
+        verbose_name=_("Age Group"),
+        help_text=_("format: not required, empty: every age group"),
+    )
+    max_handicap = models.PositiveSmallIntegerField(
+        validators=[MaxValueValidator(150)],
+        verbose_name=_("Handicap"),
+        help_text=_("Worst handicap of a qualifying score. format: required, 0-150"),
+    )
+    qualifying_scores = models.PositiveSmallIntegerField(
+        default=3,
+        validators=[MinValueValidator(1)],
+        verbose_name=_("Qualifying scores"),
+        help_text=_("Scores needed in one season. format: required, default=3"),
+    )
+    info = models.TextField(
+        null=True,
+        blank=True,
+        unique=False,
+        verbose_name=_("Info"),
+        help_text=_("format: not required"),
+    )
+    author = models.ForeignKey(
+        CustomUser,
+        on_delete=models.PROTECT,
+        default=1,
+        related_name='classification_author',
+        verbose_name=_("Author"),
+        help_text=_("format: required, default=1 (superuser)"),
+    )
+
+    class Meta:
+        db_table = 'classifications'
+        ordering = ['max_handicap', 'name']
+        verbose_name = _("Classification")
+        verbose_name_plural = _("Classifications")
+        indexes = [
+            models.Index(fields=['category', 'max_handicap'], condition=models.Q(is_active=True), name='classification_active_idx'),
+            models.Index(fields=['modified_at', 'id'], name='classification_modified_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} - {str(self.category)}"
+
+    def __unicode__(self):
+        return f"{self.name} - {str(self.category)}"
+
 # TODO: Supercharging CategoryMembership Snippet with Advanced Features
-class CategoryMembership(BaseScoringModel):
+class CategoryMembership(SortKeyModel):
+    sort_key_from = 'category'
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -607,10 +763,26 @@ class CategoryMembership(BaseScoringModel):
         related_name='categorymembership_agegroup',
         help_text=_("format: required"),
     )
+    classification = models.ForeignKey(
+        Classification,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='categorymemberships',
+        verbose_name=_("Classification"),
+        help_text=_("Best classification of the season, kept by scoring.classifications"),
+    )
+    classification_season = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_("Classification season"),
+    )
 
     # Extra fields for membership information
 
-    slug = AutoSlugField(populate_from=('category__name', 'archer__last_name',), editable=True)
+    slug = BatchSlugField(populate_from=('category__name', 'archer__last_name',), editable=True)
     info = models.TextField(
         null=True,
         blank=True,
@@ -631,9 +803,21 @@ class CategoryMembership(BaseScoringModel):
 
     class Meta:
         db_table = 'categorymemberships'
-        ordering = ['category__name']
+        ordering = ['sort_key']
         verbose_name = _("Category Membership")
         verbose_name_plural = _("Category Memberships")
+        indexes = [
+            models.Index(fields=['sort_key', 'id'], condition=models.Q(is_active=True), name='catmember_active_idx'),
+            models.Index(fields=['modified_at', 'id'], name='catmember_modified_idx'),
+            models.Index(fields=['archer', 'category'], name='catmember_archer_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['category', 'archer'],
+                condition=models.Q(is_active=True),
+                name='catmember_active_unique',
+            ),
+        ]
 
     def __str__(self):
         return f"{str(self.archer)} - {str(self.category)}"
@@ -655,7 +839,7 @@ class Team(BaseScoringModel):
         verbose_name=_("Name"),
         help_text=_("format: required, max-64")
     )
-    slug = AutoSlugField(populate_from='name', editable=True)
+    slug = BatchSlugField(populate_from='name', editable=True)
     archers = models.ManyToManyField(
         Archer,
         through='TeamMembership',
@@ -685,6 +869,10 @@ class Team(BaseScoringModel):
         ordering = ['name']
         verbose_name = _("Team")
         verbose_name_plural = _("Teams")
+        indexes = [
+            models.Index(fields=['name', 'id'], condition=models.Q(is_active=True), name='team_active_idx'),
+            models.Index(fields=['modified_at', 'id'], name='team_modified_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -693,7 +881,9 @@ class Team(BaseScoringModel):
         return self.name
 
 # TODO: Supercharging TeamMembership Snippet with Advanced Features
-class TeamMembership(BaseScoringModel):
+class TeamMembership(SortKeyModel):
+    sort_key_from = 'team'
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -713,7 +903,7 @@ class TeamMembership(BaseScoringModel):
         help_text=_("format: required"),
         related_name='teammembership_archer'
     )
-    slug = AutoSlugField(
+    slug = BatchSlugField(
         populate_from=('team__name', 'archer__last_name',), 
         editable=True,
     )
@@ -740,9 +930,21 @@ class TeamMembership(BaseScoringModel):
 
     class Meta:
         db_table = 'teammemberships'
-        ordering = ['team__name']
+        ordering = ['sort_key']
         verbose_name = _("Team Membership")
         verbose_name_plural = _("Team Memberships")
+        indexes = [
+            models.Index(fields=['sort_key', 'id'], condition=models.Q(is_active=True), name='teammember_active_idx'),
+            models.Index(fields=['modified_at', 'id'], name='teammember_modified_idx'),
+            models.Index(fields=['archer', 'team'], name='teammember_archer_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['team', 'archer'],
+                condition=models.Q(is_active=True),
+                name='teammember_active_unique',
+            ),
+        ]
 
     def __str__(self):
         return f"{str(self.archer)} - {str(self.team)}"
@@ -763,7 +965,7 @@ class ScoringSheet(BaseScoringModel):
         verbose_name=_("Name"),
         help_text=_("format: required, max-64")
     )
-    slug = AutoSlugField(populate_from='name',editable=True)
+    slug = BatchSlugField(populate_from='name',editable=True)
     columns = models.PositiveIntegerField(
         unique=False,
         null=False,
@@ -804,6 +1006,10 @@ class ScoringSheet(BaseScoringModel):
         ordering = ['name']
         verbose_name = _("Scoring Sheet")
         verbose_name_plural = _("Scoring Sheets")
+        indexes = [
+            models.Index(fields=['name', 'id'], condition=models.Q(is_active=True), name='scoringsheet_active_idx'),
+            models.Index(fields=['modified_at', 'id'], name='scoringsheet_modified_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ( rows : {self.rows}, columns : {self.columns} )"
@@ -852,7 +1058,7 @@ class TargetFaceNameChoice(BaseScoringModel):
         verbose_name=_("Name"),
         help_text=_("format: required, max-128")
     )
-    slug = AutoSlugField(populate_from='name',editable=True)
+    slug = BatchSlugField(populate_from='name',editable=True)
     environment = models.CharField(
         max_length=32,
         null=False,
@@ -911,6 +1117,10 @@ class TargetFaceNameChoice(BaseScoringModel):
         ordering = ['name']
         verbose_name = _("Target Face Name Choice")
         verbose_name_plural = _("Target Faces Name Choices")
+        indexes = [
+            models.Index(fields=['name', 'id'], condition=models.Q(is_active=True), name='tfnamechoice_active_idx'),
+            models.Index(fields=['modified_at', 'id'], name='tfnamechoice_modified_idx'),
+        ]
                    
     def __str__(self):
         return f"{self.name} )"
@@ -932,7 +1142,7 @@ class TargetFace(BaseScoringModel):
         verbose_name=_("Name"),
         help_text=_("format: required, max-64")
     )
-    slug = AutoSlugField(populate_from='name',editable=True)
+    slug = BatchSlugField(populate_from='name',editable=True)
     # TODO: Insert image field
     info = models.TextField(
         null=True,
@@ -955,6 +1165,10 @@ class TargetFace(BaseScoringModel):
         ordering = ['name']
         verbose_name = _("Target Face")
         verbose_name_plural = _("Target Faces")
+        indexes = [
+            models.Index(fields=['name', 'id'], condition=models.Q(is_active=True), name='targetface_active_idx'),
+            models.Index(fields=['modified_at', 'id'], name='targetface_modified_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} )"
@@ -976,7 +1190,7 @@ class Round(BaseScoringModel):
         verbose_name=_("Name"),
         help_text=_("format: required, max-64")
     )
-    slug = AutoSlugField(
+    slug = BatchSlugField(
         populate_from='name',
         editable=True
     )
@@ -1013,6 +1227,31 @@ class Round(BaseScoringModel):
         help_text=_("format: H:M:S, not required"),
     )
     # TODO: Insert location
+    scoringsheet = models.ForeignKey(
+        ScoringSheet,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='round_scoringsheet',
+        verbose_name=_("Scoring sheet"),
+        help_text=_("Shape of the ends, rows x arrows. format: not required"),
+    )
+    targetface = models.ForeignKey(
+        TargetFaceNameChoice,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='round_targetface',
+        verbose_name=_("Target face"),
+        help_text=_("Sets the most an arrow can score. format: not required"),
+    )
+    distance = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(1), MaxValueValidator(200)],
+        verbose_name=_("Distance"),
+        help_text=_("In metres, for handicaps. format: not required, default: usual for the target face"),
+    )
     archers = models.ManyToManyField(
         Archer,
         through='RoundMembership',
@@ -1042,6 +1281,10 @@ class Round(BaseScoringModel):
         ordering = ['name']
         verbose_name = _("Round")
         verbose_name_plural = _("Rounds")
+        indexes = [
+            models.Index(fields=['name', 'id'], condition=models.Q(is_active=True), name='round_active_idx'),
+            models.Index(fields=['modified_at', 'id'], name='round_modified_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -1050,7 +1293,9 @@ class Round(BaseScoringModel):
         return self.name
 
 # TODO: Supercharging RoundMembership Snippet with Advanced Features
-class RoundMembership(BaseScoringModel):
+class RoundMembership(SortKeyModel):
+    sort_key_from = 'round'
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -1071,7 +1316,7 @@ class RoundMembership(BaseScoringModel):
         help_text=_("format: required"),
         related_name='roundmembership_archer'
     )
-    slug = AutoSlugField(
+    slug = BatchSlugField(
         populate_from=('archer__last_name', 'round__name'), 
         editable=True
     )
@@ -1093,9 +1338,21 @@ class RoundMembership(BaseScoringModel):
 
     class Meta:
         db_table = 'roundmemberships'
-        ordering = ['round__name']
+        ordering = ['sort_key']
         verbose_name = _("Round Membership")
         verbose_name_plural = _("Round Memberships")
+        indexes = [
+            models.Index(fields=['sort_key', 'id'], condition=models.Q(is_active=True), name='roundmember_active_idx'),
+            models.Index(fields=['modified_at', 'id'], name='roundmember_modified_idx'),
+            models.Index(fields=['archer', 'round'], name='roundmember_archer_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['round', 'archer'],
+                condition=models.Q(is_active=True),
+                name='roundmember_active_unique',
+            ),
+        ]
 
     def __str__(self):
         return f"{str(self.archer)} - {str(self.round)}"
@@ -1131,6 +1388,34 @@ class Score(BaseScoringModel):
         verbose_name=_("Number of arrows")  ,      
         help_text=_("format: not required"),
     )
+    tens = models.PositiveIntegerField(
+        null=False,
+        blank=False,
+        default=0,
+        verbose_name=_("10s"),
+        help_text=_("Number of 10s including Xs, derived from the ends"),
+    )
+    xs = models.PositiveIntegerField(
+        null=False,
+        blank=False,
+        default=0,
+        verbose_name=_("Xs"),
+        help_text=_("Number of Xs, derived from the ends"),
+    )
+    idempotency_key = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_("Idempotency key"),
+        help_text=_("Client generated key, a retried submission with the same key creates nothing"),
+    )
+    version = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        verbose_name=_("Version"),
+        help_text=_("Incremented on every save, used for optimistic concurrency"),
+    )
     info = models.TextField(
         null=True,
         blank=True,
@@ -1151,6 +1436,25 @@ class Score(BaseScoringModel):
         db_table = 'scores'
         verbose_name = _("Score")
         verbose_name_plural = _("Scores")
+        indexes = [
+            models.Index(fields=['created_at', 'id'], condition=models.Q(is_active=True), name='score_active_idx'),
+            models.Index(fields=['modified_at', 'id'], name='score_modified_idx'),
+            models.Index(fields=['round_archer'], condition=models.Q(is_active=True), name='score_roundarcher_active_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['idempotency_key'],
+                condition=models.Q(idempotency_key__isnull=False),
+                name='score_idempotency_key_unique',
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+        super().save(*args, **kwargs)
 
     # TODO: 119
     def __str__(self):
@@ -1165,6 +1469,48 @@ class Score(BaseScoringModel):
         else:
             return f"{str(self.score)} - No Archer"
 
+class ScoreEnd(BaseScoringModel):
+    """
+    One end of a score. ``arrows`` holds one byte per arrow, see
+    ``scoring.arrows`` for the encoding.
+    """
+    score = models.ForeignKey(
+        Score,
+        on_delete=models.CASCADE,
+        related_name='ends',
+        verbose_name=_("Score"),
+        help_text=_("format: required"),
+    )
+    end_number = models.PositiveSmallIntegerField(
+        validators=[MinValueValidator(1), MaxValueValidator(20)],
+        verbose_name=_("End"),
+        help_text=_("format: required, 1 up to the rows of the scoring sheet"),
+    )
+    arrows = models.BinaryField(
+        max_length=20,
+        default=bytes,
+        verbose_name=_("Arrows"),
+    )
+
+    class Meta:
+        db_table = 'scoreends'
+        ordering = ['end_number']
+        verbose_name = _("Score End")
+        verbose_name_plural = _("Score Ends")
+        indexes = [
+            models.Index(fields=['score', 'end_number'], condition=models.Q(is_active=True), name='scoreend_active_idx'),
+            models.Index(fields=['modified_at', 'id'], name='scoreend_modified_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['score', 'end_number'], name='scoreend_score_end_unique'),
+        ]
+
+    def __str__(self):
+        return f"{str(self.score)} - {self.end_number}"
+
+    def __unicode__(self):
+        return f"{str(self.score)} - {self.end_number}"
+
 # TODO: Can be removed probably
 # class ScoreMembership(BaseScoringModel):
 #     def __init__(self, *args, **kwargs):
@@ -1184,7 +1530,7 @@ class Competition(BaseScoringModel):
         verbose_name=_("Name"),
         help_text=_("format: required, max-64")
     )
-    slug = AutoSlugField(
+    slug = BatchSlugField(
         populate_from='name',
         editable=True
     )
@@ -1233,6 +1579,10 @@ class Competition(BaseScoringModel):
         ordering = ['name']
         verbose_name = _("Competitions")
         verbose_name_plural = _("Competitions")
+        indexes = [
+            models.Index(fields=['name', 'id'], condition=models.Q(is_active=True), name='competition_active_idx'),
+            models.Index(fields=['modified_at', 'id'], name='competition_modified_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -1241,7 +1591,9 @@ class Competition(BaseScoringModel):
         return self.name
 
 # TODO: Supercharging CompetitionMembership Snippet with Advanced Features
-class CompetitionMembership(BaseScoringModel):
+class CompetitionMembership(SortKeyModel):
+    sort_key_from = 'competition'
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -1261,7 +1613,7 @@ class CompetitionMembership(BaseScoringModel):
         help_text=_("format: required"),
         related_name='competitionmembership_round'
     )
-    slug = AutoSlugField(
+    slug = BatchSlugField(
         populate_from=('competition__name', 'round__name',), 
         editable=True,
     )
@@ -1283,9 +1635,21 @@ class CompetitionMembership(BaseScoringModel):
 
     class Meta:
         db_table = 'competitionmemberships'
-        ordering = ['competition__name']
+        ordering = ['sort_key']
         verbose_name = _("Competition Membership")
         verbose_name_plural = _("Competition Memberships")
+        indexes = [
+            models.Index(fields=['sort_key', 'id'], condition=models.Q(is_active=True), name='compmember_active_idx'),
+            models.Index(fields=['modified_at', 'id'], name='compmember_modified_idx'),
+            models.Index(fields=['round', 'competition'], name='compmember_round_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['competition', 'round'],
+                condition=models.Q(is_active=True),
+                name='compmember_active_unique',
+            ),
+        ]
 
     def __str__(self):
         return f"{str(self.competition)} - {str(self.round)}"
@@ -1293,6 +1657,153 @@ class CompetitionMembership(BaseScoringModel):
     def __unicode__(self):
         return f"{str(self.competition)} - {str(self.round)}"
 
+#----------------------------------------
+# Leaderboard
+#----------------------------------------
+
+class LeaderboardEntry(models.Model):
+    """
+    Denormalized standing of one archer in one leaderboard.
+
+    A leaderboard is either a round (``competition`` empty) or a competition
+    (``round`` empty), optionally narrowed to a group the archer belongs to.
+    Rows are maintained by ``scoring.leaderboard`` whenever scores change,
+    never edited by hand.
+    """
+    GROUP_OVERALL = ''
+    GROUP_CATEGORY = 'category'
+    GROUP_AGEGROUP = 'agegroup'
+    GROUP_CLUB = 'club'
+    GROUP_TEAM = 'team'
+    GROUP_TYPE_CHOICES = [
+        (GROUP_OVERALL, _("Overall")),
+        (GROUP_CATEGORY, _("Category")),
+        (GROUP_AGEGROUP, _("Age Group")),
+        (GROUP_CLUB, _("Club")),
+        (GROUP_TEAM, _("Team")),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    competition = models.ForeignKey(
+        Competition,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='leaderboard_entries',
+        verbose_name=_("Competition"),
+    )
+    round = models.ForeignKey(
+        Round,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='leaderboard_entries',
+        verbose_name=_("Round"),
+    )
+    group_type = models.CharField(
+        max_length=16,
+        blank=True,
+        default=GROUP_OVERALL,
+        choices=GROUP_TYPE_CHOICES,
+        verbose_name=_("Group type"),
+    )
+    group_id = models.UUIDField(
+        null=True,
+        blank=True,
+        verbose_name=_("Group"),
+    )
+    archer = models.ForeignKey(
+        Archer,
+        on_delete=models.CASCADE,
+        related_name='leaderboard_entries',
+        verbose_name=_("Archer"),
+    )
+    rank = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Rank"),
+    )
+    total_score = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Total score"),
+    )
+    total_arrows = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Total arrows"),
+    )
+    total_tens = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Total 10s"),
+    )
+    total_xs = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Total Xs"),
+    )
+    number_of_scores = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Number of scores"),
+    )
+    modified_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'leaderboardentries'
+        ordering = ['rank']
+        verbose_name = _("Leaderboard Entry")
+        verbose_name_plural = _("Leaderboard Entries")
+        indexes = [
+            models.Index(
+                fields=['competition', 'round', 'group_type', 'group_id', 'rank', 'id'],
+                name='leaderboard_page_idx',
+            ),
+            models.Index(
+                fields=['archer', 'round', 'competition'],
+                name='leaderboard_archer_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.rank}. {str(self.archer)} - {self.total_score}"
+
+    def __unicode__(self):
+        return f"{self.rank}. {str(self.archer)} - {self.total_score}"
+
+#----------------------------------------
+# Sync
+#----------------------------------------
+
+class Tombstone(models.Model):
+    """
+    A deleted scoring row, so ``scoring.sync`` can tell offline clients to
+    drop it. Written by a ``post_delete`` receiver, pruned after
+    ``SCORING_SYNC_TOMBSTONE_DAYS``.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    model = models.CharField(
+        max_length=64,
+        verbose_name=_("Model"),
+    )
+    object_id = models.UUIDField(
+        verbose_name=_("Object"),
+    )
+    deleted_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_("Deleted at"),
+    )
+
+    class Meta:
+        db_table = 'tombstones'
+        ordering = ['deleted_at']
+        verbose_name = _("Tombstone")
+        verbose_name_plural = _("Tombstones")
+        indexes = [
+            models.Index(fields=['deleted_at', 'model', 'object_id'], name='tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id}"
+
+    def __unicode__(self):
+        return f"{self.model} {self.object_id}"
+
 #----------------------------------------
 # Wagtail
 #----------------------------------------
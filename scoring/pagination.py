@@ -0,0 +1,175 @@
+import base64
+import binascii
+import datetime
+import decimal
+import json
+import operator
+import uuid
+from collections import OrderedDict
+from functools import reduce
+
+from django.db.models import F, Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, decimal.Decimal)):
+        return str(value)
+    return value
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Keyset (cursor) pagination ordered by the model's ``Meta.ordering`` plus
+    the UUID ``id``.
+
+    The cursor carries the ordering values of the row at the page boundary,
+    so every page is a ``WHERE (ordering) > (cursor) LIMIT n`` query and the
+    cost of a page does not grow with its position in the table.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    fallback_ordering = ('created_at',)
+    invalid_cursor_message = _('Invalid cursor')
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                page_size = int(request.query_params[self.page_size_query_param])
+            except (KeyError, ValueError):
+                pass
+            else:
+                if page_size > 0:
+                    return min(page_size, self.max_page_size)
+        return self.page_size
+
+    def get_ordering(self, queryset):
+        """
+        Return ``(field_path, descending)`` pairs for the model ordering,
+        always ending in the primary key so the ordering is total.
+        """
+        ordering = []
+        for entry in queryset.model._meta.ordering or self.fallback_ordering:
+            if not isinstance(entry, str) or entry == '?':
+                continue
+            ordering.append((entry.lstrip('-'), entry.startswith('-')))
+        if not any(path in ('id', 'pk') for path, _descending in ordering):
+            ordering.append(('id', False))
+        return ordering
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            decoded = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            position = decoded['p']
+            reverse = bool(decoded.get('r', False))
+        except (TypeError, ValueError, KeyError, binascii.Error, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        payload = {'p': [_encode_value(value) for value in position]}
+        if reverse:
+            payload['r'] = 1
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        ).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_position(self, instance):
+        return [getattr(instance, alias) for alias, _descending in self.keys]
+
+    def get_after_filter(self, position, keys):
+        # Rows strictly after ``position`` in the given key order. NULL sorts
+        # as the smallest value in both directions, so the same rules apply
+        # whether the page is walked forwards or backwards.
+        terms = []
+        equal = Q()
+        for (alias, descending), value in zip(keys, position):
+            if descending:
+                after = None if value is None else (
+                    Q(**{f'{alias}__lt': value}) | Q(**{f'{alias}__isnull': True})
+                )
+            else:
+                after = Q(**{f'{alias}__isnull': False}) if value is None else Q(**{f'{alias}__gt': value})
+            if after is not None:
+                terms.append(equal & after)
+            equal &= Q(**{f'{alias}__isnull': True}) if value is None else Q(**{alias: value})
+        return reduce(operator.or_, terms) if terms else None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(queryset)
+        self.keys = [
+            (f'keyset_{index}', descending)
+            for index, (_path, descending) in enumerate(self.ordering)
+        ]
+        position, self.reverse = self.decode_cursor(request)
+        self.has_cursor = position is not None
+
+        queryset = queryset.annotate(**{
+            alias: F(path) for (alias, _descending), (path, _d) in zip(self.keys, self.ordering)
+        })
+        keys = [(alias, descending != self.reverse) for alias, descending in self.keys]
+        queryset = queryset.order_by(*[
+            F(alias).desc(nulls_last=True) if descending else F(alias).asc(nulls_first=True)
+            for alias, descending in keys
+        ])
+        if position is not None:
+            after = self.get_after_filter(position, keys)
+            queryset = queryset.filter(after) if after is not None else queryset.none()
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+        return self.page
+
+    def get_next_link(self):
+        if not self.page:
+            return None
+        if self.reverse or self.has_more:
+            return self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+        return None
+
+    def get_previous_link(self):
+        if not self.page:
+            return None
+        if (self.reverse and self.has_more) or (not self.reverse and self.has_cursor):
+            return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+        return None
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,47 @@
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError, UnsupportedMediaType
+from rest_framework.parsers import BaseParser
+
+try:
+    import msgpack
+except ImportError:  # msgpack is only needed for application/msgpack bodies
+    msgpack = None
+
+
+class JSONLinesParser(BaseParser):
+    """
+    One JSON object per line (``application/x-ndjson``). Blank lines are
+    ignored. Parses to a list of dicts.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        rows = []
+        for number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(json.loads(line.decode(encoding)))
+            except ValueError as exc:
+                raise ParseError(f"JSON lines parse error on line {number} - {exc}")
+        return rows
+
+
+class MessagePackParser(BaseParser):
+    """
+    A msgpack encoded array of maps (``application/msgpack``).
+    """
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if msgpack is None:
+            raise UnsupportedMediaType(media_type, detail="msgpack is not installed on this server.")
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, timestamp=0)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(f"msgpack parse error - {exc}")
@@ -0,0 +1,118 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+def get_serializer_columns(serializer):
+    """
+    Return the concrete model columns ``serializer`` renders, always
+    including the primary key.
+    """
+    model = serializer.Meta.model
+    columns = {model._meta.pk.name}
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*' or '.' in field.source:
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            continue
+        if model_field.concrete and not model_field.many_to_many:
+            columns.add(model_field.name)
+    return columns
+
+
+def get_manager(model, include_inactive=False):
+    """
+    Return the manager nested rows of ``model`` are read with: the active
+    ``objects`` one, or the default one (every row) with ``include_inactive``.
+    """
+    if include_inactive:
+        return model._default_manager
+    return model._meta.managers_map.get('objects', model._default_manager)
+
+
+def get_prefetch_plan(serializer, prefix='', include_inactive=False):
+    """
+    Walk the fields of ``serializer`` and return ``(select_related,
+    prefetch_related)`` so that rendering any number of rows costs a fixed
+    number of queries.
+
+    Nested ``many=True`` serializers become ``Prefetch`` objects whose
+    querysets only select the nested serializer's columns and carry the
+    nested serializer's own plan, so Competition -> rounds -> archers is three
+    queries however many competitions, rounds or archers are returned.
+    Primary key related fields need nothing, the foreign key column is enough.
+    Prefetched rows are the active ones unless ``include_inactive`` is set.
+    """
+    select_related = []
+    prefetch_related = []
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        path = prefix + field.source.replace('.', '__')
+        if isinstance(field, serializers.ListSerializer):
+            if isinstance(field.child, serializers.ModelSerializer):
+                prefetch_related.append(
+                    Prefetch(path, queryset=get_plan_queryset(field.child, include_inactive))
+                )
+        elif isinstance(field, serializers.ModelSerializer):
+            select_related.append(path)
+            nested_select, nested_prefetch = get_prefetch_plan(
+                field, prefix=path + '__', include_inactive=include_inactive,
+            )
+            select_related += nested_select
+            prefetch_related += nested_prefetch
+        elif isinstance(field, serializers.ManyRelatedField):
+            related_model = serializer.Meta.model._meta.get_field(field.source).related_model
+            prefetch_related.append(Prefetch(
+                path,
+                queryset=get_manager(related_model, include_inactive).only(related_model._meta.pk.name),
+            ))
+        elif isinstance(field, serializers.RelatedField) and not field.use_pk_only_optimization():
+            select_related.append(path)
+    return select_related, prefetch_related
+
+
+def apply_prefetch_plan(queryset, serializer, include_inactive=False):
+    select_related, prefetch_related = get_prefetch_plan(serializer, include_inactive=include_inactive)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    return queryset
+
+
+def get_plan_queryset(serializer, include_inactive=False):
+    model = serializer.Meta.model
+    queryset = get_manager(model, include_inactive).only(*get_serializer_columns(serializer))
+    return apply_prefetch_plan(queryset, serializer, include_inactive)
+
+
+def get_serializer_models(serializer):
+    """
+    Return the models whose rows ``serializer`` renders besides its own:
+    nested serializers and the through models of the many-to-many relations
+    they are reached by.
+    """
+    model = serializer.Meta.model
+    models = []
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*' or '.' in field.source:
+            continue
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if not isinstance(nested, (serializers.ModelSerializer, serializers.ManyRelatedField)):
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            continue
+        through = getattr(model_field, 'through', None) or getattr(model_field.remote_field, 'through', None)
+        for related in (through, model_field.related_model):
+            if related is not None and related not in models:
+                models.append(related)
+        if isinstance(nested, serializers.ModelSerializer):
+            for related in get_serializer_models(nested):
+                if related not in models:
+                    models.append(related)
+    return models
@@ -0,0 +1,137 @@
+"""
+Read-through cache for reference data.
+
+Disciplines, categories, age groups, target faces, target face names and
+scoring sheets rarely change but are read on every request. Their rows and
+rendered API responses are kept in the default cache, whose local layer (see
+``scoring/cache.py``) serves them from this process.
+
+Every model has a version token in the cache and cached values are keyed by
+it. A save or delete (see ``signals.py``) replaces the token, which
+invalidates every copy in every process at once. Other processes see the new
+token within the ``LOCAL_TIMEOUT`` of the cache, this process immediately.
+"""
+import hashlib
+import threading
+import uuid
+from collections import Counter
+
+from django.core.cache import cache
+
+from .cache import get_stats as get_cache_stats
+from .models import (
+    AgeGroup,
+    Archer,
+    Category,
+    CategoryMembership,
+    Discipline,
+    DisciplineMembership,
+    ScoringSheet,
+    TargetFace,
+    TargetFaceNameChoice,
+)
+
+CACHE_PREFIX = 'scoring:reference'
+CACHE_TIMEOUT = 60 * 60 * 24
+
+# Reference model -> other models whose rows show up in its API responses
+REFERENCE_MODELS = {
+    Discipline: (DisciplineMembership, Archer),
+    Category: (CategoryMembership, Archer),
+    AgeGroup: (),
+    TargetFaceNameChoice: (),
+    TargetFace: (),
+    ScoringSheet: (),
+}
+
+counters = Counter()
+_lock = threading.Lock()
+
+
+def is_reference_model(model):
+    return model in REFERENCE_MODELS
+
+
+def get_dependents(model):
+    """
+    The reference models whose cached values go stale when ``model`` changes.
+    """
+    return [
+        reference_model for reference_model, depends_on in REFERENCE_MODELS.items()
+        if model is reference_model or model in depends_on
+    ]
+
+
+def version_key(model):
+    # Outside CACHE_PREFIX, so token lookups do not count as hits of the values
+    return f"{CACHE_PREFIX}-version:{model._meta.label_lower}"
+
+
+def get_version(model):
+    version = cache.get(version_key(model))
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(version_key(model), version, None):
+            version = cache.get(version_key(model), version)
+    return version
+
+
+def read_through(model, name, load):
+    """
+    Return the cached value ``name`` of ``model`` or else ``load()``. A
+    ``None`` from ``load()`` is returned but not cached.
+    """
+    key = f"{CACHE_PREFIX}:{model._meta.label_lower}:{get_version(model)}:{name}"
+    return cache.get_or_set(key, load, CACHE_TIMEOUT)
+
+
+def invalidate(model):
+    for reference_model in get_dependents(model):
+        cache.set(version_key(reference_model), uuid.uuid4().hex, None)
+        with _lock:
+            counters[(reference_model._meta.label_lower, 'invalidations')] += 1
+
+
+def clear_local():
+    """
+    Forget this process's copies and counters, as if it just started.
+    """
+    for method in ('clear_local', 'reset_stats'):
+        if hasattr(cache, method):
+            getattr(cache, method)()
+    with _lock:
+        counters.clear()
+
+
+def get_rows(model):
+    """
+    Every row of a reference model, active or not, by primary key.
+    """
+    return read_through(model, 'rows', lambda: {obj.pk: obj for obj in model.all_objects.all()})
+
+
+def get_object(model, pk):
+    return get_rows(model).get(pk)
+
+
+def request_key(request):
+    return 'response:' + hashlib.md5(request.get_full_path().encode()).hexdigest()
+
+
+def get_stats():
+    """
+    Hit and miss counters of this process per reference model.
+    """
+    prefixes = get_cache_stats().get('prefixes', {})
+    with _lock:
+        snapshot = dict(counters)
+    stats = {}
+    for model in REFERENCE_MODELS:
+        label = model._meta.label_lower
+        events = prefixes.get(f"{CACHE_PREFIX}:{label}", {})
+        stats[label] = {
+            event: events.get(event, 0)
+            for event in ('local_hits', 'shared_hits', 'misses', 'loads', 'waits')
+        }
+        stats[label]['invalidations'] = snapshot.get((label, 'invalidations'), 0)
+    return stats
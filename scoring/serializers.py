@@ -1,5 +1,11 @@
 from rest_framework import serializers
 
+from django.core.exceptions import ValidationError as DjangoValidationError
+
+from . import reference
+from .arrows import end_total, pack_arrows, unpack_arrows
+from .validation import check_arrows, check_score, get_limits, get_round_max_arrow_points
+
 from .models import (
     Archer,
     Discipline,
@@ -17,13 +23,47 @@ from .models import (
     Round,
     RoundMembership,
     Score,
+    ScoreEnd,
     Competition,
     CompetitionMembership,
+    LeaderboardEntry,
 )
 
+class SparseFieldsetSerializerMixin:
+    """
+    Accept an optional ``fields`` argument and drop every other field, so a
+    view can render a sparse fieldset (``?fields=...``) with the same serializer.
+    """
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+class ReferencePrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolve foreign keys to reference data (see :mod:`scoring.reference`)
+    from the reference cache instead of one query per field.
+    """
+    def to_internal_value(self, data):
+        model = self.get_queryset().model
+        if not reference.is_reference_model(model):
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = model._meta.pk.to_python(data)
+        except DjangoValidationError:
+            self.fail('does_not_exist', pk_value=data)
+        obj = reference.get_object(model, pk)
+        if obj is None:
+            self.fail('does_not_exist', pk_value=data)
+        return obj
+
 # Archer
 
-class ArcherSerializer(serializers.ModelSerializer):
+class ArcherSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Archer
         fields = (
@@ -47,12 +87,13 @@ class ArcherSerializer(serializers.ModelSerializer):
         )
 
 class  ArcherInfoSerializer(serializers.Serializer):
-    archers = ArcherSerializer(many=True)
+    archers = ArcherSerializer(many=True, required=False)
     count = serializers.FloatField()
+    last_modified = serializers.DateTimeField(allow_null=True)
 
 # Discipline
 
-class DisciplineSerializer(serializers.ModelSerializer):
+class DisciplineSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     archers = ArcherSerializer(many=True, read_only=True)
 
     class Meta:
@@ -70,12 +111,15 @@ class DisciplineSerializer(serializers.ModelSerializer):
         )
 
 class  DisciplineInfoSerializer(serializers.Serializer):
-    disciplines = DisciplineSerializer(many=True)
+    disciplines = DisciplineSerializer(many=True, required=False)
     count = serializers.FloatField()
+    last_modified = serializers.DateTimeField(allow_null=True)
 
 # DisciplineMembership
 
-class DisciplineMembershipSerializer(serializers.ModelSerializer):
+class DisciplineMembershipSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    serializer_related_field = ReferencePrimaryKeyRelatedField
+
     # discipline = DisciplineSerializer()
     # archer = ArcherSerializer()
     # discipline = serializers.CharField()
@@ -96,13 +140,14 @@ class DisciplineMembershipSerializer(serializers.ModelSerializer):
         )
 
 class  DisciplineMembershipInfoSerializer(serializers.Serializer):
-    disciplinememberships = DisciplineMembershipSerializer(many=True)
+    disciplinememberships = DisciplineMembershipSerializer(many=True, required=False)
     count = serializers.FloatField()
+    last_modified = serializers.DateTimeField(allow_null=True)
 
 
 # Club
 
-class ClubSerializer(serializers.ModelSerializer):
+class ClubSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     archers = ArcherSerializer(many=True, read_only=True)
 
     class Meta:
@@ -127,12 +172,13 @@ class ClubSerializer(serializers.ModelSerializer):
         )
 
 class  ClubInfoSerializer(serializers.Serializer):
-    clubs = ClubSerializer(many=True)
+    clubs = ClubSerializer(many=True, required=False)
     count = serializers.FloatField()
+    last_modified = serializers.DateTimeField(allow_null=True)
 
 # ClubMembership
 
-class ClubMembershipSerializer(serializers.ModelSerializer):
+class ClubMembershipSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     # club = ClubSerializer()
     # archer = ArcherSerializer()
     # club = serializers.CharField()
@@ -155,12 +201,13 @@ class ClubMembershipSerializer(serializers.ModelSerializer):
         )
 
 class ClubMembershipInfoSerializer(serializers.Serializer):
-    clubmemberships = ClubMembershipSerializer(many=True)
+    clubmemberships = ClubMembershipSerializer(many=True, required=False)
     count = serializers.FloatField()
+    last_modified = serializers.DateTimeField(allow_null=True)
 
 # Category
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     archers = ArcherSerializer(many=True, read_only=True)
 
     class Meta:
@@ -178,12 +225,13 @@ class CategorySerializer(serializers.ModelSerializer):
         )
 
 class CategoryInfoSerializer(serializers.Serializer):
-    categories = CategorySerializer(many=True)
+    categories = CategorySerializer(many=True, required=False)
     count = serializers.FloatField()
+    last_modified = serializers.DateTimeField(allow_null=True)
 
 # AgeGroup
 
-class AgeGroupSerializer(serializers.ModelSerializer):
+class AgeGroupSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = AgeGroup
         fields = (
@@ -198,12 +246,15 @@ class AgeGroupSerializer(serializers.ModelSerializer):
         )
 
 class AgeGroupInfoSerializer(serializers.Serializer):
-    agegroups = AgeGroupSerializer(many=True)
+    agegroups = AgeGroupSerializer(many=True, required=False)
     count = serializers.FloatField()
+    last_modified = serializers.DateTimeField(allow_null=True)
 
 # CategoryMembership
 
-class CategoryMembershipSerializer(serializers.ModelSerializer):
+class CategoryMembershipSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    serializer_related_field = ReferencePrimaryKeyRelatedField
+
     # category = CategorySerializer()
     # archer = ArcherSerializer()
     # archer = serializers.CharField()
@@ -216,6 +267,8 @@ class CategoryMembershipSerializer(serializers.ModelSerializer):
             'archer',
             'category',
             'agegroup',
+            'classification',
+            'classification_season',
             'slug',
             'info',
             'author',
@@ -223,14 +276,16 @@ class CategoryMembershipSerializer(serializers.ModelSerializer):
             'modified_at',
             'is_active',
         )
+        read_only_fields = ('classification', 'classification_season')
 
 class CategoryMembershipInfoSerializer(serializers.Serializer):
-    categorymemberships = CategoryMembershipSerializer(many=True)
+    categorymemberships = CategoryMembershipSerializer(many=True, required=False)
     count = serializers.FloatField()
+    last_modified = serializers.DateTimeField(allow_null=True)
 
 # Team
 
-class TeamSerializer(serializers.ModelSerializer):
+class TeamSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     archers = ArcherSerializer(many=True, read_only=True)
 
     class Meta:
@@ -248,12 +303,13 @@ class TeamSerializer(serializers.ModelSerializer):
         )
 
 class TeamInfoSerializer(serializers.Serializer):
-    teams = TeamSerializer(many=True)
+    teams = TeamSerializer(many=True, required=False)
     count = serializers.FloatField()
+    last_modified = serializers.DateTimeField(allow_null=True)
 
 # TeamMembership
 
-class TeamMembershipSerializer(serializers.ModelSerializer):
+class TeamMembershipSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     # team = TeamSerializer()
     # archer = ArcherSerializer()
     # team = serializers.CharField()
@@ -274,12 +330,13 @@ class TeamMembershipSerializer(serializers.ModelSerializer):
         )
 
 class TeamMembershipInfoSerializer(serializers.Serializer):
-    teammemberships = TeamMembershipSerializer(many=True)
+    teammemberships = TeamMembershipSerializer(many=True, required=False)
     count = serializers.FloatField()
+    last_modified = serializers.DateTimeField(allow_null=True)
 
 # ScoringSheet
 
-class ScoringSheetSerializer(serializers.ModelSerializer):
+class ScoringSheetSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = ScoringSheet
         fields = (
@@ -296,12 +353,13 @@ class ScoringSheetSerializer(serializers.ModelSerializer):
         )
 
 class ScoringSheetInfoSerializer(serializers.Serializer):
-    scoringsheets = ScoringSheetSerializer(many=True)
+    scoringsheets = ScoringSheetSerializer(many=True, required=False)
     count = serializers.FloatField()
+    last_modified = serializers.DateTimeField(allow_null=True)
 
 # TargetFaceNameChoice
 
-class TargetFaceNameChoiceSerializer(serializers.ModelSerializer):
+class TargetFaceNameChoiceSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = TargetFaceNameChoice
         fields = (
@@ -320,12 +378,13 @@ class TargetFaceNameChoiceSerializer(serializers.ModelSerializer):
         )
 
 class TargetFaceNameChoiceInfoSerializer(serializers.Serializer):
-    targetfacenamechoices = TargetFaceNameChoiceSerializer(many=True)
+    targetfacenamechoices = TargetFaceNameChoiceSerializer(many=True, required=False)
     count = serializers.FloatField()
+    last_modified = serializers.DateTimeField(allow_null=True)
 
 # TargetFace
 
-class TargetFaceSerializer(serializers.ModelSerializer):
+class TargetFaceSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = TargetFace
         fields = (
@@ -340,12 +399,15 @@ class TargetFaceSerializer(serializers.ModelSerializer):
         )
 
 class TargetFaceInfoSerializer(serializers.Serializer):
-    targetfaces = TargetFaceSerializer(many=True)
+    targetfaces = TargetFaceSerializer(many=True, required=False)
     count = serializers.FloatField()
+    last_modified = serializers.DateTimeField(allow_null=True)
 
 # Round
 
-class RoundSerializer(serializers.ModelSerializer):
+class RoundSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    serializer_related_field = ReferencePrimaryKeyRelatedField
+
     archers = ArcherSerializer(many=True, read_only=True)
 
     class Meta:
@@ -358,6 +420,9 @@ class RoundSerializer(serializers.ModelSerializer):
             'start_time',
             'end_date',
             'end_time',
+            'scoringsheet',
+            'targetface',
+            'distance',
             'archers',
             'info',
             'author',
@@ -367,12 +432,13 @@ class RoundSerializer(serializers.ModelSerializer):
         )
 
 class RoundInfoSerializer(serializers.Serializer):
-    rounds = RoundSerializer(many=True)
+    rounds = RoundSerializer(many=True, required=False)
     count = serializers.FloatField()
+    last_modified = serializers.DateTimeField(allow_null=True)
 
 # RoundMembership
 
-class RoundMembershipSerializer(serializers.ModelSerializer):
+class RoundMembershipSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     # round = RoundSerializer()
     # archer = ArcherSerializer()
     # round = serializers.CharField()
@@ -393,12 +459,15 @@ class RoundMembershipSerializer(serializers.ModelSerializer):
         )
 
 class RoundMembershipInfoSerializer(serializers.Serializer):
-    roundmemberships = RoundMembershipSerializer(many=True)
+    roundmemberships = RoundMembershipSerializer(many=True, required=False)
     count = serializers.FloatField()
+    last_modified = serializers.DateTimeField(allow_null=True)
 
 # Score
 
-class ScoreSerializer(serializers.ModelSerializer):
+class ScoreSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    idempotency_key = serializers.CharField(max_length=64, required=False, allow_null=True)
+
     class Meta:
         model = Score
         fields = (
@@ -406,20 +475,115 @@ class ScoreSerializer(serializers.ModelSerializer):
             'round_archer',
             'score',
             'number_of_arrows',
+            'tens',
+            'xs',
+            'idempotency_key',
+            'version',
             'info',
             'author',
             'created_at',
             'modified_at',
             'is_active',
         )
+        read_only_fields = ('tens', 'xs', 'version')
+
+    def validate(self, attrs):
+        round_archer = attrs.get('round_archer', getattr(self.instance, 'round_archer', None))
+        if round_archer is None:
+            return attrs
+        errors = check_score(
+            get_limits([round_archer.pk])[round_archer.pk],
+            score=attrs.get('score', getattr(self.instance, 'score', None)),
+            number_of_arrows=attrs.get('number_of_arrows', getattr(self.instance, 'number_of_arrows', 0)),
+            tens=getattr(self.instance, 'tens', 0),
+            xs=getattr(self.instance, 'xs', 0),
+            adding=self.instance is None or self.instance.round_archer_id != round_archer.pk,
+        )
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
+    def update(self, instance, validated_data):
+        # The key identifies the original submission, it never changes.
+        validated_data.pop('idempotency_key', None)
+        return super().update(instance, validated_data)
 
 class ScoreInfoSerializer(serializers.Serializer):
-    scores = ScoreSerializer(many=True)
+    scores = ScoreSerializer(many=True, required=False)
     count = serializers.FloatField()
+    last_modified = serializers.DateTimeField(allow_null=True)
+
+# ScoreEnd
+
+class ArrowsField(serializers.Field):
+    """
+    Packed arrow bytes in the database, a list of labels (``"X"``, ``"10"``
+    ... ``"M"``) in the API.
+    """
+    default_error_messages = {
+        'not_a_list': 'Expected a list of arrow values.',
+    }
+
+    def to_representation(self, value):
+        return unpack_arrows(value)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            self.fail('not_a_list')
+        try:
+            return pack_arrows(data)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc))
+
+class ScoreEndSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    arrows = ArrowsField()
+    total = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ScoreEnd
+        fields = (
+            'id',
+            'score',
+            'end_number',
+            'arrows',
+            'total',
+            'created_at',
+            'modified_at',
+            'is_active',
+        )
+        read_only_fields = ('score',)
+
+    def get_total(self, obj):
+        return end_total(obj.arrows)
+
+    def validate(self, attrs):
+        score = self.context.get('score') or getattr(self.instance, 'score', None)
+        round_archer = getattr(score, 'round_archer', None)
+        scoringsheet = round_archer.round.scoringsheet if round_archer else None
+        end_number = attrs.get('end_number', getattr(self.instance, 'end_number', None))
+        arrows = attrs.get('arrows', getattr(self.instance, 'arrows', b''))
+        max_ends = scoringsheet.rows if scoringsheet else 20
+        max_arrows = scoringsheet.columns if scoringsheet else 20
+        errors = {}
+        if end_number is not None and end_number > max_ends:
+            errors['end_number'] = [f"This round has {max_ends} ends."]
+        elif score is not None and ScoreEnd.all_objects.filter(
+            score=score, end_number=end_number,
+        ).exclude(pk=getattr(self.instance, 'pk', None)).exists():
+            errors['end_number'] = ["This end has already been recorded."]
+        if len(arrows) > max_arrows:
+            errors['arrows'] = [f"An end of this round has at most {max_arrows} arrows."]
+        elif round_archer is not None:
+            messages = check_arrows(get_round_max_arrow_points(round_archer.round), arrows)
+            if messages:
+                errors['arrows'] = messages
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
 
 # Competition
 
-class CompetitionSerializer(serializers.ModelSerializer):
+class CompetitionSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     rounds = RoundSerializer(many=True, read_only=True)
 
     class Meta:
@@ -439,12 +603,13 @@ class CompetitionSerializer(serializers.ModelSerializer):
         )
 
 class CompetitionInfoSerializer(serializers.Serializer):
-    competitions = CompetitionSerializer(many=True)
+    competitions = CompetitionSerializer(many=True, required=False)
     count = serializers.FloatField()
+    last_modified = serializers.DateTimeField(allow_null=True)
 
 # CompetitionMembership
 
-class CompetitionMembershipSerializer(serializers.ModelSerializer):
+class CompetitionMembershipSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     # competition = CompetitionSerializer()
     # round = RoundSerializer()
     # competition = serializers.CharField()
@@ -465,5 +630,37 @@ class CompetitionMembershipSerializer(serializers.ModelSerializer):
         )
 
 class CompetitionMembershipInfoSerializer(serializers.Serializer):
-    competitionmemberships = CompetitionMembershipSerializer(many=True)
+    competitionmemberships = CompetitionMembershipSerializer(many=True, required=False)
     count = serializers.FloatField()
+    last_modified = serializers.DateTimeField(allow_null=True)
+
+# Leaderboard
+
+class LeaderboardArcherSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Archer
+        fields = (
+            'id',
+            'last_name',
+            'first_name',
+            'middle_name',
+            'union_number',
+        )
+
+class LeaderboardEntrySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    archer = LeaderboardArcherSerializer(read_only=True)
+
+    class Meta:
+        model = LeaderboardEntry
+        fields = (
+            'rank',
+            'archer',
+            'total_score',
+            'total_arrows',
+            'total_tens',
+            'total_xs',
+            'number_of_scores',
+            'group_type',
+            'group_id',
+            'modified_at',
+        )
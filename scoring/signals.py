@@ -0,0 +1,150 @@
+import copy
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import arrows, classifications, leaderboard, live, reference
+from .models import (
+    BaseScoringModel,
+    CategoryMembership,
+    ClubMembership,
+    CompetitionMembership,
+    DisciplineMembership,
+    RoundMembership,
+    Score,
+    ScoreEnd,
+    TeamMembership,
+    Tombstone,
+)
+from .summaries import invalidate_summary
+
+
+@receiver(post_save, dispatch_uid='scoring_summary_post_save')
+@receiver(post_delete, dispatch_uid='scoring_summary_post_delete')
+def invalidate_scoring_summary(sender, **kwargs):
+    if issubclass(sender, BaseScoringModel):
+        invalidate_summary(sender)
+
+
+@receiver(post_save, dispatch_uid='reference_cache_post_save')
+@receiver(post_delete, dispatch_uid='reference_cache_post_delete')
+@receiver(m2m_changed, dispatch_uid='reference_cache_m2m_changed')
+def invalidate_reference_cache(sender, **kwargs):
+    # For m2m_changed the sender is the through model, e.g. DisciplineMembership.
+    reference.invalidate(sender)
+
+
+@receiver(post_delete, dispatch_uid='sync_tombstone_post_delete')
+def create_tombstone(sender, instance, **kwargs):
+    # Offline clients learn about deletions from the sync stream.
+    if issubclass(sender, BaseScoringModel):
+        Tombstone.objects.create(model=sender._meta.model_name, object_id=instance.pk)
+
+
+SORT_KEY_MODELS = (
+    CategoryMembership,
+    CompetitionMembership,
+    DisciplineMembership,
+    RoundMembership,
+    TeamMembership,
+)
+
+
+@receiver(post_save, dispatch_uid='sort_key_post_save')
+def update_sort_keys(sender, instance, raw=False, created=False, **kwargs):
+    # A renamed category, round, ... renames the sort key of its memberships.
+    if raw or created:
+        return
+    for model in SORT_KEY_MODELS:
+        if model._meta.get_field(model.sort_key_from).related_model is sender:
+            updated = model.all_objects.filter(
+                **{model.sort_key_from: instance},
+            ).exclude(sort_key=instance.name).update(sort_key=instance.name, modified_at=timezone.now())
+            # update() sends no signals, the lists of the memberships changed order
+            if updated:
+                invalidate_summary(model)
+                reference.invalidate(model)
+
+
+@receiver(pre_save, sender=Score, dispatch_uid='leaderboard_score_pre_save')
+def remember_score_round_archer(sender, instance, raw=False, **kwargs):
+    # A score moved to another round/archer must also leave its old leaderboards.
+    instance._leaderboard_round_archer_id = None
+    if not raw and not instance._state.adding:
+        instance._leaderboard_round_archer_id = Score.all_objects.filter(
+            pk=instance.pk,
+        ).values_list('round_archer_id', flat=True).first()
+
+
+@receiver(post_save, sender=Score, dispatch_uid='leaderboard_score_post_save')
+@receiver(post_delete, sender=Score, dispatch_uid='leaderboard_score_post_delete')
+def update_score_leaderboards(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    round_archer_ids = {
+        instance.round_archer_id,
+        getattr(instance, '_leaderboard_round_archer_id', None),
+    }
+    round_archer_ids.discard(None)
+    for round_archer_id in round_archer_ids:
+        leaderboard.update_round_membership(round_archer_id)
+
+
+@receiver(post_save, sender=Score, dispatch_uid='classification_score_post_save')
+@receiver(post_delete, sender=Score, dispatch_uid='classification_score_post_delete')
+def update_score_classifications(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    round_archer_ids = {
+        instance.round_archer_id,
+        getattr(instance, '_leaderboard_round_archer_id', None),
+    }
+    round_archer_ids.discard(None)
+    classifications.update_round_archers(round_archer_ids, default_date=timezone.localdate(instance.created_at))
+
+
+@receiver(post_save, sender=CategoryMembership, dispatch_uid='classification_categorymembership_post_save')
+def update_membership_classification(sender, instance, raw=False, **kwargs):
+    # A new category or age group may qualify for other classifications.
+    if not raw:
+        classifications.evaluate([instance.archer_id])
+
+
+@receiver(post_save, sender=CompetitionMembership, dispatch_uid='leaderboard_competitionmembership_post_save')
+@receiver(post_delete, sender=CompetitionMembership, dispatch_uid='leaderboard_competitionmembership_post_delete')
+def update_competition_leaderboards(sender, instance, raw=False, **kwargs):
+    if not raw:
+        leaderboard.rebuild_competition(instance.competition_id)
+
+
+@receiver(post_save, sender=CategoryMembership, dispatch_uid='leaderboard_categorymembership_post_save')
+@receiver(post_delete, sender=CategoryMembership, dispatch_uid='leaderboard_categorymembership_post_delete')
+@receiver(post_save, sender=ClubMembership, dispatch_uid='leaderboard_clubmembership_post_save')
+@receiver(post_delete, sender=ClubMembership, dispatch_uid='leaderboard_clubmembership_post_delete')
+@receiver(post_save, sender=TeamMembership, dispatch_uid='leaderboard_teammembership_post_save')
+@receiver(post_delete, sender=TeamMembership, dispatch_uid='leaderboard_teammembership_post_delete')
+def update_group_leaderboards(sender, instance, raw=False, **kwargs):
+    if not raw:
+        leaderboard.update_archer(instance.archer_id)
+
+
+@receiver(post_save, sender=ScoreEnd, dispatch_uid='arrows_scoreend_post_save')
+@receiver(post_delete, sender=ScoreEnd, dispatch_uid='arrows_scoreend_post_delete')
+def update_score_totals(sender, instance, raw=False, origin=None, **kwargs):
+    # Ends removed because their score is deleted need no recalculation.
+    if raw or getattr(origin, 'model', type(origin)) is Score:
+        return
+    arrows.update_score_from_ends(instance.score_id)
+
+
+@receiver(post_save, sender=Score, dispatch_uid='live_score_post_save')
+@receiver(post_delete, sender=Score, dispatch_uid='live_score_post_delete')
+def publish_score(sender, instance, raw=False, created=None, **kwargs):
+    if raw:
+        return
+    action = 'deleted' if created is None else 'saved'
+    # Published after commit, when a deleted instance has already lost its pk.
+    transaction.on_commit(partial(live.publish_scores, [copy.copy(instance)], action))
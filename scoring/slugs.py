@@ -0,0 +1,176 @@
+"""
+Slugs for batches of new rows.
+
+``AutoSlugField`` builds the slug of every row it inserts on its own: it
+follows ``populate_from`` lookups such as ``archer__last_name`` (a query per
+foreign key that is not cached) and then tries ``slug``, ``slug-2``,
+``slug-3``, ... with a ``SELECT`` each until one is free. ``SlugAllocator``
+does the same for a whole batch in memory: the related values are loaded
+with one query per relation, the slugs already taken with one query per
+batch, and the numbering continues where the previous batch stopped.
+
+Models use ``BatchSlugField``, an ``AutoSlugField`` that keeps a slug set
+by :func:`assign_slugs` when the row is inserted, e.g. by ``bulk_create``::
+
+    assign_slugs(archers)
+    Archer.objects.bulk_create(archers)
+"""
+from functools import reduce
+
+from django.db.models import Q
+from django_extensions.db.fields import AutoSlugField
+
+# Slug prefixes per ``startswith`` query.
+LOAD_BATCH_SIZE = 100
+
+
+class BatchSlugField(AutoSlugField):
+    """
+    An ``AutoSlugField`` that leaves a slug assigned by :class:`SlugAllocator`
+    alone instead of building and checking it again.
+    """
+    def pre_save(self, model_instance, add):
+        slug = getattr(model_instance, self.attname)
+        if add and slug and slug == getattr(model_instance, '_assigned_slug', None):
+            return slug
+        return super().pre_save(model_instance, add)
+
+    def deconstruct(self):
+        # Migrations see a plain AutoSlugField, the difference is runtime only
+        name, _path, args, kwargs = super().deconstruct()
+        return name, 'django_extensions.db.fields.AutoSlugField', args, kwargs
+
+
+def get_slug_field(model):
+    for field in model._meta.concrete_fields:
+        if isinstance(field, AutoSlugField):
+            return field
+    return None
+
+
+class SlugAllocator:
+    """
+    Hands out unique slugs to new rows of ``model``, batch after batch. The
+    slugs handed out are remembered, so one allocator serves a whole import
+    or seed run; rows written by others in the meantime are seen when their
+    prefix is loaded.
+    """
+    def __init__(self, model):
+        self.model = model
+        self.field = get_slug_field(model)
+        self.taken = set()
+        self.loaded = set()
+        self.next_number = {}
+
+    def assign(self, objs):
+        objs = list(objs)
+        if self.field is None or not objs:
+            return objs
+        bases = self.get_bases(objs)
+        self.load(set(bases) - self.loaded)
+        for obj, base in zip(objs, bases):
+            slug = base if self.field.allow_duplicates else self.unique(base)
+            setattr(obj, self.field.attname, slug)
+            obj._assigned_slug = slug
+        return objs
+
+    def get_bases(self, objs):
+        """
+        The slug of every row before numbering, as ``AutoSlugField`` builds it.
+        """
+        populate_from = self.field._populate_from
+        if not isinstance(populate_from, (list, tuple)):
+            populate_from = (populate_from,)
+        columns = [self.get_values(objs, lookup) for lookup in populate_from]
+        slugify_function = getattr(self.model, 'slugify_function', self.field.slugify_function)
+        bases = []
+        for values in zip(*columns):
+            slug = self.field.separator.join(
+                self.field.slugify_func(value, slugify_function=slugify_function) for value in values
+            )
+            if self.field.max_length:
+                slug = slug[:self.field.max_length]
+            bases.append(self.field._slug_strip(slug))
+        return bases
+
+    def get_values(self, objs, lookup):
+        """
+        The values of a ``populate_from`` lookup for every row, loading the
+        ``fk__name`` values of uncached relations with one query.
+        """
+        if callable(lookup):
+            return [str(lookup(obj)) for obj in objs]
+        path = lookup.split('__')
+        if len(path) == 1:
+            return [self.field.get_slug_fields(obj, lookup) for obj in objs]
+
+        field = self.model._meta.get_field(path[0])
+        missing = {
+            getattr(obj, field.attname) for obj in objs if not field.is_cached(obj)
+        }
+        missing.discard(None)
+        loaded = {}
+        missing = list(missing)
+        for start in range(0, len(missing), 500):
+            loaded.update(field.related_model._base_manager.filter(
+                pk__in=missing[start:start + 500],
+            ).values_list('pk', '__'.join(path[1:])))
+
+        values = []
+        for obj in objs:
+            if field.is_cached(obj):
+                related = getattr(obj, field.name)
+                values.append(reduce(getattr, path[1:], related) if related is not None else None)
+            else:
+                values.append(loaded.get(getattr(obj, field.attname)))
+        return values
+
+    def load(self, bases):
+        """
+        Add the existing slugs starting with one of ``bases`` to the taken set.
+        """
+        prefixes = sorted({base or self.field.separator for base in bases})
+        queryset = self.model._default_manager.all()
+        for start in range(0, len(prefixes), LOAD_BATCH_SIZE):
+            condition = Q()
+            for prefix in prefixes[start:start + LOAD_BATCH_SIZE]:
+                condition |= Q(**{f'{self.field.attname}__startswith': prefix})
+            self.taken.update(queryset.filter(condition).values_list(self.field.attname, flat=True))
+        self.loaded.update(bases)
+
+    def unique(self, base):
+        if base and base not in self.taken:
+            self.taken.add(base)
+            return base
+        number = self.next_number.get(base, 2)
+        while True:
+            prefix = self.numbered_prefix(base, number)
+            if prefix != base and prefix not in self.loaded:
+                # Shortened to make room for the number
+                self.load({prefix})
+            slug = f'{prefix}{self.field.separator}{number}'
+            number += 1
+            if slug not in self.taken:
+                break
+        self.next_number[base] = number
+        self.taken.add(slug)
+        return slug
+
+    def numbered_prefix(self, base, number):
+        end_length = len(f'{self.field.separator}{number}')
+        if self.field.max_length and len(base) + end_length > self.field.max_length:
+            return self.field._slug_strip(base[:self.field.max_length - end_length])
+        return base
+
+
+def assign_slugs(objs, allocator=None):
+    """
+    Give a batch of new rows of one model unique slugs, see
+    :class:`SlugAllocator`. Pass the allocator of earlier batches to carry
+    on their numbering.
+    """
+    objs = list(objs)
+    if not objs:
+        return objs
+    allocator = allocator or SlugAllocator(type(objs[0]))
+    return allocator.assign(objs)
@@ -0,0 +1,31 @@
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+SUMMARY_CACHE_PREFIX = 'scoring:summary'
+SUMMARY_CACHE_TIMEOUT = None  # kept until a model signal invalidates it
+
+
+def summary_cache_key(model, include_inactive=False):
+    suffix = ':all' if include_inactive else ''
+    return f"{SUMMARY_CACHE_PREFIX}:{model._meta.label_lower}{suffix}"
+
+
+def get_summary(model, include_inactive=False):
+    """
+    Return ``{'count': ..., 'last_modified': ...}`` for a scoring model,
+    counting the active rows only unless ``include_inactive`` is set.
+
+    The figures come from a single aggregate query and are cached until
+    :func:`invalidate_summary` is called from the model's save/delete signals.
+    Concurrent misses run the aggregate once, see ``scoring/cache.py``.
+    """
+    manager = getattr(model, 'all_objects' if include_inactive else 'objects')
+    return cache.get_or_set(
+        summary_cache_key(model, include_inactive),
+        lambda: manager.aggregate(count=Count('pk'), last_modified=Max('modified_at')),
+        SUMMARY_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_summary(model):
+    cache.delete_many([summary_cache_key(model), summary_cache_key(model, include_inactive=True)])
@@ -0,0 +1,192 @@
+"""
+Delta sync for offline scoring clients.
+
+Every scoring row change (an upsert, ``modified_at``) and every deletion (a
+``Tombstone``) is one entry in a single stream ordered by ``(time, type,
+id)``. A cursor is the position of the last entry a client has seen, so
+``/scoring/sync/?since=<cursor>`` returns only what changed after it. A
+page costs one index range scan on ``(modified_at, id)`` per table plus one
+on the tombstones, whatever the size of the tables.
+
+Entries younger than ``SCORING_SYNC_LAG`` seconds are held back: a row
+saved by a transaction that commits later than it was stamped would
+otherwise end up behind a cursor already handed out.
+"""
+import base64
+import binascii
+import datetime
+import json
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+
+from .models import BaseScoringModel, Tombstone
+
+UPSERT = 'upsert'
+DELETE = 'delete'
+
+_serializer_classes = {}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def get_sync_models():
+    """
+    The scoring models in the stream, by their type name.
+    """
+    return {
+        model._meta.model_name: model
+        for model in apps.get_app_config('scoring').get_models()
+        if issubclass(model, BaseScoringModel)
+    }
+
+
+def get_serializer_class(model):
+    """
+    A flat serializer of every column, related rows as ids.
+    """
+    if model not in _serializer_classes:
+        meta = type('Meta', (), {
+            'model': model,
+            'fields': [field.name for field in model._meta.concrete_fields],
+        })
+        _serializer_classes[model] = type(
+            f'{model.__name__}SyncSerializer', (serializers.ModelSerializer,), {'Meta': meta},
+        )
+    return _serializer_classes[model]
+
+
+def encode_cursor(position):
+    timestamp, type_name, pk = position
+    payload = [timestamp.isoformat(), type_name, str(pk) if pk is not None else None]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode('ascii')
+
+
+def decode_cursor(value):
+    """
+    A cursor of :func:`encode_cursor`, or an ISO 8601 time for everything
+    changed from then on.
+    """
+    try:
+        timestamp = parse_datetime(value)
+    except ValueError:
+        raise InvalidCursor(value)
+    if timestamp is not None:
+        if timezone.is_naive(timestamp):
+            timestamp = timezone.make_aware(timestamp, datetime.timezone.utc)
+        return timestamp, '', None
+    try:
+        timestamp, type_name, pk = json.loads(base64.urlsafe_b64decode(value.encode('ascii')))
+        timestamp = parse_datetime(timestamp)
+        pk = uuid.UUID(pk) if pk is not None else None
+    except (TypeError, ValueError, binascii.Error, UnicodeEncodeError):
+        raise InvalidCursor(value)
+    if timestamp is None or not isinstance(type_name, str):
+        raise InvalidCursor(value)
+    return timestamp, type_name, pk
+
+
+def after_position(position, time_field, type_name=None, type_field=None, id_field='pk'):
+    """
+    ``Q`` for the entries after ``position`` in ``(time, type, id)`` order,
+    for a table of one type (``type_name``) or of all types (``type_field``).
+    """
+    timestamp, cursor_type, cursor_id = position
+    later = Q(**{f'{time_field}__gt': timestamp})
+    same_time = Q(**{time_field: timestamp})
+    same_type = Q(**{f'{id_field}__gt': cursor_id}) if cursor_id is not None else Q()
+    if type_field is not None:
+        return later | (same_time & Q(**{f'{type_field}__gt': cursor_type})) | (
+            same_time & Q(**{type_field: cursor_type}) & same_type
+        )
+    if type_name > cursor_type:
+        return later | same_time
+    if type_name == cursor_type:
+        return later | (same_time & same_type)
+    return later
+
+
+def get_entries(position, limit, until):
+    """
+    The first ``limit`` entries after ``position`` and up to ``until`` as
+    ``(time, type, id, operation)``, oldest first.
+    """
+    entries = []
+    for type_name, model in get_sync_models().items():
+        queryset = model._base_manager.filter(modified_at__lte=until)
+        if position is not None:
+            queryset = queryset.filter(after_position(position, 'modified_at', type_name=type_name))
+        entries += [
+            (modified_at, type_name, pk, UPSERT)
+            for modified_at, pk in queryset.order_by('modified_at', 'pk').values_list('modified_at', 'pk')[:limit]
+        ]
+
+    tombstones = Tombstone.objects.filter(deleted_at__lte=until)
+    if position is not None:
+        tombstones = tombstones.filter(
+            after_position(position, 'deleted_at', type_field='model', id_field='object_id'),
+        )
+    entries += [
+        (deleted_at, type_name, pk, DELETE)
+        for deleted_at, type_name, pk in tombstones.order_by(
+            'deleted_at', 'model', 'object_id',
+        ).values_list('deleted_at', 'model', 'object_id')[:limit]
+    ]
+    entries.sort(key=lambda entry: entry[:3])
+    return entries[:limit]
+
+
+def get_changes(position, limit, context=None):
+    """
+    Return ``(changes, last position, has_more)`` for one page of the stream
+    after ``position`` (``None``: from the start).
+    """
+    until = timezone.now() - datetime.timedelta(seconds=settings.SCORING_SYNC_LAG)
+    entries = get_entries(position, limit + 1, until)
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    models = get_sync_models()
+    upserts = {}
+    for _time, type_name, pk, operation in entries:
+        if operation == UPSERT:
+            upserts.setdefault(type_name, []).append(pk)
+    data = {}
+    for type_name, pks in upserts.items():
+        model = models[type_name]
+        serializer_class = get_serializer_class(model)
+        for row in serializer_class(model._base_manager.filter(pk__in=pks), many=True, context=context).data:
+            data[(type_name, str(row['id']))] = row
+
+    changes = []
+    for timestamp, type_name, pk, operation in entries:
+        change = {'type': type_name, 'op': operation, 'id': pk, 'at': timestamp}
+        if operation == UPSERT:
+            row = data.get((type_name, str(pk)))
+            if row is None:
+                # Deleted since, its tombstone follows
+                continue
+            change['data'] = row
+        changes.append(change)
+
+    last = entries[-1][:3] if entries else position
+    return changes, last, has_more
+
+
+def get_horizon():
+    """
+    Deletions before this time are forgotten, older cursors need a full
+    download.
+    """
+    return timezone.now() - datetime.timedelta(days=settings.SCORING_SYNC_TOMBSTONE_DAYS)
+
+
+def prune_tombstones():
+    return Tombstone.objects.filter(deleted_at__lt=get_horizon()).delete()[0]
@@ -1,4 +1,22 @@
-from django.test import TestCase
+import datetime
+import json
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.recorder import MigrationRecorder
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from .models import (
     Archer,
     Discipline,
@@ -8,6 +26,7 @@ from .models import (
     Category,
     AgeGroup,
     CategoryMembership,
+    Classification,
     Team,
     TeamMembership,
     ScoringSheet,
@@ -18,10 +37,21 @@ from .models import (
     Score,
     Competition,
     CompetitionMembership,
+    LeaderboardEntry,
+    ScoreEnd,
 )
+from . import export, leaderboard, live, reference
+from .cache import TieredCache
+from .parsers import msgpack
+from .arrows import pack_arrows, summarize_ends, unpack_arrows
+from .management.commands.copy_sqlite_to_postgres import open_sqlite
 from userauth.models import CustomUser
 from django.urls import reverse
+from io import StringIO
+from wagtail.models import Page
+from silk.collector import DataCollector
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 
 class UserArcherTestCase(TestCase):
     def setUp(self):
@@ -286,3 +316,1679 @@ class UserCompetitionTestCase(TestCase):
     def test_user_competition_list_unauthenticated(self):
         response = self.client.get(reverse('user-competitions'))
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+class ArcherPaginationTestCase(TestCase):
+    def setUp(self):
+        user = CustomUser.objects.create_user(username='user1', password='test')
+        for index, last_name in enumerate(['Eve', 'Bob', 'Dan', 'Ann', 'Cid']):
+            Archer.objects.create(
+                author=user,
+                last_name=last_name,
+                first_name='Test',
+                union_number=index + 1,
+            )
+
+        return super().setUp()
+
+    def test_archer_list_is_cursor_paginated_in_meta_ordering(self):
+        response = self.client.get('/scoring/archers/', {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.json()['previous'])
+
+        last_names = []
+        url = '/scoring/archers/?page_size=2'
+        while url:
+            page = self.client.get(url).json()
+            self.assertLessEqual(len(page['results']), 2)
+            last_names += [archer['last_name'] for archer in page['results']]
+            url = page['next']
+
+        self.assertEqual(last_names, ['Ann', 'Bob', 'Cid', 'Dan', 'Eve'])
+
+    def test_archer_list_previous_link_returns_previous_page(self):
+        first = self.client.get('/scoring/archers/', {'page_size': 2}).json()
+        second = self.client.get(first['next']).json()
+        previous = self.client.get(second['previous']).json()
+
+        self.assertEqual(
+            [archer['id'] for archer in previous['results']],
+            [archer['id'] for archer in first['results']],
+        )
+
+    def test_archer_list_invalid_cursor(self):
+        response = self.client.get('/scoring/archers/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_archer_list_sparse_fieldset(self):
+        response = self.client.get('/scoring/archers/', {'fields': 'id,last_name'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for archer in response.json()['results']:
+            self.assertEqual(set(archer), {'id', 'last_name'})
+
+    def test_archer_list_unknown_sparse_field(self):
+        response = self.client.get('/scoring/archers/', {'fields': 'id,shoe_size'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+# django-silk records every request in the database, keep it out of query counts
+NO_SILK_MIDDLEWARE = [m for m in settings.MIDDLEWARE if not m.startswith('silk.')]
+
+
+def clear_silk_request():
+    # The last request silk recorded stays on its thread-local collector and
+    # silk keeps running an EXPLAIN after every query until it is cleared
+    DataCollector().clear()
+
+# The tiered cache over an in-memory stand-in for the shared cache, so cache
+# reads of the query count tests do not go to the database cache table
+LOCAL_CACHES = {
+    'default': dict(settings.CACHES['default'], LOCATION='shared'),
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'scoring-tests'},
+}
+
+@override_settings(CACHES=LOCAL_CACHES, MIDDLEWARE=NO_SILK_MIDDLEWARE)
+class ArcherInfoTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = CustomUser.objects.create_user(username='user1', password='test')
+        for index in range(3):
+            Archer.objects.create(
+                author=user,
+                last_name=f'archer{index}',
+                first_name='Test',
+                union_number=index + 1,
+            )
+
+        return super().setUp()
+
+    def test_archer_info_is_one_cached_aggregate_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/scoring/archers/info/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['count'], 3)
+        self.assertNotIn('archers', response.json())
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/scoring/archers/info/')
+        self.assertEqual(response.json()['count'], 3)
+
+    def test_archer_info_is_invalidated_on_save_and_delete(self):
+        self.client.get('/scoring/archers/info/')
+        user = CustomUser.objects.get(username='user1')
+        archer = Archer.objects.create(author=user, last_name='extra', first_name='Test', union_number=99)
+        self.assertEqual(self.client.get('/scoring/archers/info/').json()['count'], 4)
+
+        archer.delete()
+        self.assertEqual(self.client.get('/scoring/archers/info/').json()['count'], 3)
+
+    def test_archer_info_include_rows_is_paginated(self):
+        response = self.client.get('/scoring/archers/info/', {'include': 'rows', 'page_size': 2})
+        data = response.json()
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(len(data['archers']), 2)
+        self.assertIsNotNone(data['next'])
+
+@override_settings(CACHES=LOCAL_CACHES, MIDDLEWARE=NO_SILK_MIDDLEWARE)
+class PrefetchPlanTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_silk_request()
+        self.user = CustomUser.objects.create_user(username='user1', password='test')
+        self.union_number = 0
+
+        return super().setUp()
+
+    def create_archer(self):
+        self.union_number += 1
+        return Archer.objects.create(
+            author=self.user,
+            last_name=f'archer{self.union_number}',
+            first_name='Test',
+            union_number=self.union_number,
+        )
+
+    def create_competition(self, rounds, archers_per_round):
+        competition = Competition.objects.create(
+            author=self.user,
+            name=f'competition{Competition.objects.count()}',
+        )
+        for _ in range(rounds):
+            round = Round.objects.create(author=self.user, name=f'round{Round.objects.count()}')
+            CompetitionMembership.objects.create(author=self.user, competition=competition, round=round)
+            for _ in range(archers_per_round):
+                RoundMembership.objects.create(author=self.user, round=round, archer=self.create_archer())
+        return competition
+
+    def count_queries(self, url, params=None):
+        # Warm the cached summaries behind the ETag, count the rendering only
+        self.client.get(url, params)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_competition_list_query_count_does_not_grow_with_rows(self):
+        self.create_competition(rounds=1, archers_per_round=1)
+        few = self.count_queries('/scoring/competitions/')
+
+        for _ in range(4):
+            self.create_competition(rounds=3, archers_per_round=3)
+        many = self.count_queries('/scoring/competitions/')
+
+        self.assertEqual(few, many)
+        # competitions, rounds, archers
+        self.assertEqual(many, 3)
+
+    def test_club_list_query_count_does_not_grow_with_rows(self):
+        club = Club.objects.create(author=self.user, name='club0')
+        ClubMembership.objects.create(author=self.user, club=club, archer=self.create_archer())
+        few = self.count_queries('/scoring/clubs/')
+
+        for index in range(1, 6):
+            club = Club.objects.create(author=self.user, name=f'club{index}')
+            for _ in range(3):
+                ClubMembership.objects.create(author=self.user, club=club, archer=self.create_archer())
+        many = self.count_queries('/scoring/clubs/')
+
+        self.assertEqual(few, many)
+
+    def test_nested_lists_leave_out_inactive_rows(self):
+        club = Club.objects.create(author=self.user, name='club0')
+        active, inactive = self.create_archer(), self.create_archer()
+        inactive.is_active = False
+        inactive.save()
+        for archer in (active, inactive):
+            ClubMembership.objects.create(author=self.user, club=club, archer=archer)
+
+        response = self.client.get(f'/scoring/clubs/{club.pk}/')
+        self.assertEqual([archer['id'] for archer in response.json()['archers']], [str(active.pk)])
+        response = self.client.get(f'/scoring/clubs/{club.pk}/', {'include_inactive': '1'})
+        self.assertEqual(
+            sorted(archer['id'] for archer in response.json()['archers']),
+            sorted([str(active.pk), str(inactive.pk)]),
+        )
+
+    def test_round_detail_query_count_does_not_grow_with_archers(self):
+        competition = self.create_competition(rounds=2, archers_per_round=1)
+        few, crowded = competition.rounds.order_by('name')
+        for _ in range(10):
+            RoundMembership.objects.create(author=self.user, round=crowded, archer=self.create_archer())
+
+        self.assertEqual(
+            self.count_queries(f'/scoring/rounds/{few.pk}/'),
+            self.count_queries(f'/scoring/rounds/{crowded.pk}/'),
+        )
+
+    def test_competition_info_rows_query_count_does_not_grow_with_rows(self):
+        self.create_competition(rounds=1, archers_per_round=1)
+        few = self.count_queries('/scoring/competitions/info/', {'include': 'rows'})
+
+        cache.clear()
+        for _ in range(4):
+            self.create_competition(rounds=3, archers_per_round=3)
+        many = self.count_queries('/scoring/competitions/info/', {'include': 'rows'})
+
+        self.assertEqual(few, many)
+
+@override_settings(CACHES=LOCAL_CACHES, MIDDLEWARE=NO_SILK_MIDDLEWARE)
+class LeaderboardTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='user1', password='test')
+        self.competition = Competition.objects.create(author=self.user, name='competition')
+        self.round1 = Round.objects.create(author=self.user, name='round1')
+        self.round2 = Round.objects.create(author=self.user, name='round2')
+        for round in (self.round1, self.round2):
+            CompetitionMembership.objects.create(author=self.user, competition=self.competition, round=round)
+        self.club = Club.objects.create(author=self.user, name='club')
+
+        self.archers = {}
+        for index, last_name in enumerate(['Ann', 'Bob', 'Cid']):
+            self.archers[last_name] = Archer.objects.create(
+                author=self.user, last_name=last_name, first_name='Test', union_number=index + 1,
+            )
+        for last_name in ('Ann', 'Cid'):
+            ClubMembership.objects.create(author=self.user, club=self.club, archer=self.archers[last_name])
+
+        return super().setUp()
+
+    def add_score(self, round, last_name, score, number_of_arrows):
+        round_archer, _created = RoundMembership.objects.get_or_create(
+            round=round, archer=self.archers[last_name], defaults={'author': self.user},
+        )
+        return Score.objects.create(
+            author=self.user, round_archer=round_archer, score=score, number_of_arrows=number_of_arrows,
+        )
+
+    def get_standings(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [
+            (entry['rank'], entry['archer']['last_name'], entry['total_score'])
+            for entry in response.json()['results']
+        ]
+
+    def test_competition_leaderboard_ranks_totals_with_arrow_tie_break(self):
+        self.add_score(self.round1, 'Ann', 280, 36)
+        self.add_score(self.round1, 'Bob', 290, 36)
+        self.add_score(self.round2, 'Ann', 290, 36)
+        self.add_score(self.round1, 'Cid', 570, 60)
+
+        self.assertEqual(
+            self.get_standings(f'/scoring/competitions/{self.competition.pk}/leaderboard/'),
+            [(1, 'Cid', 570), (2, 'Ann', 570), (3, 'Bob', 290)],
+        )
+
+    def test_more_tens_and_xs_break_ties(self):
+        for last_name, tens, xs in (('Ann', 2, 0), ('Bob', 3, 0), ('Cid', 3, 1)):
+            score = self.add_score(self.round1, last_name, 300, 36)
+            Score.objects.filter(pk=score.pk).update(tens=tens, xs=xs)
+        leaderboard.rebuild_round(self.round1.pk)
+
+        self.assertEqual(
+            self.get_standings(f'/scoring/rounds/{self.round1.pk}/leaderboard/'),
+            [(1, 'Cid', 300), (2, 'Bob', 300), (3, 'Ann', 300)],
+        )
+
+    def test_equal_totals_and_arrows_share_a_rank(self):
+        self.add_score(self.round1, 'Ann', 300, 36)
+        self.add_score(self.round1, 'Bob', 300, 36)
+        self.add_score(self.round1, 'Cid', 200, 36)
+
+        ranks = [rank for rank, _name, _score in self.get_standings(f'/scoring/rounds/{self.round1.pk}/leaderboard/')]
+        self.assertEqual(ranks, [1, 1, 3])
+
+    def test_leaderboard_is_updated_on_score_save_and_delete(self):
+        self.add_score(self.round1, 'Ann', 280, 36)
+        bob = self.add_score(self.round1, 'Bob', 250, 36)
+        url = f'/scoring/competitions/{self.competition.pk}/leaderboard/'
+
+        bob.score = 300
+        bob.save()
+        self.assertEqual(self.get_standings(url), [(1, 'Bob', 300), (2, 'Ann', 280)])
+
+        bob.delete()
+        self.assertEqual(self.get_standings(url), [(1, 'Ann', 280)])
+        self.assertFalse(LeaderboardEntry.objects.filter(archer=self.archers['Bob']).exists())
+
+    def test_admin_actions_update_the_leaderboard(self):
+        from .admin import set_active
+
+        self.add_score(self.round1, 'Ann', 280, 36)
+        bob = self.add_score(self.round1, 'Bob', 300, 36)
+        url = f'/scoring/rounds/{self.round1.pk}/leaderboard/'
+
+        set_active(Score.objects.filter(pk=bob.pk), False)
+        self.assertEqual(self.get_standings(url), [(1, 'Ann', 280)])
+        self.assertEqual(Score.all_objects.get(pk=bob.pk).version, bob.version + 1)
+
+        set_active(ClubMembership.objects.filter(archer=self.archers['Ann']), False)
+        self.assertEqual(self.get_standings(url, {'club': self.club.pk}), [])
+
+    def test_leaderboard_group_and_round_filters(self):
+        self.add_score(self.round1, 'Ann', 280, 36)
+        self.add_score(self.round1, 'Bob', 300, 36)
+        self.add_score(self.round2, 'Cid', 290, 36)
+        url = f'/scoring/competitions/{self.competition.pk}/leaderboard/'
+
+        self.assertEqual(
+            self.get_standings(url, {'club': self.club.pk}),
+            [(1, 'Cid', 290), (2, 'Ann', 280)],
+        )
+        self.assertEqual(
+            self.get_standings(url, {'round': self.round1.pk}),
+            [(1, 'Bob', 300), (2, 'Ann', 280)],
+        )
+
+        other_round = Round.objects.create(author=self.user, name='other')
+        response = self.client.get(url, {'round': other_round.pk})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(url, {'club': self.club.pk, 'team': self.club.pk})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_leaderboard_page_query_count_does_not_grow_with_archers(self):
+        self.add_score(self.round1, 'Ann', 280, 36)
+        url = f'/scoring/competitions/{self.competition.pk}/leaderboard/'
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url, {'page_size': 2})
+
+        for index in range(10):
+            archer = Archer.objects.create(
+                author=self.user, last_name=f'extra{index}', first_name='Test', union_number=100 + index,
+            )
+            self.archers[archer.last_name] = archer
+            self.add_score(self.round1, archer.last_name, 200 + index, 36)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url, {'page_size': 2})
+
+        self.assertEqual(len(few), len(many))
+        self.assertEqual(len(response.json()['results']), 2)
+
+class ArrowsTestCase(TestCase):
+    def test_pack_and_unpack_arrows(self):
+        packed = pack_arrows(['X', '10', '9', 'm', 7])
+        self.assertEqual(len(packed), 5)
+        self.assertEqual(unpack_arrows(packed), ['X', '10', '9', 'M', '7'])
+
+    def test_pack_rejects_invalid_arrows(self):
+        for value in ('11', 'Y', 12, -1, None):
+            with self.assertRaises(ValueError):
+                pack_arrows([value])
+
+    def test_summarize_ends(self):
+        totals = summarize_ends([pack_arrows(['X', '10', '9']), pack_arrows(['X', 'M', '5'])])
+        self.assertEqual(totals, {
+            'score': 44,
+            'number_of_arrows': 6,
+            'tens': 3,
+            'xs': 2,
+            'end_totals': [29, 15],
+        })
+
+class ScoreEndTestCase(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser(username='admin', password='test')
+        archer = Archer.objects.create(author=self.admin, last_name='Ann', first_name='Test', union_number=1)
+        sheet = ScoringSheet.objects.create(author=self.admin, name='3x3', rows=3, columns=3)
+        round = Round.objects.create(author=self.admin, name='round', scoringsheet=sheet)
+        round_archer = RoundMembership.objects.create(author=self.admin, round=round, archer=archer)
+        self.score = Score.objects.create(author=self.admin, round_archer=round_archer)
+        self.url = f'/scoring/scores/{self.score.pk}/ends/'
+        self.client.force_login(self.admin)
+
+        return super().setUp()
+
+    def test_ends_update_score_totals(self):
+        response = self.client.post(self.url, {'end_number': 1, 'arrows': ['X', '10', '9']}, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['total'], 29)
+        self.client.post(self.url, {'end_number': 2, 'arrows': ['8', 'M', 'X']}, content_type='application/json')
+
+        self.score.refresh_from_db()
+        self.assertEqual((self.score.score, self.score.number_of_arrows, self.score.tens, self.score.xs), (47, 6, 3, 2))
+
+        self.client.delete(f'{self.url}1/')
+        self.score.refresh_from_db()
+        self.assertEqual((self.score.score, self.score.number_of_arrows, self.score.tens, self.score.xs), (18, 3, 1, 1))
+
+    def test_ends_are_shaped_by_the_scoring_sheet(self):
+        response = self.client.post(self.url, {'end_number': 4, 'arrows': ['X']}, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('end_number', response.json())
+
+        response = self.client.post(self.url, {'end_number': 1, 'arrows': ['X', 'X', 'X', 'X']}, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('arrows', response.json())
+
+        response = self.client.post(self.url, {'end_number': 1, 'arrows': ['Z']}, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_duplicate_end_is_rejected(self):
+        self.client.post(self.url, {'end_number': 1, 'arrows': ['X']}, content_type='application/json')
+        response = self.client.post(self.url, {'end_number': 1, 'arrows': ['9']}, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ends_are_deleted_with_their_score(self):
+        self.client.post(self.url, {'end_number': 1, 'arrows': ['X']}, content_type='application/json')
+        self.score.delete()
+        self.assertFalse(ScoreEnd.objects.exists())
+
+@override_settings(CACHES=LOCAL_CACHES, MIDDLEWARE=NO_SILK_MIDDLEWARE)
+class ScoreBulkCreateTestCase(TestCase):
+    url = '/scoring/scores/bulk/'
+
+    def setUp(self):
+        cache.clear()
+        self.admin = CustomUser.objects.create_superuser(username='admin', password='test')
+        archer = Archer.objects.create(author=self.admin, last_name='Ann', first_name='Test', union_number=1)
+        self.round = Round.objects.create(author=self.admin, name='round')
+        self.round_archer = RoundMembership.objects.create(author=self.admin, round=self.round, archer=archer)
+        self.client.force_login(self.admin)
+
+        return super().setUp()
+
+    def post_lines(self, rows):
+        body = '\n'.join(json.dumps(row) for row in rows)
+        return self.client.post(self.url, body, content_type='application/x-ndjson')
+
+    def test_bulk_json_lines_reports_per_row_results(self):
+        rows = [
+            {'round_archer': str(self.round_archer.pk), 'score': 280, 'number_of_arrows': 30},
+            {'round_archer': str(uuid.uuid4()), 'score': 280, 'number_of_arrows': 30},
+            {'round_archer': str(self.round_archer.pk), 'score': -1},
+            {'round_archer': str(self.round_archer.pk), 'score': 290, 'number_of_arrows': 30},
+        ]
+        response = self.post_lines(rows)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual((data['created'], data['updated'], data['errors']), (2, 0, 2))
+        self.assertEqual([result['status'] for result in data['results']], ['created', 'error', 'error', 'created'])
+        self.assertIn('round_archer', data['results'][1]['errors'])
+        self.assertIn('score', data['results'][2]['errors'])
+        self.assertEqual(Score.objects.count(), 2)
+        self.assertEqual(self.client.get('/scoring/scores/info/').json()['count'], 2)
+
+    def test_bulk_upsert_by_id_and_leaderboard(self):
+        score_id = str(uuid.uuid4())
+        self.post_lines([{'id': score_id, 'round_archer': str(self.round_archer.pk), 'score': 100, 'number_of_arrows': 12}])
+        response = self.post_lines([{'id': score_id, 'round_archer': str(self.round_archer.pk), 'score': 250, 'number_of_arrows': 30}])
+
+        self.assertEqual(response.json()['results'][0]['status'], 'updated')
+        self.assertEqual(Score.objects.get(pk=score_id).score, 250)
+        entry = LeaderboardEntry.objects.get(round=self.round, group_type=LeaderboardEntry.GROUP_OVERALL)
+        self.assertEqual((entry.rank, entry.total_score, entry.total_arrows), (1, 250, 30))
+
+    def test_bulk_update_keeps_the_fields_left_out(self):
+        score = Score.objects.create(
+            author=self.admin, round_archer=self.round_archer, score=100, number_of_arrows=12,
+            info='windy', is_active=False,
+        )
+        response = self.post_lines([{'id': str(score.pk), 'score': 110}])
+
+        self.assertEqual(response.json()['results'][0]['status'], 'updated')
+        score = Score.all_objects.get(pk=score.pk)
+        self.assertEqual((score.score, score.number_of_arrows, score.info, score.is_active), (110, 12, 'windy', False))
+
+    def test_bulk_json_array_and_duplicate_ids(self):
+        score_id = str(uuid.uuid4())
+        row = {'id': score_id, 'round_archer': str(self.round_archer.pk), 'score': 100, 'number_of_arrows': 12}
+        response = self.client.post(self.url, [row, row], content_type='application/json')
+        self.assertEqual([result['status'] for result in response.json()['results']], ['created', 'error'])
+
+    def test_bulk_rejects_invalid_body(self):
+        response = self.client.post(self.url, '{"round_archer": ', content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(self.url, {'score': 1}, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @unittest.skipIf(msgpack is None, 'msgpack is not installed')
+    def test_bulk_msgpack(self):
+        body = msgpack.packb([{'round_archer': str(self.round_archer.pk), 'score': 280, 'number_of_arrows': 30}])
+        response = self.client.post(self.url, body, content_type='application/msgpack')
+        self.assertEqual(response.json()['created'], 1)
+
+    def test_bulk_requires_admin(self):
+        self.client.logout()
+        response = self.post_lines([{'round_archer': str(self.round_archer.pk), 'score': 1}])
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+@override_settings(CACHES=LOCAL_CACHES, MIDDLEWARE=NO_SILK_MIDDLEWARE)
+class ScoreIdempotencyTestCase(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser(username='admin', password='test')
+        archer = Archer.objects.create(author=self.admin, last_name='Ann', first_name='Test', union_number=1)
+        round = Round.objects.create(author=self.admin, name='round')
+        self.round_archer = RoundMembership.objects.create(author=self.admin, round=round, archer=archer)
+        self.client.force_login(self.admin)
+
+        return super().setUp()
+
+    def post_score(self, **extra):
+        data = {'round_archer': str(self.round_archer.pk), 'score': 280, 'number_of_arrows': 30, 'author': self.admin.pk}
+        return self.client.post('/scoring/scores/', data, content_type='application/json', **extra)
+
+    def test_retried_post_with_key_header_creates_one_score(self):
+        first = self.post_score(HTTP_IDEMPOTENCY_KEY='tablet-1-0001')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+
+        retry = self.post_score(HTTP_IDEMPOTENCY_KEY='tablet-1-0001')
+        self.assertEqual(retry.status_code, status.HTTP_200_OK)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json()['id'], first.json()['id'])
+        self.assertEqual(Score.objects.count(), 1)
+
+    def test_post_without_key_still_creates(self):
+        self.post_score()
+        self.post_score()
+        self.assertEqual(Score.objects.count(), 2)
+
+    def test_bulk_rows_with_used_keys_are_replayed(self):
+        row = {'round_archer': str(self.round_archer.pk), 'score': 280, 'number_of_arrows': 30, 'idempotency_key': 'batch-1'}
+        body = json.dumps(row)
+        first = self.client.post('/scoring/scores/bulk/', body, content_type='application/x-ndjson').json()
+        retry = self.client.post('/scoring/scores/bulk/', body, content_type='application/x-ndjson').json()
+
+        self.assertEqual((first['created'], retry['created'], retry['replayed']), (1, 0, 1))
+        self.assertEqual(retry['results'][0]['id'], first['results'][0]['id'])
+        self.assertEqual(Score.objects.count(), 1)
+
+    def test_stale_update_is_rejected(self):
+        score = self.post_score().json()
+        url = f"/scoring/scores/{score['id']}/"
+        self.assertEqual(score['version'], 1)
+
+        response = self.client.patch(url, {'score': 281}, content_type='application/json', HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['version'], 2)
+
+        response = self.client.patch(url, {'score': 282}, content_type='application/json', HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        response = self.client.patch(url, {'score': 282, 'version': 1}, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(Score.objects.get(pk=score['id']).score, 281)
+
+        response = self.client.patch(url, {'score': 283}, content_type='application/json')
+        self.assertEqual(response.json()['version'], 3)
+
+class InMemoryBrokerTestCase(TestCase):
+    def test_publish_fans_out_to_channel_subscribers(self):
+        broker = live.InMemoryBroker()
+        first = broker.subscribe('round:1')
+        second = broker.subscribe('round:1')
+        other = broker.subscribe('round:2')
+
+        self.assertEqual(broker.publish('round:1', {'event': 'score'}), 2)
+        self.assertIn('event: score', first.get(timeout=0))
+        self.assertEqual(first.get(timeout=0), None)
+        self.assertIsNotNone(second.get(timeout=0))
+        self.assertIsNone(other.get(timeout=0))
+
+        first.close()
+        second.close()
+        self.assertEqual(broker.publish('round:1', {'event': 'score'}), 0)
+
+    def test_slow_subscriber_drops_oldest_messages(self):
+        broker = live.InMemoryBroker()
+        subscription = live.Subscription(broker, 'round:1', max_pending=2)
+        for message in ('a', 'b', 'c'):
+            subscription.put(message)
+        self.assertEqual([subscription.get(timeout=0), subscription.get(timeout=0)], ['b', 'c'])
+
+@override_settings(CACHES=LOCAL_CACHES, MIDDLEWARE=NO_SILK_MIDDLEWARE, SCORING_LIVE_HEARTBEAT=0.01)
+class LiveScoresTestCase(TestCase):
+    def setUp(self):
+        live.reset_broker()
+        clear_silk_request()
+        self.user = CustomUser.objects.create_user(username='user1', password='test')
+        archer = Archer.objects.create(author=self.user, last_name='Ann', first_name='Test', union_number=1)
+        self.round = Round.objects.create(author=self.user, name='round')
+        self.competition = Competition.objects.create(author=self.user, name='competition')
+        CompetitionMembership.objects.create(author=self.user, competition=self.competition, round=self.round)
+        self.round_archer = RoundMembership.objects.create(author=self.user, round=self.round, archer=archer)
+
+        return super().setUp()
+
+    def open_stream(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = iter(response.streaming_content)
+        # The first chunk subscribes and sets the reconnect delay
+        self.assertTrue(next(stream).startswith(b'retry:'))
+        return response, stream
+
+    def next_event(self, stream):
+        for chunk in stream:
+            if not chunk.startswith(b':'):
+                return json.loads(chunk.decode().split('data: ', 1)[1])
+
+    def test_round_and_competition_streams_receive_score_deltas(self):
+        round_response, round_stream = self.open_stream(f'/scoring/rounds/{self.round.pk}/live/')
+        competition_response, competition_stream = self.open_stream(f'/scoring/competitions/{self.competition.pk}/live/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            score = Score.objects.create(author=self.user, round_archer=self.round_archer, score=280, number_of_arrows=30)
+
+        for stream in (round_stream, competition_stream):
+            event = self.next_event(stream)
+            self.assertEqual(event['action'], 'saved')
+            self.assertEqual(event['score']['id'], str(score.pk))
+            self.assertEqual(event['score']['score'], 280)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            score.delete()
+        self.assertEqual(self.next_event(round_stream)['action'], 'deleted')
+
+        round_response.close()
+        competition_response.close()
+        self.assertEqual(live.get_broker().subscriptions, {})
+
+    def test_publishing_costs_the_same_queries_for_any_number_of_viewers(self):
+        streams = [self.open_stream(f'/scoring/rounds/{self.round.pk}/live/') for _ in range(5)]
+        score = Score(author=self.user, round_archer=self.round_archer, score=280, number_of_arrows=30)
+
+        with self.assertNumQueries(2):
+            live.publish_scores([score])
+        for response, stream in streams:
+            self.assertEqual(self.next_event(stream)['score']['score'], 280)
+            response.close()
+
+    def test_live_stream_of_unknown_round(self):
+        response = self.client.get(f'/scoring/rounds/{uuid.uuid4()}/live/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class BenchmarkApiTestCase(TestCase):
+    def test_parse_scale(self):
+        from .management.commands.benchmark_api import format_scale, parse_scale
+
+        self.assertEqual(parse_scale('1k'), 1000)
+        self.assertEqual(parse_scale('100K'), 100000)
+        self.assertEqual(parse_scale('1m'), 1000000)
+        self.assertEqual(parse_scale('250'), 250)
+        self.assertEqual(format_scale(1000000), '1m')
+        self.assertEqual(format_scale(100000), '100k')
+        with self.assertRaises(ValueError):
+            parse_scale('many')
+
+    def test_every_detail_route_has_a_model(self):
+        from .management.commands.benchmark_api import get_route_models
+
+        models = get_route_models()
+        self.assertIs(models['rounds'], Round)
+        self.assertIs(models['scores'], Score)
+        self.assertIs(models['competitions'], Competition)
+
+    def test_compare_results(self):
+        from .management.commands.benchmark_api import compare_results
+
+        baseline = {'1k': {
+            'GET archers/': {'queries': 2, 'p95_ms': 10.0, 'peak_kb': 500.0},
+            'GET rounds/<uuid:pk>/live/': {'skipped': True},
+        }}
+        same = {'1k': {
+            'GET archers/': {'queries': 2, 'p95_ms': 11.0, 'peak_kb': 520.0},
+            'GET rounds/<uuid:pk>/live/': {'skipped': True},
+        }}
+        self.assertEqual(compare_results(baseline, same), [])
+
+        worse = {'1k': {'GET archers/': {'queries': 3, 'p95_ms': 20.0, 'peak_kb': 900.0}}}
+        regressions = compare_results(baseline, worse)
+        self.assertEqual(len(regressions), 3)
+        self.assertIn('2 -> 3 queries', regressions[0])
+        self.assertEqual(compare_results(baseline, worse, threshold=2.0, max_extra_queries=1), [])
+
+        failing = {'1k': {'GET archers/': {'status': 404, 'queries': 2, 'p95_ms': 10.0, 'peak_kb': 500.0}}}
+        self.assertEqual(compare_results({}, failing), ['1k GET archers/: status 404'])
+        baseline['1k']['GET archers/']['status'] = 200
+        moved = {'1k': {'GET archers/': {'status': 204, 'queries': 2, 'p95_ms': 10.0, 'peak_kb': 500.0}}}
+        self.assertEqual(compare_results(baseline, moved), ['1k GET archers/: status 200 -> 204'])
+
+
+class MembershipSortKeyTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='user1', password='test')
+        self.round = Round.objects.create(author=self.user, name='round b')
+        self.archer = Archer.objects.create(author=self.user, last_name='Ann', first_name='Test', union_number=1)
+        return super().setUp()
+
+    def test_default_ordering_needs_no_join(self):
+        other = Round.objects.create(author=self.user, name='round a')
+        RoundMembership.objects.create(author=self.user, round=self.round, archer=self.archer)
+        RoundMembership.objects.create(author=self.user, round=other, archer=self.archer)
+
+        queryset = RoundMembership.objects.all()
+        self.assertNotIn('JOIN', str(queryset.query))
+        self.assertEqual([membership.sort_key for membership in queryset], ['round a', 'round b'])
+
+    def test_renaming_the_parent_updates_the_sort_key(self):
+        membership = RoundMembership.objects.create(author=self.user, round=self.round, archer=self.archer)
+        self.round.name = 'renamed'
+        self.round.save()
+        membership.refresh_from_db()
+        self.assertEqual(membership.sort_key, 'renamed')
+
+    @override_settings(CACHES=LOCAL_CACHES, MIDDLEWARE=NO_SILK_MIDDLEWARE)
+    def test_renaming_the_parent_modifies_the_membership_list(self):
+        cache.clear()
+        RoundMembership.objects.create(author=self.user, round=self.round, archer=self.archer)
+        etag = self.client.get('/scoring/roundmemberships/')['ETag']
+        self.round.name = 'renamed'
+        self.round.save()
+        response = self.client.get('/scoring/roundmemberships/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_one_active_membership_per_pair(self):
+        RoundMembership.objects.create(author=self.user, round=self.round, archer=self.archer)
+        RoundMembership.objects.create(author=self.user, round=self.round, archer=self.archer, is_active=False)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            RoundMembership.objects.create(author=self.user, round=self.round, archer=self.archer)
+
+
+@override_settings(CACHES=LOCAL_CACHES, MIDDLEWARE=NO_SILK_MIDDLEWARE)
+class ActiveRowsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username='user1', password='test')
+        self.active = Archer.objects.create(author=self.user, last_name='Ann', first_name='Test', union_number=1)
+        self.inactive = Archer.objects.create(
+            author=self.user, last_name='Bob', first_name='Test', union_number=2, is_active=False,
+        )
+        return super().setUp()
+
+    def test_managers(self):
+        self.assertEqual(list(Archer.objects.all()), [self.active])
+        self.assertEqual(Archer.all_objects.count(), 2)
+        self.assertIs(Archer._default_manager, Archer.all_objects)
+
+    def test_lists_leave_inactive_rows_out(self):
+        response = self.client.get('/scoring/archers/')
+        self.assertEqual([row['last_name'] for row in response.json()['results']], ['Ann'])
+
+        response = self.client.get('/scoring/archers/', {'include_inactive': 1})
+        self.assertEqual([row['last_name'] for row in response.json()['results']], ['Ann', 'Bob'])
+
+    def test_detail_of_inactive_row(self):
+        response = self.client.get(f'/scoring/archers/{self.inactive.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(f'/scoring/archers/{self.inactive.pk}/', {'include_inactive': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_info_counts_active_rows(self):
+        self.assertEqual(self.client.get('/scoring/archers/info/').json()['count'], 1)
+        response = self.client.get('/scoring/archers/info/', {'include_inactive': 'true'})
+        self.assertEqual(response.json()['count'], 2)
+
+        self.inactive.is_active = True
+        self.inactive.save()
+        self.assertEqual(self.client.get('/scoring/archers/info/').json()['count'], 2)
+
+
+@override_settings(CACHES=LOCAL_CACHES, MIDDLEWARE=NO_SILK_MIDDLEWARE)
+class ReferenceCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_silk_request()
+        reference.clear_local()
+        self.user = CustomUser.objects.create_user(username='user1', password='test')
+        self.discipline = Discipline.objects.create(author=self.user, name='Indoor Archery')
+        return super().setUp()
+
+    def test_list_is_served_from_the_cache(self):
+        response = self.client.get('/scoring/disciplines/')
+        self.assertEqual([row['name'] for row in response.json()['results']], ['Indoor Archery'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/scoring/disciplines/')
+        self.assertEqual([row['name'] for row in response.json()['results']], ['Indoor Archery'])
+        self.assertEqual(reference.get_stats()['scoring.discipline']['local_hits'], 1)
+
+    def test_saves_invalidate_the_cache(self):
+        self.client.get('/scoring/disciplines/')
+        self.discipline.name = 'Field Archery'
+        self.discipline.save()
+        response = self.client.get('/scoring/disciplines/')
+        self.assertEqual([row['name'] for row in response.json()['results']], ['Field Archery'])
+
+        # Disciplines render their archers, a new member changes the response
+        self.client.get(f'/scoring/disciplines/{self.discipline.pk}/')
+        archer = Archer.objects.create(author=self.user, last_name='Ann', first_name='Test', union_number=1)
+        DisciplineMembership.objects.create(author=self.user, discipline=self.discipline, archer=archer)
+        response = self.client.get(f'/scoring/disciplines/{self.discipline.pk}/')
+        self.assertEqual([row['last_name'] for row in response.json()['archers']], ['Ann'])
+
+    def test_shared_layer_serves_other_processes(self):
+        self.client.get('/scoring/disciplines/')
+        reference.clear_local()
+        with self.assertNumQueries(0):
+            self.client.get('/scoring/disciplines/')
+        self.assertEqual(reference.get_stats()['scoring.discipline']['shared_hits'], 1)
+
+    def test_foreign_key_lookups_use_the_cache(self):
+        from .serializers import ReferencePrimaryKeyRelatedField
+
+        field = ReferencePrimaryKeyRelatedField(queryset=Discipline.all_objects.all())
+        with self.assertNumQueries(1):
+            self.assertEqual(field.to_internal_value(str(self.discipline.pk)), self.discipline)
+        with self.assertNumQueries(0):
+            self.assertEqual(field.to_internal_value(str(self.discipline.pk)), self.discipline)
+        with self.assertRaises(ValidationError):
+            field.to_internal_value(str(uuid.uuid4()))
+        with self.assertRaises(ValidationError):
+            field.to_internal_value('not-a-uuid')
+
+    def test_stats_are_for_admins(self):
+        response = self.client.get('/scoring/reference-cache/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        admin = CustomUser.objects.create_superuser(username='admin', password='test')
+        self.client.force_login(admin)
+        response = self.client.get('/scoring/reference-cache/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('scoring.scoringsheet', response.json())
+
+
+@override_settings(CACHES=LOCAL_CACHES, MIDDLEWARE=NO_SILK_MIDDLEWARE)
+class TieredCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        cache.reset_stats()
+        self.shared = caches['shared']
+        return super().setUp()
+
+    def get_cache(self, **options):
+        return TieredCache('shared', {'OPTIONS': options})
+
+    def test_local_layer_expires(self):
+        tiered = self.get_cache(LOCAL_TIMEOUT=0.05)
+        tiered.set('scoring:test:key', 'value')
+        # Gone from the shared cache, still served from this process
+        self.shared.delete('scoring:test:key')
+        self.assertEqual(tiered.get('scoring:test:key'), 'value')
+        time.sleep(0.1)
+        self.assertIsNone(tiered.get('scoring:test:key'))
+
+    def test_local_layer_is_an_lru(self):
+        tiered = self.get_cache(MAX_ENTRIES=2)
+        for key in ('a', 'b', 'c'):
+            tiered.set(f'scoring:test:{key}', key)
+        self.shared.clear()
+        self.assertIsNone(tiered.get('scoring:test:a'))
+        self.assertEqual(tiered.get('scoring:test:c'), 'c')
+
+    def test_get_or_set_loads_once(self):
+        tiered = self.get_cache()
+        calls = []
+
+        def load():
+            calls.append(1)
+            time.sleep(0.05)
+            return 42
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(tiered.get_or_set('scoring:test:answer', load)))
+            for _index in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [42] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(tiered.get_stats()['prefixes']['scoring:test:answer']['loads'], 1)
+
+    def test_get_or_set_waits_for_other_process(self):
+        tiered = self.get_cache()
+        # Another process holds the lock and stores the value a bit later
+        self.shared.add('scoring:test:answer:lock', 1)
+        timer = threading.Timer(0.05, lambda: self.shared.set('scoring:test:answer', 42))
+        timer.start()
+        self.assertEqual(tiered.get_or_set('scoring:test:answer', lambda: self.fail('loaded twice')), 42)
+        timer.join()
+        self.assertEqual(tiered.get_stats()['prefixes']['scoring:test:answer']['waits'], 1)
+
+    def test_none_is_not_cached(self):
+        tiered = self.get_cache()
+        self.assertIsNone(tiered.get_or_set('scoring:test:none', lambda: None))
+        self.assertEqual(tiered.get_or_set('scoring:test:none', lambda: 1), 1)
+
+    def test_metrics_per_prefix(self):
+        self.client.get('/scoring/archers/info/')
+        self.client.get('/scoring/archers/info/')
+        stats = cache.get_stats()['prefixes']['scoring:summary:scoring.archer']
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['loads'], 1)
+        self.assertEqual(stats['local_hits'], 1)
+
+    def test_stats_are_for_admins(self):
+        response = self.client.get('/scoring/cache/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        admin = CustomUser.objects.create_superuser(username='admin', password='test')
+        self.client.force_login(admin)
+        response = self.client.get('/scoring/cache/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('prefixes', response.json())
+
+
+class DatabaseSharedCacheTestCase(TestCase):
+    def test_values_go_through_the_cache_table(self):
+        cache.clear()
+        cache.set('scoring:test:key', {'count': 1})
+        cache.clear_local()
+        with self.assertNumQueries(1):
+            self.assertEqual(cache.get('scoring:test:key'), {'count': 1})
+        with self.assertNumQueries(0):
+            self.assertEqual(cache.get('scoring:test:key'), {'count': 1})
+
+
+@override_settings(CACHES=LOCAL_CACHES, MIDDLEWARE=NO_SILK_MIDDLEWARE)
+class ConditionalGetTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        reference.clear_local()
+        self.user = CustomUser.objects.create_user(username='user1', password='test')
+        self.archer = Archer.objects.create(author=self.user, last_name='Ann', first_name='Test', union_number=1)
+        return super().setUp()
+
+    def test_unchanged_list_is_not_modified(self):
+        response = self.client.get('/scoring/archers/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/scoring/archers/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_changes_modify_the_list(self):
+        etag = self.client.get('/scoring/archers/')['ETag']
+        self.archer.city = 'Breda'
+        self.archer.save()
+        response = self.client.get('/scoring/archers/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(f'/scoring/archers/{self.archer.pk}/')['Last-Modified']
+        response = self.client.get(f'/scoring/archers/{self.archer.pk}/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_nested_rows_modify_the_detail(self):
+        club = Club.objects.create(author=self.user, name='club0')
+        etag = self.client.get(f'/scoring/clubs/{club.pk}/')['ETag']
+        ClubMembership.objects.create(author=self.user, club=club, archer=self.archer)
+        response = self.client.get(f'/scoring/clubs/{club.pk}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()['archers']), 1)
+
+    def test_score_etag_is_its_version(self):
+        round = Round.objects.create(author=self.user, name='round0')
+        round_archer = RoundMembership.objects.create(author=self.user, round=round, archer=self.archer)
+        score = Score.objects.create(author=self.user, round_archer=round_archer, score=280, number_of_arrows=30)
+        response = self.client.get(f'/scoring/scores/{score.pk}/')
+        self.assertEqual(response['ETag'], 'W/"1"')
+
+    def test_user_lists_validate_per_user(self):
+        other = CustomUser.objects.create_user(username='user2', password='test')
+        self.client.force_login(self.user)
+        response = self.client.get('/scoring/user-archers/')
+        self.assertIn('Cookie', response['Vary'])
+        self.client.force_login(other)
+        response = self.client.get('/scoring/user-archers/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), [])
+
+    def test_other_etags_in_if_match_fail_the_precondition(self):
+        round = Round.objects.create(author=self.user, name='round0')
+        round_archer = RoundMembership.objects.create(author=self.user, round=round, archer=self.archer)
+        score = Score.objects.create(author=self.user, round_archer=round_archer, score=280, number_of_arrows=30)
+        admin = CustomUser.objects.create_superuser(username='admin', password='test')
+        self.client.force_login(admin)
+        response = self.client.patch(
+            f'/scoring/scores/{score.pk}/', {'score': 281}, content_type='application/json',
+            HTTP_IF_MATCH='W/"0cc175b9c0f1b6a831c399e269772661"',
+        )
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_reference_data_costs_no_query(self):
+        Discipline.objects.create(author=self.user, name='Indoor Archery')
+        etag = self.client.get('/scoring/disciplines/')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/scoring/disciplines/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class CopySqliteToPostgresTestCase(TestCase):
+    """
+    Copies into the test database, PostgreSQL when the tests run with
+    POSTGRES_DB set (e.g. against a local postgres container).
+    """
+    alias = 'copy_test_source'
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = f'{directory.name}/db.sqlite3'
+        source = open_sqlite(self.alias, self.path)
+        try:
+            self.create_schema(source)
+            user = CustomUser.objects.db_manager(self.alias).create_user(username='user1', password='test')
+            self.archer = Archer(author=user, last_name='Ann', first_name='Test', union_number=1, slug='ann')
+            self.archer.save(using=self.alias)
+            discipline = Discipline(author=user, name='Indoor Archery', slug='indoor-archery')
+            discipline.save(using=self.alias)
+            DisciplineMembership(author=user, discipline=discipline, archer=self.archer).save(using=self.alias)
+        finally:
+            source.close()
+            del connections[self.alias]
+        return super().setUp()
+
+    @staticmethod
+    def create_schema(source):
+        # Migrating a second database runs Wagtail's data migrations against
+        # the default one, so the tables are created from the models and every
+        # migration is recorded as applied.
+        with source.schema_editor() as editor:
+            for model in apps.get_models():
+                if model._meta.managed and not model._meta.proxy:
+                    editor.create_model(model)
+        recorder = MigrationRecorder(source)
+        recorder.ensure_schema()
+        for app_label, name in MigrationLoader(source).graph.nodes:
+            recorder.record_applied(app_label, name)
+
+    def test_copies_every_row_as_is(self):
+        call_command('copy_sqlite_to_postgres', self.path, stdout=StringIO())
+        archer = Archer.all_objects.get()
+        self.assertEqual(archer.pk, self.archer.pk)
+        self.assertEqual(archer.modified_at, self.archer.modified_at)
+        self.assertEqual(archer.slug, 'ann')
+        self.assertEqual(DisciplineMembership.all_objects.get().sort_key, 'Indoor Archery')
+        self.assertEqual(CustomUser.objects.get().username, 'user1')
+
+    def test_refuses_to_copy_into_filled_tables(self):
+        call_command('copy_sqlite_to_postgres', self.path, stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('copy_sqlite_to_postgres', self.path, stdout=StringIO())
+        call_command('copy_sqlite_to_postgres', self.path, '--truncate', stdout=StringIO())
+        self.assertEqual(Archer.all_objects.count(), 1)
+
+    def test_skips_wagtail_pages(self):
+        from .management.commands.copy_sqlite_to_postgres import get_copied_models
+
+        models = get_copied_models(['userauth', 'scoring'])
+        self.assertIn(Score, models)
+        self.assertLess(models.index(CustomUser), models.index(Archer))
+        self.assertLess(models.index(Round), models.index(RoundMembership))
+        self.assertFalse(any(issubclass(model, Page) for model in models))
+
+
+@unittest.skipUnless(settings.DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3', 'SQLite only')
+class SQLiteWriteQueueTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.lock_path = f'{directory.name}/db.sqlite3.write-lock'
+        self.admin = CustomUser.objects.create_superuser(username='admin', password='test')
+        archer = Archer.objects.create(author=self.admin, last_name='Ann', first_name='Test', union_number=1)
+        round = Round.objects.create(author=self.admin, name='round')
+        self.round_archer = RoundMembership.objects.create(author=self.admin, round=round, archer=archer)
+        self.client.force_login(self.admin)
+        return super().setUp()
+
+    def post_score(self):
+        data = {'round_archer': str(self.round_archer.pk), 'score': 280, 'number_of_arrows': 30, 'author': self.admin.pk}
+        with self.settings(
+            SCORING_SQLITE_WRITE_QUEUE=True, SCORING_SQLITE_WRITE_LOCK=self.lock_path, SCORING_SQLITE_WRITE_TIMEOUT=0.05,
+        ):
+            return self.client.post('/scoring/scores/', data, content_type='application/json')
+
+    def test_writes_go_through_when_the_queue_is_free(self):
+        self.assertEqual(self.post_score().status_code, status.HTTP_201_CREATED)
+
+    def test_writes_wait_for_the_lock(self):
+        from .middleware import write_lock
+
+        with write_lock(self.lock_path, 1) as acquired:
+            self.assertTrue(acquired)
+            response = self.post_score()
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(Score.objects.count(), 0)
+
+    def test_reads_are_not_queued(self):
+        from .middleware import write_lock
+
+        with write_lock(self.lock_path, 1), self.settings(
+            SCORING_SQLITE_WRITE_QUEUE=True, SCORING_SQLITE_WRITE_LOCK=self.lock_path, SCORING_SQLITE_WRITE_TIMEOUT=0.05,
+        ):
+            self.assertEqual(self.client.get('/scoring/scores/').status_code, status.HTTP_200_OK)
+
+    def test_performance_pragmas(self):
+        if 'init_command' not in connection.settings_dict['OPTIONS']:
+            self.skipTest('SCORING_SQLITE_TUNING is off')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], settings.SCORING_SQLITE_PRAGMAS['busy_timeout'])
+
+
+@override_settings(CACHES=LOCAL_CACHES, MIDDLEWARE=NO_SILK_MIDDLEWARE)
+class ExportTestCase(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser(username='admin', password='test')
+        self.ann = Archer.objects.create(author=self.admin, last_name='Ann', first_name='Test', union_number=1)
+        self.bob = Archer.objects.create(author=self.admin, last_name='Bob', first_name='Test', union_number=2)
+        club = Club.objects.create(author=self.admin, name='club')
+        ClubMembership.objects.create(author=self.admin, club=club, archer=self.ann)
+        self.club = club
+        self.winter = Round.objects.create(author=self.admin, name='winter', start_date='2026-01-10')
+        self.summer = Round.objects.create(author=self.admin, name='summer', start_date='2026-07-10')
+        self.competition = Competition.objects.create(author=self.admin, name='competition')
+        CompetitionMembership.objects.create(author=self.admin, competition=self.competition, round=self.winter)
+        for round, score in ((self.winter, 280), (self.summer, 290)):
+            for archer in (self.ann, self.bob):
+                round_archer = RoundMembership.objects.create(author=self.admin, round=round, archer=archer)
+                Score.objects.create(author=self.admin, round_archer=round_archer, score=score, number_of_arrows=30)
+        self.client.force_login(self.admin)
+        return super().setUp()
+
+    def get_export(self, path, **params):
+        response = self.client.get(f'/scoring/export/{path}', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_scores(self):
+        lines = self.get_export('scores.csv').splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['id', 'round_id', 'round'])
+        self.assertEqual(len(lines), 5)
+
+    def test_ndjson_filters(self):
+        rows = [json.loads(line) for line in self.get_export('scores.ndjson', competition=self.competition.pk).splitlines()]
+        self.assertEqual({(row['last_name'], row['score']) for row in rows}, {('Ann', 280), ('Bob', 280)})
+        rows = [json.loads(line) for line in self.get_export('scores.ndjson', club=self.club.pk, **{'from': '2026-06-01'}).splitlines()]
+        self.assertEqual([(row['last_name'], row['score'], row['round_date']) for row in rows], [('Ann', 290, '2026-07-10')])
+        rows = [json.loads(line) for line in self.get_export('archers.ndjson', round=self.summer.pk, club=self.club.pk).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [str(self.ann.pk)])
+
+    def test_inactive_rows(self):
+        Score.all_objects.filter(round_archer__round=self.summer).update(is_active=False)
+        self.assertEqual(len(self.get_export('scores.csv').splitlines()), 3)
+        self.assertEqual(len(self.get_export('scores.csv', include_inactive='true').splitlines()), 5)
+
+    def test_bad_requests(self):
+        self.assertEqual(self.client.get('/scoring/export/scores.pdf').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get('/scoring/export/teams.csv').status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get('/scoring/export/scores.csv', {'round': 'x', 'to': '2026-13-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.json()), {'round', 'to'})
+
+    def test_export_requires_admin(self):
+        self.client.logout()
+        self.assertEqual(self.client.get('/scoring/export/scores.csv').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @unittest.skipIf(export.openpyxl is None, 'openpyxl is not installed')
+    def test_xlsx(self):
+        from io import BytesIO
+
+        response = self.client.get('/scoring/export/registrations.xlsx')
+        workbook = export.openpyxl.load_workbook(BytesIO(b''.join(response.streaming_content)))
+        rows = list(workbook['registrations'].values)
+        self.assertEqual(rows[0][:3], ('id', 'round_id', 'round'))
+        self.assertEqual(len(rows), 5)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = f'{directory}/registrations.csv'
+            call_command('export_scoring_data', 'registrations', '--round', str(self.winter.pk), '-o', path, stderr=StringIO())
+            with open(path, encoding='utf-8') as output:
+                self.assertEqual(len(output.read().splitlines()), 3)
+        with self.assertRaises(CommandError):
+            call_command('export_scoring_data', 'scores', '--from', 'yesterday')
+
+
+@override_settings(CACHES=LOCAL_CACHES, MIDDLEWARE=NO_SILK_MIDDLEWARE)
+class ImportTestCase(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser(username='admin', password='test')
+        self.ann = Archer.objects.create(author=self.admin, last_name='Ann', first_name='Test', union_number=1)
+        self.round = Round.objects.create(author=self.admin, name='winter')
+        self.club = Club.objects.create(author=self.admin, name='De Roos')
+        self.client.force_login(self.admin)
+        return super().setUp()
+
+    def post_file(self, name, content, filename='import.csv', **params):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        url = f'/scoring/import/{name}/'
+        if params:
+            url += '?' + '&'.join(f'{key}={value}' for key, value in params.items())
+        return self.client.post(url, {'file': SimpleUploadedFile(filename, content.encode())})
+
+    def test_dry_run_then_import_archers(self):
+        content = 'union_number,last_name,first_name,city\n1,Ann,Test,Breda\n2,Bob,Test,\n'
+        response = self.post_file('archers', content, dry_run=1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        report = response.json()
+        self.assertEqual((report['dry_run'], report['created'], report['updated']), (True, 1, 1))
+        self.assertEqual(report['results'][0]['changes'], {'city': [None, 'Breda']})
+        self.assertEqual(Archer.objects.count(), 1)
+
+        report = self.post_file('archers', content).json()
+        self.assertEqual((report['created'], report['updated'], report['unchanged']), (1, 1, 0))
+        self.assertEqual(Archer.objects.get(union_number=1).city, 'Breda')
+        self.assertEqual(Archer.objects.get(union_number=2).author, self.admin)
+        self.assertEqual(self.post_file('archers', content).json()['unchanged'], 2)
+
+    def test_errors_and_conflicts(self):
+        Club.objects.create(author=self.admin, name='Twins')
+        Club.objects.create(author=self.admin, name='Twins')
+        content = 'club,union_number,start_date\nDe Roos,1,2026-01-01\nDe Roos,1,\nTwins,1,\nDe Roos,9,\nDe Roos,1,yesterday\n'
+        report = self.post_file('clubmemberships', content).json()
+        self.assertEqual([result['status'] for result in report['results']], ['created', 'conflict', 'conflict', 'error', 'error'])
+        self.assertEqual(report['results'][1]['line'], 3)
+        self.assertIn('union_number', report['results'][3]['errors'])
+        self.assertIn('start_date', report['results'][4]['errors'])
+        membership = ClubMembership.objects.get()
+        self.assertEqual((membership.club, membership.archer, str(membership.start_date)), (self.club, self.ann, '2026-01-01'))
+
+    def test_memberships_get_sort_keys(self):
+        category = Category.objects.create(author=self.admin, name='Recurve')
+        report = self.post_file('categorymemberships', 'category,union_number,agegroup\nRecurve,1,\n').json()
+        self.assertEqual(report['created'], 1)
+        membership = CategoryMembership.objects.get()
+        self.assertEqual((membership.category, membership.agegroup, membership.sort_key), (category, None, 'Recurve'))
+        self.post_file('registrations', 'round,union_number\nwinter,1\n')
+        self.assertEqual(RoundMembership.objects.get().sort_key, 'winter')
+
+    def test_export_round_trip(self):
+        ClubMembership.objects.create(author=self.admin, club=self.club, archer=self.ann)
+        content = b''.join(self.client.get('/scoring/export/clubmemberships.csv').streaming_content).decode()
+        report = self.post_file('clubmemberships', content).json()
+        self.assertEqual(report['unchanged'], 1)
+        self.assertIn('last_name', report['ignored_columns'])
+
+    def test_bad_requests(self):
+        response = self.post_file('registrations', 'union_number\n1\n')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post('/scoring/import/scores/').status_code, status.HTTP_404_NOT_FOUND)
+        self.client.logout()
+        self.assertEqual(self.post_file('archers', 'union_number\n1\n').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as file:
+            file.write('round,union_number\nwinter,1\n')
+            file.flush()
+            stdout = StringIO()
+            call_command('import_scoring_data', 'registrations', file.name, '--dry-run', stdout=stdout)
+            self.assertIn('1 created', stdout.getvalue())
+            self.assertFalse(RoundMembership.objects.exists())
+            call_command('import_scoring_data', 'registrations', file.name, stdout=StringIO())
+            self.assertTrue(RoundMembership.objects.exists())
+
+
+class SlugAllocatorTestCase(TestCase):
+    def setUp(self):
+        clear_silk_request()
+        self.user = CustomUser.objects.create_user(username='user1', password='test')
+        return super().setUp()
+
+    def test_numbering_continues_after_existing_slugs(self):
+        from .slugs import assign_slugs
+
+        Archer.objects.create(author=self.user, last_name='Ann', first_name='One')
+        Archer.objects.create(author=self.user, last_name='Ann', first_name='Two')
+        archers = [Archer(author=self.user, last_name='Ann', first_name=str(index)) for index in range(3)]
+        archers.append(Archer(author=self.user, last_name='Bob', first_name='Test'))
+        assign_slugs(archers)
+        Archer.objects.bulk_create(archers)
+        self.assertEqual(
+            list(Archer.objects.filter(pk__in=[archer.pk for archer in archers]).order_by('slug').values_list('slug', flat=True)),
+            ['ann-3', 'ann-4', 'ann-5', 'bob'],
+        )
+
+    def test_one_query_per_relation_and_batch(self):
+        from .slugs import SlugAllocator
+
+        archer = Archer.objects.create(author=self.user, last_name='Ann', first_name='Test')
+        round = Round.objects.create(author=self.user, name='Winter')
+        old = RoundMembership.objects.create(author=self.user, round=round, archer=archer)
+        self.assertEqual(old.slug, 'ann-winter')
+        old.is_active = False
+        old.save()
+
+        membership = RoundMembership(author=self.user, round_id=round.pk, archer_id=archer.pk, sort_key='Winter')
+        allocator = SlugAllocator(RoundMembership)
+        with self.assertNumQueries(3):
+            allocator.assign([membership])
+        RoundMembership.objects.bulk_create([membership])
+        self.assertEqual(RoundMembership.objects.get().slug, 'ann-winter-2')
+
+    def test_long_slugs_are_shortened_like_autoslugfield(self):
+        from .slugs import assign_slugs
+
+        first = Archer.objects.create(author=self.user, last_name='a' * 60, first_name='Test')
+        second = Archer(author=self.user, last_name='a' * 60, first_name='Test')
+        assign_slugs([second])
+        self.assertEqual((first.slug, second.slug), ('a' * 50, 'a' * 48 + '-2'))
+
+    def test_saved_rows_keep_building_their_own_slugs(self):
+        archer = Archer(author=self.user, last_name='Ann', first_name='Test', slug='chosen')
+        archer.save()
+        self.assertEqual(archer.slug, 'ann')
+
+    def test_migrations_see_an_autoslugfield(self):
+        _name, path, _args, kwargs = Archer._meta.get_field('slug').deconstruct()
+        self.assertEqual((path, kwargs['populate_from']), ('django_extensions.db.fields.AutoSlugField', 'last_name'))
+
+
+@override_settings(SCORING_SYNC_LAG=0)
+class SyncTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='user1', password='test')
+        self.client.force_login(self.user)
+        return super().setUp()
+
+    def sync(self, **params):
+        response = self.client.get('/scoring/sync/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_upserts_then_deletes(self):
+        archer = Archer.objects.create(author=self.user, last_name='Ann', first_name='Test')
+        round = Round.objects.create(author=self.user, name='winter')
+        page = self.sync()
+        self.assertEqual(
+            [(change['type'], change['op'], change['id']) for change in page['changes']],
+            [('archer', 'upsert', str(archer.pk)), ('round', 'upsert', str(round.pk))],
+        )
+        self.assertEqual(page['changes'][0]['data']['last_name'], 'Ann')
+        self.assertFalse(page['has_more'])
+        self.assertEqual(self.sync(since=page['cursor'])['changes'], [])
+
+        pk = archer.pk
+        archer.delete()
+        changes = self.sync(since=page['cursor'])['changes']
+        self.assertEqual(
+            [(change['type'], change['op'], change['id']) for change in changes],
+            [('archer', 'delete', str(pk))],
+        )
+
+    def test_pages_cover_every_change_once(self):
+        ids = {str(Archer.objects.create(author=self.user, last_name=f'Archer {index}', first_name='Test').pk) for index in range(3)}
+        ids |= {str(Club.objects.create(author=self.user, name=f'Club {index}').pk) for index in range(2)}
+        seen = []
+        page = self.sync(page_size=2)
+        seen += [change['id'] for change in page['changes']]
+        while page['has_more']:
+            self.assertIn('since=', page['next'])
+            page = self.sync(since=page['cursor'], page_size=2)
+            seen += [change['id'] for change in page['changes']]
+        self.assertEqual(sorted(seen), sorted(ids))
+
+    def test_renamed_round_resyncs_its_registrations(self):
+        round = Round.objects.create(author=self.user, name='winter')
+        archer = Archer.objects.create(author=self.user, last_name='Ann', first_name='Test')
+        membership = RoundMembership.objects.create(author=self.user, round=round, archer=archer)
+        cursor = self.sync()['cursor']
+        round.name = 'summer'
+        round.save()
+        changes = self.sync(since=cursor)['changes']
+        self.assertEqual({change['id'] for change in changes}, {str(round.pk), str(membership.pk)})
+        self.assertEqual(changes[-1]['data']['sort_key'], 'summer')
+
+    def test_bad_and_expired_cursors(self):
+        self.assertEqual(self.client.get('/scoring/sync/', {'since': 'nonsense'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/scoring/sync/', {'page_size': 0}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.client.get('/scoring/sync/', {'since': '2000-01-01T00:00:00Z'}).status_code, status.HTTP_410_GONE,
+        )
+        self.client.logout()
+        self.assertEqual(self.client.get('/scoring/sync/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_prune_tombstones(self):
+        from .models import Tombstone
+
+        Tombstone.objects.create(model='archer', object_id=uuid.uuid4(), deleted_at=timezone.now() - datetime.timedelta(days=365))
+        Tombstone.objects.create(model='archer', object_id=uuid.uuid4())
+        call_command('prune_sync_tombstones', stdout=StringIO())
+        self.assertEqual(Tombstone.objects.count(), 1)
+
+
+class PrimaryKeyTestCase(TestCase):
+    def test_uuid7_keys_are_time_ordered(self):
+        from .ids import uuid7, uuid7_time
+
+        keys = [uuid7() for _index in range(10000)]
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(len(set(keys)), len(keys))
+        self.assertEqual((keys[0].version, keys[0].variant), (7, uuid.RFC_4122))
+        self.assertLessEqual(abs(uuid7_time(keys[0]) - time.time() * 1000), 1000)
+        self.assertIsNone(uuid7_time(uuid.uuid4()))
+
+    def test_new_rows_follow_older_uuid4_rows(self):
+        user = CustomUser.objects.create_user(username='user1', password='test')
+        old = Archer.objects.create(author=user, id=uuid.uuid4(), last_name='Old', first_name='Test')
+        first = Archer.objects.create(author=user, last_name='Ann', first_name='Test')
+        second = Archer.objects.create(author=user, last_name='Bob', first_name='Test')
+        self.assertEqual((first.pk.version, old.pk.version), (7, 4))
+        self.assertLess(first.pk, second.pk)
+        self.assertEqual(Archer.objects.get(pk=old.pk), old)
+
+
+@override_settings(CACHES=LOCAL_CACHES, MIDDLEWARE=NO_SILK_MIDDLEWARE)
+class ScoreValidationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_silk_request()
+        self.admin = CustomUser.objects.create_superuser(username='admin', password='test')
+        archer = Archer.objects.create(author=self.admin, last_name='Ann', first_name='Test', union_number=1)
+        face = TargetFaceNameChoice.objects.create(
+            author=self.admin, name='122 cm imperial', environment='Outdoor', discipline='Target Archery',
+            targetsize='122 cm', keyfeature='5-Zone',
+        )
+        sheet = ScoringSheet.objects.create(author=self.admin, name='6x6', rows=6, columns=6)
+        self.round = Round.objects.create(author=self.admin, name='york', scoringsheet=sheet, targetface=face)
+        self.round_archer = RoundMembership.objects.create(author=self.admin, round=self.round, archer=archer)
+        self.client.force_login(self.admin)
+        return super().setUp()
+
+    def post_score(self, score, number_of_arrows):
+        data = {'round_archer': str(self.round_archer.pk), 'score': score, 'number_of_arrows': number_of_arrows}
+        return self.client.post('/scoring/scores/', data, content_type='application/json')
+
+    def test_scores_are_checked_against_the_target_face(self):
+        response = self.post_score(325, 36)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('score', response.json())
+        response = self.post_score(300, 37)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('number_of_arrows', response.json())
+        self.assertEqual(self.post_score(324, 36).status_code, status.HTTP_201_CREATED)
+
+        response = self.client.post('/scoring/scores/bulk/', [
+            {'round_archer': str(self.round_archer.pk), 'score': 325, 'number_of_arrows': 36},
+            {'round_archer': str(self.round_archer.pk), 'score': 300, 'number_of_arrows': 36},
+        ], content_type='application/json')
+        self.assertEqual([result['status'] for result in response.json()['results']], ['error', 'created'])
+
+    def test_ended_rounds_take_no_new_scores(self):
+        score = Score.objects.create(author=self.admin, round_archer=self.round_archer, score=100, number_of_arrows=36)
+        self.round.end_date = timezone.localdate() - datetime.timedelta(days=1)
+        self.round.save()
+        response = self.post_score(300, 36)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('round_archer', response.json())
+        response = self.client.patch(f'/scoring/scores/{score.pk}/', {'score': 110}, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_end_arrows_are_checked_against_the_target_face(self):
+        score = Score.objects.create(author=self.admin, round_archer=self.round_archer)
+        url = f'/scoring/scores/{score.pk}/ends/'
+        response = self.client.post(url, {'end_number': 1, 'arrows': ['9', '10']}, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('arrows', response.json())
+        response = self.client.post(url, {'end_number': 1, 'arrows': ['9', '7']}, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_audit_reports_violations_in_one_query(self):
+        from .validation import audit_scores
+
+        def add(**values):
+            return Score.objects.create(author=self.admin, round_archer=self.round_archer, **values).pk
+
+        add(score=300, number_of_arrows=36)
+        too_high = add(score=330, number_of_arrows=36)
+        bad_tens = add(score=300, number_of_arrows=36, tens=1)
+        too_many = add(score=300, number_of_arrows=40)
+        late = add(score=300, number_of_arrows=36)
+        self.round.end_date = timezone.localdate() - datetime.timedelta(days=1)
+        self.round.save()
+        Score.objects.filter(pk=late).update(created_at=timezone.now())
+        Score.objects.exclude(pk=late).update(created_at=timezone.now() - datetime.timedelta(days=2))
+
+        with self.assertNumQueries(1):
+            violations = {violation['id']: violation['rules'] for violation in audit_scores()}
+        self.assertEqual(violations, {
+            too_high: ['score_above_maximum'],
+            bad_tens: ['implausible_tens'],
+            too_many: ['too_many_arrows'],
+            late: ['round_ended'],
+        })
+
+        stderr = StringIO()
+        call_command('audit_scores', '--round', str(self.round.pk), stdout=StringIO(), stderr=stderr)
+        self.assertIn('4 implausible scores', stderr.getvalue())
+
+
+@override_settings(CACHES=LOCAL_CACHES, MIDDLEWARE=NO_SILK_MIDDLEWARE)
+class HandicapTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_silk_request()
+        self.user = CustomUser.objects.create_user(username='user1', password='test')
+        self.archer = Archer.objects.create(author=self.user, last_name='Ann', first_name='Test', union_number=1)
+        face = TargetFaceNameChoice.objects.create(
+            author=self.user, name='40 cm indoor', environment='Indoor', discipline='Target Archery',
+            targetsize='40 cm', keyfeature='10-Zone',
+        )
+        sheet = ScoringSheet.objects.create(author=self.user, name='20x3', rows=20, columns=3)
+        self.round = Round.objects.create(author=self.user, name='portsmouth', scoringsheet=sheet, targetface=face)
+        self.round_archer = RoundMembership.objects.create(author=self.user, round=self.round, archer=self.archer)
+        return super().setUp()
+
+    def test_tables_fall_with_the_handicap(self):
+        from . import handicaps
+        from .validation import MAX_ARROW_POINTS
+
+        for face, rings in handicaps.FACE_RINGS.items():
+            self.assertEqual(sum(points for _radius, points in rings), MAX_ARROW_POINTS[face])
+        table = handicaps.get_table(handicaps.get_definition('Target Archery', '10-Zone', '40 cm', 'Indoor'))
+        self.assertEqual(table.averages, sorted(table.averages, reverse=True))
+        self.assertLess(table.averages[0], 10)
+        self.assertEqual((table.handicap(600, 60), table.handicap(0, 60), table.handicap(10, 0)), (0, 150, None))
+        for score in range(0, 601, 25):
+            expected = next(
+                (handicap for handicap, average in enumerate(table.averages) if average <= score / 60), 150,
+            )
+            self.assertEqual(table.handicap(score, 60), expected)
+        self.assertEqual(table.handicaps([300, 550, None], [60, 60, 60]), [table.handicap(300, 60), table.handicap(550, 60), None])
+
+    def test_tables_match_without_numpy(self):
+        from unittest import mock
+        from . import handicaps
+
+        if handicaps.np is None:
+            self.skipTest('numpy is not installed')
+        definition = handicaps.get_definition('Target Archery', '5-Zone', '122 cm', 'Outdoor', 91)
+        vectorized = handicaps.HandicapTable(definition)
+        with mock.patch.object(handicaps, 'np', None):
+            plain = handicaps.HandicapTable(definition)
+        for left, right in zip(vectorized.averages, plain.averages):
+            self.assertAlmostEqual(left, right)
+
+    def test_handicaps_api(self):
+        score = Score.objects.create(author=self.user, round_archer=self.round_archer, score=550, number_of_arrows=60)
+        Score.objects.create(author=self.user, round_archer=self.round_archer, score=None, number_of_arrows=0)
+
+        table = self.client.get(f'/scoring/rounds/{self.round.pk}/handicaps/').json()
+        self.assertEqual((table['number_of_arrows'], table['max_score'], len(table['handicaps'])), (60, 600, 151))
+        expected = self.client.get(f'/scoring/scores/{score.pk}/handicap/').json()['handicap']
+        self.assertGreaterEqual(550, next(row['score'] for row in table['handicaps'] if row['handicap'] == expected) - 0.05)
+
+        archer = self.client.get(f'/scoring/archers/{self.archer.pk}/handicaps/').json()
+        self.assertEqual(archer['best'], expected)
+        self.assertEqual([row['handicap'] for row in archer['scores']], [expected, None])
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/scoring/handicaps/', {'round': str(self.round.pk)})
+        self.assertEqual(sorted(row['handicap'] is None for row in response.json()['results']), [False, True])
+        self.assertEqual(self.client.get('/scoring/handicaps/', {'archer': 'x'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rounds_without_a_sheet_need_arrows(self):
+        round = Round.objects.create(author=self.user, name='practice', targetface=self.round.targetface)
+        url = f'/scoring/rounds/{round.pk}/handicaps/'
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_400_BAD_REQUEST)
+        table = self.client.get(url, {'arrows': 30}).json()
+        self.assertEqual((table['number_of_arrows'], table['max_score']), (30, 300))
+
+    def test_rounds_without_a_face_have_no_handicaps(self):
+        round = Round.objects.create(author=self.user, name='practice')
+        self.assertEqual(self.client.get(f'/scoring/rounds/{round.pk}/handicaps/').status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(CACHES=LOCAL_CACHES, MIDDLEWARE=NO_SILK_MIDDLEWARE)
+class ClassificationTestCase(TestCase):
+    def setUp(self):
+        from . import classifications, handicaps
+
+        cache.clear()
+        self.admin = CustomUser.objects.create_superuser(username='admin', password='test')
+        self.archer = Archer.objects.create(author=self.admin, last_name='Ann', first_name='Test', union_number=1)
+        face = TargetFaceNameChoice.objects.create(
+            author=self.admin, name='40 cm indoor', environment='Indoor', discipline='Target Archery',
+            targetsize='40 cm', keyfeature='10-Zone',
+        )
+        self.round = Round.objects.create(
+            author=self.admin, name='portsmouth', targetface=face, start_date=timezone.localdate(),
+        )
+        self.round_archer = RoundMembership.objects.create(author=self.admin, round=self.round, archer=self.archer)
+        self.category = Category.objects.create(author=self.admin, name='Recurve')
+        self.season = classifications.get_season()
+        table = handicaps.get_table(handicaps.get_definition('Target Archery', '10-Zone', '40 cm', 'Indoor'))
+        self.archer_level = Classification.objects.create(
+            author=self.admin, name='Archer', category=self.category, max_handicap=150, qualifying_scores=1,
+        )
+        self.bowman = Classification.objects.create(
+            author=self.admin, name='Bowman', category=self.category, max_handicap=table.handicap(550, 60),
+            qualifying_scores=2,
+        )
+        self.membership = CategoryMembership.objects.create(author=self.admin, category=self.category, archer=self.archer)
+        self.client.force_login(self.admin)
+        return super().setUp()
+
+    def add_score(self, score):
+        return Score.objects.create(author=self.admin, round_archer=self.round_archer, score=score, number_of_arrows=60)
+
+    def classification(self):
+        self.membership.refresh_from_db()
+        return self.membership.classification, self.membership.classification_season
+
+    def test_seasons(self):
+        from .classifications import get_season, season_range
+
+        with self.settings(SCORING_SEASON_START_MONTH=10):
+            self.assertEqual(get_season(datetime.date(2026, 9, 30)), 2025)
+            self.assertEqual(get_season(datetime.date(2026, 10, 1)), 2026)
+            self.assertEqual(season_range(2026), (datetime.date(2026, 10, 1), datetime.date(2027, 10, 1)))
+
+    def test_scores_update_the_classification(self):
+        self.assertEqual(self.classification(), (None, None))
+        first = self.add_score(550)
+        self.assertEqual(self.classification(), (self.archer_level, self.season))
+        self.add_score(560)
+        self.assertEqual(self.classification(), (self.bowman, self.season))
+        first.delete()
+        self.assertEqual(self.classification(), (self.archer_level, self.season))
+
+        response = self.client.get(f'/scoring/categorymemberships/{self.membership.pk}/')
+        self.assertEqual(response.json()['classification'], str(self.archer_level.pk))
+
+    def test_levels_of_other_age_groups_do_not_count(self):
+        senior = AgeGroup.objects.create(author=self.admin, name='Senior')
+        junior = AgeGroup.objects.create(author=self.admin, name='Junior')
+        self.membership.agegroup = senior
+        self.membership.save()
+        self.bowman.agegroup = junior
+        self.bowman.save()
+        self.add_score(560)
+        self.add_score(560)
+        self.assertEqual(self.classification(), (self.archer_level, self.season))
+
+    def test_earlier_seasons_stand_and_later_seasons_are_kept(self):
+        from .classifications import evaluate
+
+        CategoryMembership.all_objects.filter(pk=self.membership.pk).update(
+            classification=self.bowman, classification_season=self.season - 1,
+        )
+        self.assertEqual(evaluate([self.archer.pk], self.season), 0)
+        self.assertEqual(self.classification(), (self.bowman, self.season - 1))
+
+        CategoryMembership.all_objects.filter(pk=self.membership.pk).update(classification_season=self.season + 1)
+        self.add_score(550)
+        self.assertEqual(self.classification(), (self.bowman, self.season + 1))
+
+    def test_bulk_scores_and_season_rebuild(self):
+        rows = [{'round_archer': str(self.round_archer.pk), 'score': 560, 'number_of_arrows': 60}] * 2
+        body = '\n'.join(json.dumps(row) for row in rows)
+        response = self.client.post('/scoring/scores/bulk/', body, content_type='application/x-ndjson')
+        self.assertEqual(response.json()['created'], 2)
+        self.assertEqual(self.classification(), (self.bowman, self.season))
+
+        CategoryMembership.all_objects.update(classification=None, classification_season=None)
+        out = StringIO()
+        call_command('rebuild_classifications', season=self.season, chunk_size=1, stdout=out)
+        self.assertIn('1 category memberships updated', out.getvalue())
+        self.assertEqual(self.classification(), (self.bowman, self.season))
+        with self.assertRaises(CommandError):
+            call_command('rebuild_classifications', workers=0, stdout=out)
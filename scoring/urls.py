@@ -6,6 +6,7 @@ urlpatterns = [
     path('archers/', views.ArcherListCreateAPIView.as_view()),
     path('archers/info/', views.ArcherInfoAPIView.as_view()),
     path('archers/<uuid:pk>/', views.ArcherDetailAPIView.as_view()),
+    path('archers/<uuid:pk>/handicaps/', views.ArcherHandicapAPIView.as_view()),
     path('user-archers/', views.UserArcherListAPIView.as_view(), name='user-archers'),
 
     # path('archers/', views.archer_list),
@@ -123,6 +124,9 @@ urlpatterns = [
     path('rounds/', views.RoundListCreateAPIView.as_view()),
     path('rounds/info/', views.RoundInfoAPIView.as_view()),
     path('rounds/<uuid:pk>/', views.RoundDetailAPIView.as_view()),
+    path('rounds/<uuid:pk>/leaderboard/', views.RoundLeaderboardAPIView.as_view()),
+    path('rounds/<uuid:pk>/handicaps/', views.RoundHandicapTableAPIView.as_view()),
+    path('rounds/<uuid:pk>/live/', views.round_live),
     path('user-rounds/', views.UserRoundListAPIView.as_view(), name='user-rounds'),
 
     # path('rounds/', views.round_list),
@@ -140,7 +144,11 @@ urlpatterns = [
 
     path('scores/', views.ScoreListCreateAPIView.as_view()),
     path('scores/info/', views.ScoreInfoAPIView.as_view()),
+    path('scores/bulk/', views.ScoreBulkCreateAPIView.as_view()),
     path('scores/<uuid:pk>/', views.ScoreDetailAPIView.as_view()),
+    path('scores/<uuid:pk>/handicap/', views.ScoreHandicapAPIView.as_view()),
+    path('scores/<uuid:score_pk>/ends/', views.ScoreEndListCreateAPIView.as_view()),
+    path('scores/<uuid:score_pk>/ends/<int:end_number>/', views.ScoreEndDetailAPIView.as_view()),
     path('user-scores/', views.UserScoreListAPIView.as_view(), name='user-scores'),
 
     # path('scores/', views.score_list),
@@ -150,6 +158,8 @@ urlpatterns = [
     path('competitions/', views.CompetitionListCreateAPIView.as_view()),
     path('competitions/info/', views.CompetitionInfoAPIView.as_view()),
     path('competitions/<uuid:pk>/', views.CompetitionDetailAPIView.as_view()),
+    path('competitions/<uuid:pk>/leaderboard/', views.CompetitionLeaderboardAPIView.as_view()),
+    path('competitions/<uuid:pk>/live/', views.competition_live),
     path('user-competitions/', views.UserCompetitionListAPIView.as_view(), name='user-competitions'),
 
     # path('competitions/', views.competition_list),
@@ -164,5 +174,12 @@ urlpatterns = [
     # path('competitionmemberships/', views.competition_memberships_list),
     # path('competitionmemberships/info/', views.competition_memberships_info),
     # path('competitionmemberships/<uuid:pk>/', views.competition_memberships_detail),
-]
 
+    path('export/<str:name>.<str:file_format>', views.ExportAPIView.as_view()),
+    path('import/<str:name>/', views.ImportAPIView.as_view()),
+    path('sync/', views.SyncAPIView.as_view()),
+    path('handicaps/', views.HandicapListAPIView.as_view()),
+
+    path('reference-cache/', views.ReferenceCacheStatsAPIView.as_view()),
+    path('cache/', views.CacheStatsAPIView.as_view()),
+]
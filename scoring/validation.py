@@ -0,0 +1,177 @@
+"""
+Plausibility checks for scores.
+
+The most an arrow can score follows from the target face of the round
+(``TargetFaceNameChoice.discipline`` and ``keyfeature``), the most arrows a
+score can have from its scoring sheet. The same rules run on every score
+written through the API (:func:`check_score`, one query for the limits of a
+batch with :func:`get_limits`) and over the whole ``scores`` table as one
+SQL query (:func:`audit_scores`) that returns the offending rows as plain
+values.
+"""
+from functools import reduce
+from operator import or_
+
+from django.db.models import BooleanField, Case, ExpressionWrapper, F, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from .arrows import ARROW_TEN, POINTS
+from .models import RoundMembership, Score
+
+# (discipline, key feature) of a target face -> points of its best arrow.
+# 5 zone target faces are scored 9-7-5-3-1, reduced 6 zone faces 10 to 5 and
+# field faces by ring, 6 (the spot) down to 1.
+MAX_ARROW_POINTS = {
+    ('Target Archery', '5-Zone'): 9,
+    ('Target Archery', '6-Zone'): 10,
+    ('Target Archery', '10-Zone'): 10,
+    ('Field Archery', '5-Zone'): 5,
+    ('Field Archery', '6-Zone'): 6,
+    ('Field Archery', '10-Zone'): 10,
+}
+# A round without a target face is checked against a 10 zone face
+DEFAULT_MAX_ARROW_POINTS = ARROW_TEN
+
+RULES = {
+    'score_above_maximum': "The score is higher than {number_of_arrows} arrows can make on this target face ({max_score}).",
+    'too_many_arrows': "The scoring sheet of this round has room for {max_arrows} arrows.",
+    'implausible_tens': "The 10s and Xs do not fit the arrows, the score or the target face.",
+    'round_ended': "The round ended on {end_date}.",
+}
+
+LIMIT_LOOKUPS = (
+    'pk',
+    'round__targetface__discipline',
+    'round__targetface__keyfeature',
+    'round__scoringsheet__rows',
+    'round__scoringsheet__columns',
+    'round__end_date',
+)
+
+
+def get_max_arrow_points(discipline, keyfeature):
+    return MAX_ARROW_POINTS.get((discipline, keyfeature), DEFAULT_MAX_ARROW_POINTS)
+
+
+def get_limits(round_archer_ids):
+    """
+    The limits of the rounds of ``round_archer_ids`` by round membership id:
+    ``max_arrow_points``, ``max_arrows`` (``None``: no scoring sheet) and
+    ``end_date``. Unknown ids are left out.
+    """
+    limits = {}
+    round_archer_ids = list(set(round_archer_ids))
+    for start in range(0, len(round_archer_ids), 500):
+        rows = RoundMembership.all_objects.filter(
+            pk__in=round_archer_ids[start:start + 500],
+        ).values_list(*LIMIT_LOOKUPS)
+        for pk, discipline, keyfeature, rows_per_sheet, columns, end_date in rows:
+            limits[pk] = {
+                'max_arrow_points': get_max_arrow_points(discipline, keyfeature),
+                'max_arrows': rows_per_sheet * columns if rows_per_sheet is not None else None,
+                'end_date': end_date,
+            }
+    return limits
+
+
+def check_score(limits, score=None, number_of_arrows=0, tens=0, xs=0, adding=True, today=None):
+    """
+    Check the figures of one score against the ``limits`` of its round (see
+    :func:`get_limits`). Returns ``{field: [message, ...]}``, empty when the
+    score is plausible. A round that ended only rejects new scores.
+    """
+    errors = {}
+    number_of_arrows = number_of_arrows or 0
+    max_score = number_of_arrows * limits['max_arrow_points']
+    if score is not None and score > max_score:
+        errors.setdefault('score', []).append(
+            RULES['score_above_maximum'].format(number_of_arrows=number_of_arrows, max_score=max_score),
+        )
+    if limits['max_arrows'] is not None and number_of_arrows > limits['max_arrows']:
+        errors.setdefault('number_of_arrows', []).append(
+            RULES['too_many_arrows'].format(max_arrows=limits['max_arrows']),
+        )
+    tens, xs = tens or 0, xs or 0
+    if tens > number_of_arrows or xs > tens or (tens and limits['max_arrow_points'] < ARROW_TEN) or (
+        score is not None and score < tens * ARROW_TEN
+    ):
+        errors.setdefault('tens', []).append(RULES['implausible_tens'])
+    end_date = limits['end_date']
+    if adding and end_date is not None and end_date < (today or timezone.localdate()):
+        errors.setdefault('round_archer', []).append(RULES['round_ended'].format(end_date=end_date))
+    return errors
+
+
+def get_round_max_arrow_points(round):
+    targetface = round.targetface
+    if targetface is None:
+        return DEFAULT_MAX_ARROW_POINTS
+    return get_max_arrow_points(targetface.discipline, targetface.keyfeature)
+
+
+def check_arrows(max_arrow_points, arrows):
+    """
+    Messages for the packed arrows of an end that score more than
+    ``max_arrow_points``.
+    """
+    if max(bytes(arrows).translate(POINTS), default=0) > max_arrow_points:
+        return [f"An arrow on this target face scores at most {max_arrow_points}."]
+    return []
+
+
+def max_arrow_points_expression(prefix='round_archer__round__targetface__'):
+    return Case(
+        *[
+            When(**{f'{prefix}discipline': discipline, f'{prefix}keyfeature': keyfeature}, then=Value(points))
+            for (discipline, keyfeature), points in MAX_ARROW_POINTS.items()
+        ],
+        default=Value(DEFAULT_MAX_ARROW_POINTS),
+        output_field=IntegerField(),
+    )
+
+
+def rule_conditions():
+    """
+    The rules of :func:`check_score` as ``Q`` objects on a ``Score`` queryset
+    annotated with ``max_arrow_points``. A score made after its round ended
+    breaks ``round_ended``.
+    """
+    round_prefix = 'round_archer__round__'
+    return {
+        'score_above_maximum': Q(score__gt=F('number_of_arrows') * F('max_arrow_points')),
+        'too_many_arrows': Q(
+            number_of_arrows__gt=F(f'{round_prefix}scoringsheet__rows') * F(f'{round_prefix}scoringsheet__columns'),
+        ),
+        'implausible_tens': (
+            Q(tens__gt=F('number_of_arrows'))
+            | Q(xs__gt=F('tens'))
+            | Q(tens__gt=0, max_arrow_points__lt=ARROW_TEN)
+            | Q(score__lt=F('tens') * ARROW_TEN)
+        ),
+        'round_ended': Q(created_at__date__gt=F(f'{round_prefix}end_date')),
+    }
+
+
+def audit_scores(queryset=None, chunk_size=2000):
+    """
+    Yield every score of ``queryset`` (default: all active scores) that
+    breaks a rule, as a dict of its figures with the broken ``rules``. The
+    rules are evaluated by the database in a single pass; no model instances
+    are built.
+    """
+    if queryset is None:
+        queryset = Score.objects.all()
+    conditions = rule_conditions()
+    queryset = queryset.annotate(max_arrow_points=max_arrow_points_expression())
+    queryset = queryset.annotate(**{
+        f'breaks_{name}': ExpressionWrapper(condition, output_field=BooleanField())
+        for name, condition in conditions.items()
+    })
+    fields = ('id', 'round_archer_id', 'score', 'number_of_arrows', 'tens', 'xs', 'max_arrow_points')
+    rows = queryset.filter(reduce(or_, conditions.values())).order_by('pk').values_list(
+        *fields, *[f'breaks_{name}' for name in conditions],
+    ).iterator(chunk_size=chunk_size)
+    for row in rows:
+        result = dict(zip(fields, row))
+        result['rules'] = [name for name, broken in zip(conditions, row[len(fields):]) if broken]
+        yield result
@@ -1,5 +1,9 @@
+from django.conf import settings
 from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
+from django.db import IntegrityError
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+import uuid
 
 from .serializers import (
     ArcherSerializer,
@@ -34,10 +38,12 @@ from .serializers import (
     RoundMembershipInfoSerializer,
     ScoreSerializer,
     ScoreInfoSerializer,
+    ScoreEndSerializer,
     CompetitionSerializer,
     CompetitionInfoSerializer,
     CompetitionMembershipSerializer,
     CompetitionMembershipInfoSerializer,
+    LeaderboardEntrySerializer,
 )
 from .models import (
     Archer,
@@ -56,24 +62,92 @@ from .models import (
     Round,
     RoundMembership,
     Score,
+    ScoreEnd,
     Competition,
     CompetitionMembership,
+    LeaderboardEntry,
 )
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
-from rest_framework import generics
+from rest_framework import generics, status
 from rest_framework.permissions import (
     IsAuthenticated,
     IsAdminUser,
     AllowAny,
 )
+from rest_framework.exceptions import NotAcceptable, NotFound, ValidationError
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
 
+from . import export, handicaps, imports, sync
+from .cache import get_stats as get_cache_stats
+from .ingest import ingest_scores, parse_uuid
+from .leaderboard import competition_scope, round_scope
+from .live import competition_channel, event_stream, round_channel
+from .mixins import (
+    ActiveRowsMixin,
+    ConditionalGetMixin,
+    IdempotentCreateMixin,
+    OptimisticConcurrencyMixin,
+    PrefetchPlanMixin,
+    ReferenceCacheMixin,
+    SparseFieldsetMixin,
+    includes_inactive,
+)
+from .prefetch import apply_prefetch_plan
+from .pagination import KeysetCursorPagination
+from .parsers import JSONLinesParser, MessagePackParser
+from .reference import get_stats as get_reference_cache_stats
+from .summaries import get_summary
+
+class ScoringInfoAPIView(APIView):
+    """
+    Summary of a scoring resource.
+
+    The count comes from one cached aggregate query. Rows are only included
+    with ``?include=rows`` and then one keyset page at a time. Inactive rows
+    are left out unless ``?include_inactive=1`` is given.
+    """
+    queryset = None
+    serializer_class = None
+    rows_field = None
+    pagination_class = KeysetCursorPagination
+
+    def includes_rows(self, request):
+        include = ','.join(request.query_params.getlist('include'))
+        return 'rows' in [part.strip() for part in include.split(',')]
+
+    def get_rows_queryset(self):
+        row_serializer = self.serializer_class().fields[self.rows_field].child
+        queryset = self.queryset.all()
+        include_inactive = includes_inactive(self.request)
+        if include_inactive:
+            queryset = self.queryset.model.all_objects.all()
+        return apply_prefetch_plan(queryset, row_serializer, include_inactive=include_inactive)
+
+    def get(self, request):
+        data = dict(get_summary(self.queryset.model, includes_inactive(request)))
+        paginator = None
+        if self.includes_rows(request):
+            paginator = self.pagination_class()
+            data[self.rows_field] = paginator.paginate_queryset(
+                self.get_rows_queryset(), request, view=self,
+            )
+        serializer = self.serializer_class(data, context={'request': request})
+        response_data = serializer.data
+        if paginator is not None:
+            response_data['next'] = paginator.get_next_link()
+            response_data['previous'] = paginator.get_previous_link()
+
+        return Response(response_data)
+
 # Archer
 
-class ArcherListCreateAPIView(generics.ListCreateAPIView):
+class ArcherListCreateAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListCreateAPIView):
     queryset = Archer.objects.all()
     serializer_class = ArcherSerializer
+    pagination_class = KeysetCursorPagination
 
     def get_permissions(self):
         self.permission_classes = [AllowAny]
@@ -81,7 +155,7 @@ class ArcherListCreateAPIView(generics.ListCreateAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class ArcherDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class ArcherDetailAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Archer.objects.all()
     serializer_class = ArcherSerializer
 
@@ -91,30 +165,27 @@ class ArcherDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class UserArcherListAPIView(generics.ListAPIView):
+class UserArcherListAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListAPIView):
     queryset = Archer.objects.all()
     serializer_class = ArcherSerializer
+    etag_per_user = True
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         qs = super().get_queryset()
         return qs.filter(author=self.request.user)
 
-class ArcherInfoAPIView(APIView):
-    def get(self, request):
-        archers = Archer.objects.all()
-        serializer = ArcherInfoSerializer({
-            'archers': archers,
-            'count': len(archers),
-        })
-        
-        return Response(serializer.data)
+class ArcherInfoAPIView(ScoringInfoAPIView):
+    queryset = Archer.objects.all()
+    serializer_class = ArcherInfoSerializer
+    rows_field = 'archers'
 
 # Discipline
 
-class DisciplineListCreateAPIView(generics.ListCreateAPIView):
+class DisciplineListCreateAPIView(ConditionalGetMixin, ReferenceCacheMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListCreateAPIView):
     queryset = Discipline.objects.all()
     serializer_class = DisciplineSerializer
+    pagination_class = KeysetCursorPagination
 
     def get_permissions(self):
         self.permission_classes = [AllowAny]
@@ -122,7 +193,7 @@ class DisciplineListCreateAPIView(generics.ListCreateAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class DisciplineDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class DisciplineDetailAPIView(ConditionalGetMixin, ReferenceCacheMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Discipline.objects.all()
     serializer_class = DisciplineSerializer
 
@@ -132,32 +203,27 @@ class DisciplineDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class UserDisciplineListAPIView(generics.ListAPIView):
+class UserDisciplineListAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListAPIView):
     queryset = Discipline.objects.all()
     serializer_class = DisciplineSerializer
+    etag_per_user = True
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         qs = super().get_queryset()
         return qs.filter(author=self.request.user)
 
-class DisciplineInfoAPIView(APIView):
-    def get(self, request):
-        disciplines = Discipline.objects.prefetch_related(
-            'archers',
-        )
-        serializer = DisciplineInfoSerializer({
-            'disciplines': disciplines,
-            'count': len(disciplines),
-        })
-        
-        return Response(serializer.data)
+class DisciplineInfoAPIView(ScoringInfoAPIView):
+    queryset = Discipline.objects.all()
+    serializer_class = DisciplineInfoSerializer
+    rows_field = 'disciplines'
 
 # DisciplineMembership
 
-class DisciplineMembershipListCreateAPIView(generics.ListCreateAPIView):
+class DisciplineMembershipListCreateAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListCreateAPIView):
     queryset = DisciplineMembership.objects.all()
     serializer_class = DisciplineMembershipSerializer
+    pagination_class = KeysetCursorPagination
 
     def get_permissions(self):
         self.permission_classes = [AllowAny]
@@ -165,7 +231,7 @@ class DisciplineMembershipListCreateAPIView(generics.ListCreateAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class DisciplineMembershipDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class DisciplineMembershipDetailAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = DisciplineMembership.objects.all()
     serializer_class = DisciplineMembershipSerializer
 
@@ -175,33 +241,27 @@ class DisciplineMembershipDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class UserDisciplineMembershipListAPIView(generics.ListAPIView):
+class UserDisciplineMembershipListAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListAPIView):
     queryset = DisciplineMembership.objects.all()
     serializer_class = DisciplineMembershipSerializer
+    etag_per_user = True
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         qs = super().get_queryset()
         return qs.filter(author=self.request.user)
 
-class DisciplineMembershipInfoAPIView(APIView):
-    def get(self, request):
-        disciplinememberships = DisciplineMembership.objects.prefetch_related(
-            'discipline',
-            'archer',
-        )
-        serializer = DisciplineMembershipInfoSerializer({
-            'disciplinememberships': disciplinememberships,
-            'count': len(disciplinememberships),
-        })
-        
-        return Response(serializer.data)
+class DisciplineMembershipInfoAPIView(ScoringInfoAPIView):
+    queryset = DisciplineMembership.objects.all()
+    serializer_class = DisciplineMembershipInfoSerializer
+    rows_field = 'disciplinememberships'
 
 # Club
 
-class ClubListCreateAPIView(generics.ListCreateAPIView):
+class ClubListCreateAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListCreateAPIView):
     queryset = Club.objects.all()
     serializer_class = ClubSerializer
+    pagination_class = KeysetCursorPagination
 
     def get_permissions(self):
         self.permission_classes = [AllowAny]
@@ -209,7 +269,7 @@ class ClubListCreateAPIView(generics.ListCreateAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class ClubDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class ClubDetailAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Club.objects.all()
     serializer_class = ClubSerializer
 
@@ -219,32 +279,27 @@ class ClubDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class UserClubListAPIView(generics.ListAPIView):
+class UserClubListAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListAPIView):
     queryset = Club.objects.all()
     serializer_class = ClubSerializer
+    etag_per_user = True
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         qs = super().get_queryset()
         return qs.filter(author=self.request.user)
 
-class ClubInfoAPIView(APIView):
-    def get(self, request):
-        clubs = Club.objects.prefetch_related(
-            'archers',
-        )
-        serializer = ClubInfoSerializer({
-            'clubs': clubs,
-            'count': len(clubs),
-        })
-        
-        return Response(serializer.data)
+class ClubInfoAPIView(ScoringInfoAPIView):
+    queryset = Club.objects.all()
+    serializer_class = ClubInfoSerializer
+    rows_field = 'clubs'
 
 # ClubMembership
 
-class ClubMembershipListCreateAPIView(generics.ListCreateAPIView):
+class ClubMembershipListCreateAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListCreateAPIView):
     queryset = ClubMembership.objects.all()
     serializer_class = ClubMembershipSerializer
+    pagination_class = KeysetCursorPagination
 
     def get_permissions(self):
         self.permission_classes = [AllowAny]
@@ -252,7 +307,7 @@ class ClubMembershipListCreateAPIView(generics.ListCreateAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class ClubMembershipDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class ClubMembershipDetailAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = ClubMembership.objects.all()
     serializer_class = ClubMembershipSerializer
 
@@ -262,9 +317,10 @@ class ClubMembershipDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class UserClubMembershipListAPIView(generics.ListAPIView):
+class UserClubMembershipListAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListAPIView):
     queryset = ClubMembership.objects.all()
     serializer_class = ClubMembershipSerializer
+    etag_per_user = True
 
     permission_classes = [IsAuthenticated]
 
@@ -272,24 +328,17 @@ class UserClubMembershipListAPIView(generics.ListAPIView):
         qs = super().get_queryset()
         return qs.filter(author=self.request.user)
 
-class ClubMembershipInfoAPIView(APIView):
-    def get(self, request):
-        clubmemberships = ClubMembership.objects.prefetch_related(
-            'club',
-            'archer',
-        )
-        serializer = ClubMembershipInfoSerializer({
-            'clubmemberships': clubmemberships,
-            'count': len(clubmemberships)
-        })
-        
-        return Response(serializer.data)
+class ClubMembershipInfoAPIView(ScoringInfoAPIView):
+    queryset = ClubMembership.objects.all()
+    serializer_class = ClubMembershipInfoSerializer
+    rows_field = 'clubmemberships'
 
 # Category
 
-class CategoryListCreateAPIView(generics.ListCreateAPIView):
+class CategoryListCreateAPIView(ConditionalGetMixin, ReferenceCacheMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListCreateAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    pagination_class = KeysetCursorPagination
 
     def get_permissions(self):
         self.permission_classes = [AllowAny]
@@ -297,7 +346,7 @@ class CategoryListCreateAPIView(generics.ListCreateAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class CategoryDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class CategoryDetailAPIView(ConditionalGetMixin, ReferenceCacheMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
@@ -307,32 +356,27 @@ class CategoryDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class UserCategoryListAPIView(generics.ListAPIView):
+class UserCategoryListAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    etag_per_user = True
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         qs = super().get_queryset()
         return qs.filter(author=self.request.user)
 
-class CategoryInfoAPIView(APIView):
-    def get(self, request):
-        categories = Category.objects.prefetch_related(
-            'archers',
-        )
-        serializer = CategoryInfoSerializer({
-            'categories': categories,
-            'count': len(categories),
-        })
-        
-        return Response(serializer.data)
+class CategoryInfoAPIView(ScoringInfoAPIView):
+    queryset = Category.objects.all()
+    serializer_class = CategoryInfoSerializer
+    rows_field = 'categories'
 
 # AgeGroup
 
-class AgeGroupListCreateAPIView(generics.ListCreateAPIView):
+class AgeGroupListCreateAPIView(ConditionalGetMixin, ReferenceCacheMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListCreateAPIView):
     queryset = AgeGroup.objects.all()
     serializer_class = AgeGroupSerializer
+    pagination_class = KeysetCursorPagination
 
     def get_permissions(self):
         self.permission_classes = [AllowAny]
@@ -340,7 +384,7 @@ class AgeGroupListCreateAPIView(generics.ListCreateAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class AgeGroupDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class AgeGroupDetailAPIView(ConditionalGetMixin, ReferenceCacheMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = AgeGroup.objects.all()
     serializer_class = AgeGroupSerializer
 
@@ -350,30 +394,27 @@ class AgeGroupDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class UserAgeGroupListAPIView(generics.ListAPIView):
+class UserAgeGroupListAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListAPIView):
     queryset = AgeGroup.objects.all()
     serializer_class = AgeGroupSerializer
+    etag_per_user = True
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         qs = super().get_queryset()
         return qs.filter(author=self.request.user)
 
-class AgeGroupInfoAPIView(APIView):
-    def get(self, request):
-        agegroups = AgeGroup.objects.all()
-        serializer = AgeGroupInfoSerializer({
-            'agegroups': agegroups,
-            'count': len(agegroups),
-        })
-        
-        return Response(serializer.data)
+class AgeGroupInfoAPIView(ScoringInfoAPIView):
+    queryset = AgeGroup.objects.all()
+    serializer_class = AgeGroupInfoSerializer
+    rows_field = 'agegroups'
 
 # CategoryMembership
 
-class CategoryMembershipListCreateAPIView(generics.ListCreateAPIView):
+class CategoryMembershipListCreateAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListCreateAPIView):
     queryset = CategoryMembership.objects.all()
     serializer_class = CategoryMembershipSerializer
+    pagination_class = KeysetCursorPagination
 
     def get_permissions(self):
         self.permission_classes = [AllowAny]
@@ -381,7 +422,7 @@ class CategoryMembershipListCreateAPIView(generics.ListCreateAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class CategoryMembershipDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class CategoryMembershipDetailAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = CategoryMembership.objects.all()
     serializer_class = CategoryMembershipSerializer
 
@@ -391,34 +432,27 @@ class CategoryMembershipDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class UserCategoryMembershipListAPIView(generics.ListAPIView):
+class UserCategoryMembershipListAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListAPIView):
     queryset = CategoryMembership.objects.all()
     serializer_class = CategoryMembershipSerializer
+    etag_per_user = True
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         qs = super().get_queryset()
         return qs.filter(author=self.request.user)
 
-class CategoryMembershipInfoAPIView(APIView):
-    def get(self, request):
-        categorymemberships = CategoryMembership.objects.prefetch_related(
-            'category',
-            'archer',
-            'agegroup',
-        )
-        serializer = CategoryMembershipInfoSerializer({
-            'categorymemberships': categorymemberships,
-            'count': len(categorymemberships),
-        })
-        
-        return Response(serializer.data)
+class CategoryMembershipInfoAPIView(ScoringInfoAPIView):
+    queryset = CategoryMembership.objects.all()
+    serializer_class = CategoryMembershipInfoSerializer
+    rows_field = 'categorymemberships'
 
 # Team
 
-class TeamListCreateAPIView(generics.ListCreateAPIView):
+class TeamListCreateAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListCreateAPIView):
     queryset = Team.objects.all()
     serializer_class = TeamSerializer
+    pagination_class = KeysetCursorPagination
 
     def get_permissions(self):
         self.permission_classes = [AllowAny]
@@ -426,7 +460,7 @@ class TeamListCreateAPIView(generics.ListCreateAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class TeamDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class TeamDetailAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Team.objects.all()
     serializer_class = TeamSerializer
 
@@ -436,32 +470,27 @@ class TeamDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class UserTeamListAPIView(generics.ListAPIView):
+class UserTeamListAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListAPIView):
     queryset = Team.objects.all()
     serializer_class = TeamSerializer
+    etag_per_user = True
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         qs = super().get_queryset()
         return qs.filter(author=self.request.user)
 
-class TeamInfoAPIView(APIView):
-    def get(self, request):
-        teams = Team.objects.prefetch_related(
-            'archers',
-        )
-        serializer = TeamInfoSerializer({
-            'teams': teams,
-            'count': len(teams),
-        })
-        
-        return Response(serializer.data)
+class TeamInfoAPIView(ScoringInfoAPIView):
+    queryset = Team.objects.all()
+    serializer_class = TeamInfoSerializer
+    rows_field = 'teams'
 
 # TeamMembership
 
-class TeamMembershipListCreateAPIView(generics.ListCreateAPIView):
+class TeamMembershipListCreateAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListCreateAPIView):
     queryset = TeamMembership.objects.all()
     serializer_class = TeamMembershipSerializer
+    pagination_class = KeysetCursorPagination
 
     def get_permissions(self):
         self.permission_classes = [AllowAny]
@@ -469,7 +498,7 @@ class TeamMembershipListCreateAPIView(generics.ListCreateAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class TeamMembershipDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class TeamMembershipDetailAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = TeamMembership.objects.all()
     serializer_class = TeamMembershipSerializer
 
@@ -479,33 +508,27 @@ class TeamMembershipDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class UserTeamMembershipListAPIView(generics.ListAPIView):
+class UserTeamMembershipListAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListAPIView):
     queryset = TeamMembership.objects.all()
     serializer_class = TeamMembershipSerializer
+    etag_per_user = True
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         qs = super().get_queryset()
         return qs.filter(author=self.request.user)
 
-class TeamMembershipInfoAPIView(APIView):
-    def get(self, request):
-        teammemberships = TeamMembership.objects.prefetch_related(
-            'team',
-            'archer',
-        )
-        serializer = TeamMembershipInfoSerializer({
-            'teammemberships': teammemberships,
-            'count': len(teammemberships),
-        })
-        
-        return Response(serializer.data)
+class TeamMembershipInfoAPIView(ScoringInfoAPIView):
+    queryset = TeamMembership.objects.all()
+    serializer_class = TeamMembershipInfoSerializer
+    rows_field = 'teammemberships'
 
 # ScoringSheet
 
-class ScoringSheetListCreateAPIView(generics.ListCreateAPIView):
+class ScoringSheetListCreateAPIView(ConditionalGetMixin, ReferenceCacheMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListCreateAPIView):
     queryset = ScoringSheet.objects.all()
     serializer_class = ScoringSheetSerializer
+    pagination_class = KeysetCursorPagination
 
     def get_permissions(self):
         self.permission_classes = [AllowAny]
@@ -513,7 +536,7 @@ class ScoringSheetListCreateAPIView(generics.ListCreateAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class ScoringSheetDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class ScoringSheetDetailAPIView(ConditionalGetMixin, ReferenceCacheMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = ScoringSheet.objects.all()
     serializer_class = ScoringSheetSerializer
 
@@ -523,30 +546,27 @@ class ScoringSheetDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class UserScoringSheetListAPIView(generics.ListAPIView):
+class UserScoringSheetListAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListAPIView):
     queryset = ScoringSheet.objects.all()
     serializer_class = ScoringSheetSerializer
+    etag_per_user = True
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         qs = super().get_queryset()
         return qs.filter(author=self.request.user)
 
-class ScoringSheetInfoAPIView(APIView):
-    def get(self, request):
-        scoringsheets = ScoringSheet.objects.all()
-        serializer = ScoringSheetInfoSerializer({
-            'scoringsheets': scoringsheets,
-            'count': len(scoringsheets),
-        })
-        
-        return Response(serializer.data)
+class ScoringSheetInfoAPIView(ScoringInfoAPIView):
+    queryset = ScoringSheet.objects.all()
+    serializer_class = ScoringSheetInfoSerializer
+    rows_field = 'scoringsheets'
 
 # TargetFaceNameChoice
 
-class TargetFaceNameChoiceListCreateAPIView(generics.ListCreateAPIView):
+class TargetFaceNameChoiceListCreateAPIView(ConditionalGetMixin, ReferenceCacheMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListCreateAPIView):
     queryset = TargetFaceNameChoice.objects.all()
     serializer_class = TargetFaceNameChoiceSerializer
+    pagination_class = KeysetCursorPagination
 
     def get_permissions(self):
         self.permission_classes = [AllowAny]
@@ -554,7 +574,7 @@ class TargetFaceNameChoiceListCreateAPIView(generics.ListCreateAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class TargetFaceNameChoiceDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class TargetFaceNameChoiceDetailAPIView(ConditionalGetMixin, ReferenceCacheMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = TargetFaceNameChoice.objects.all()
     serializer_class = TargetFaceNameChoiceSerializer
 
@@ -564,30 +584,27 @@ class TargetFaceNameChoiceDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class UserTargetFaceNameChoiceListAPIView(generics.ListAPIView):
+class UserTargetFaceNameChoiceListAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListAPIView):
     queryset = TargetFaceNameChoice.objects.all()
     serializer_class = TargetFaceNameChoiceSerializer
+    etag_per_user = True
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         qs = super().get_queryset()
         return qs.filter(author=self.request.user)
 
-class TargetFaceNameChoiceInfoAPIView(APIView):
-    def get(self, request):
-        targetfacenamechoices = TargetFaceNameChoice.objects.all()
-        serializer = TargetFaceNameChoiceInfoSerializer({
-            'targetfacenamechoices': targetfacenamechoices,
-            'count': len(targetfacenamechoices),
-        })
-        
-        return Response(serializer.data)
+class TargetFaceNameChoiceInfoAPIView(ScoringInfoAPIView):
+    queryset = TargetFaceNameChoice.objects.all()
+    serializer_class = TargetFaceNameChoiceInfoSerializer
+    rows_field = 'targetfacenamechoices'
 
 # TargetFace
 
-class TargetFaceListCreateAPIView(generics.ListCreateAPIView):
+class TargetFaceListCreateAPIView(ConditionalGetMixin, ReferenceCacheMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListCreateAPIView):
     queryset = TargetFace.objects.all()
     serializer_class = TargetFaceSerializer
+    pagination_class = KeysetCursorPagination
 
     def get_permissions(self):
         self.permission_classes = [AllowAny]
@@ -595,7 +612,7 @@ class TargetFaceListCreateAPIView(generics.ListCreateAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class TargetFaceDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class TargetFaceDetailAPIView(ConditionalGetMixin, ReferenceCacheMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = TargetFace.objects.all()
     serializer_class = TargetFaceSerializer
 
@@ -605,30 +622,27 @@ class TargetFaceDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class UserTargetFaceListAPIView(generics.ListAPIView):
+class UserTargetFaceListAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListAPIView):
     queryset = TargetFace.objects.all()
     serializer_class = TargetFaceSerializer
+    etag_per_user = True
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         qs = super().get_queryset()
         return qs.filter(author=self.request.user)
 
-class TargetFaceInfoAPIView(APIView):
-    def get(self, request):
-        targetfaces = TargetFace.objects.all()
-        serializer = TargetFaceInfoSerializer({
-            'targetfaces': targetfaces,
-            'count': len(targetfaces),
-        })
-        
-        return Response(serializer.data)
+class TargetFaceInfoAPIView(ScoringInfoAPIView):
+    queryset = TargetFace.objects.all()
+    serializer_class = TargetFaceInfoSerializer
+    rows_field = 'targetfaces'
 
 # Round
 
-class RoundListCreateAPIView(generics.ListCreateAPIView):
+class RoundListCreateAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListCreateAPIView):
     queryset = Round.objects.all()
     serializer_class = RoundSerializer
+    pagination_class = KeysetCursorPagination
 
     def get_permissions(self):
         self.permission_classes = [AllowAny]
@@ -642,36 +656,31 @@ class RoundListCreateAPIView(generics.ListCreateAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class RoundDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class RoundDetailAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Round.objects.all()
     serializer_class = RoundSerializer
 
-class UserRoundListAPIView(generics.ListAPIView):
+class UserRoundListAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListAPIView):
     queryset = Round.objects.all()
     serializer_class = RoundSerializer
+    etag_per_user = True
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         qs = super().get_queryset()
         return qs.filter(author=self.request.user)
 
-class RoundInfoAPIView(APIView):
-    def get(self, request):
-        rounds = Round.objects.prefetch_related(
-            'archers',
-        )
-        serializer = RoundInfoSerializer({
-            'rounds': rounds,
-            'count': len(rounds),
-        })
-        
-        return Response(serializer.data)
+class RoundInfoAPIView(ScoringInfoAPIView):
+    queryset = Round.objects.all()
+    serializer_class = RoundInfoSerializer
+    rows_field = 'rounds'
 
 # RoundMembership
 
-class RoundMembershipListCreateAPIView(generics.ListCreateAPIView):
+class RoundMembershipListCreateAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListCreateAPIView):
     queryset = RoundMembership.objects.all()
     serializer_class = RoundMembershipSerializer
+    pagination_class = KeysetCursorPagination
 
     def get_permissions(self):
         self.permission_classes = [AllowAny]
@@ -679,7 +688,7 @@ class RoundMembershipListCreateAPIView(generics.ListCreateAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class RoundMembershipDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class RoundMembershipDetailAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = RoundMembership.objects.all()
     serializer_class = RoundMembershipSerializer
 
@@ -689,33 +698,27 @@ class RoundMembershipDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class UserRoundMembershipListAPIView(generics.ListAPIView):
+class UserRoundMembershipListAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListAPIView):
     queryset = RoundMembership.objects.all()
     serializer_class = RoundMembershipSerializer
+    etag_per_user = True
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         qs = super().get_queryset()
         return qs.filter(author=self.request.user)
 
-class RoundMembershipInfoAPIView(APIView):
-    def get(self, request):
-        roundmemberships = RoundMembership.objects.prefetch_related(
-            'round',
-            'archer',
-        )
-        serializer = RoundMembershipInfoSerializer({
-            'roundmemberships': roundmemberships,
-            'count': len(roundmemberships),
-        })
-        
-        return Response(serializer.data)
+class RoundMembershipInfoAPIView(ScoringInfoAPIView):
+    queryset = RoundMembership.objects.all()
+    serializer_class = RoundMembershipInfoSerializer
+    rows_field = 'roundmemberships'
 
 # Score
 
-class ScoreListCreateAPIView(generics.ListCreateAPIView):
+class ScoreListCreateAPIView(IdempotentCreateMixin, ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListCreateAPIView):
     queryset = Score.objects.all()
     serializer_class = ScoreSerializer
+    pagination_class = KeysetCursorPagination
 
     def get_permissions(self):
         self.permission_classes = [AllowAny]
@@ -723,7 +726,7 @@ class ScoreListCreateAPIView(generics.ListCreateAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class ScoreDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class ScoreDetailAPIView(OptimisticConcurrencyMixin, ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Score.objects.all()
     serializer_class = ScoreSerializer
 
@@ -733,32 +736,112 @@ class ScoreDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class UserScoreListAPIView(generics.ListAPIView):
+class UserScoreListAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListAPIView):
     queryset = Score.objects.all()
     serializer_class = ScoreSerializer
+    etag_per_user = True
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         qs = super().get_queryset()
         return qs.filter(author=self.request.user)
 
-class ScoreInfoAPIView(APIView):
-    def get(self, request):
-        scores = Score.objects.prefetch_related(
-            'round_archer',
-        )
-        serializer = ScoreInfoSerializer({
-            'scores': scores,
-            'count': len(scores),
+class ScoreInfoAPIView(ScoringInfoAPIView):
+    queryset = Score.objects.all()
+    serializer_class = ScoreInfoSerializer
+    rows_field = 'scores'
+
+class ScoreBulkCreateAPIView(APIView):
+    """
+    Create or update many scores in one request and one transaction.
+
+    The body is a list of score objects as JSON lines
+    (``application/x-ndjson``), msgpack (``application/msgpack``) or a JSON
+    array. Rows with an ``id`` that already exists update that score.
+    Responds with one result per row in input order.
+    """
+    permission_classes = [IsAdminUser]
+    parser_classes = [JSONLinesParser, MessagePackParser, JSONParser]
+    max_rows = 10000
+
+    def post(self, request):
+        rows = request.data
+        if not isinstance(rows, list):
+            raise ValidationError({'non_field_errors': ["Expected a list of scores."]})
+        if len(rows) > self.max_rows:
+            raise ValidationError({'non_field_errors': [f"At most {self.max_rows} scores per request."]})
+
+        try:
+            results = ingest_scores(rows, request.user)
+        except IntegrityError:
+            # A concurrent retry committed some of the idempotency keys first,
+            # a second pass replays those rows.
+            results = ingest_scores(rows, request.user)
+        counts = {'created': 0, 'updated': 0, 'replayed': 0, 'error': 0}
+        for result in results:
+            counts[result['status']] += 1
+        return Response({
+            'created': counts['created'],
+            'updated': counts['updated'],
+            'replayed': counts['replayed'],
+            'errors': counts['error'],
+            'results': results,
         })
-        
-        return Response(serializer.data)
+
+# ScoreEnd
+
+class ScoreEndMixin:
+    """
+    Ends nested under ``scores/<score_pk>/ends/``.
+    """
+    def get_score(self):
+        if not hasattr(self, '_score'):
+            self._score = get_object_or_404(
+                Score.all_objects.select_related(
+                    'round_archer__round__scoringsheet', 'round_archer__round__targetface',
+                ),
+                pk=self.kwargs['score_pk'],
+            )
+        return self._score
+
+    def get_queryset(self):
+        return super().get_queryset().filter(score=self.get_score())
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['score'] = self.get_score()
+        return context
+
+class ScoreEndListCreateAPIView(ScoreEndMixin, ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListCreateAPIView):
+    queryset = ScoreEnd.objects.all()
+    serializer_class = ScoreEndSerializer
+
+    def get_permissions(self):
+        self.permission_classes = [AllowAny]
+        if self.request.method == 'POST':
+            self.permission_classes = [IsAdminUser]
+        return super().get_permissions()
+
+    def perform_create(self, serializer):
+        serializer.save(score=self.get_score())
+
+class ScoreEndDetailAPIView(ScoreEndMixin, ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = ScoreEnd.objects.all()
+    serializer_class = ScoreEndSerializer
+    lookup_field = 'end_number'
+
+    def get_permissions(self):
+        self.permission_classes = [AllowAny]
+        if self.request.method in ['PUT', 'PATCH', 'DELETE']:
+            self.permission_classes = [IsAdminUser]
+        return super().get_permissions()
 
 # Competition
 
-class CompetitionListCreateAPIView(generics.ListCreateAPIView):
+class CompetitionListCreateAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListCreateAPIView):
     queryset = Competition.objects.all()
     serializer_class = CompetitionSerializer
+    pagination_class = KeysetCursorPagination
 
     def get_permissions(self):
         self.permission_classes = [AllowAny]
@@ -766,7 +849,7 @@ class CompetitionListCreateAPIView(generics.ListCreateAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class CompetitionDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class CompetitionDetailAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Competition.objects.all()
     serializer_class = CompetitionSerializer
 
@@ -776,32 +859,27 @@ class CompetitionDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class UserCompetitionListAPIView(generics.ListAPIView):
+class UserCompetitionListAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListAPIView):
     queryset = Competition.objects.all()
     serializer_class = CompetitionSerializer
+    etag_per_user = True
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         qs = super().get_queryset()
         return qs.filter(author=self.request.user)
 
-class CompetitionInfoAPIView(APIView):
-    def get(self, request):
-        competitions = Competition.objects.prefetch_related(
-            'rounds',
-        )
-        serializer = CompetitionInfoSerializer({
-            'competitions': competitions,
-            'count': len(competitions),
-        })
-        
-        return Response(serializer.data)
+class CompetitionInfoAPIView(ScoringInfoAPIView):
+    queryset = Competition.objects.all()
+    serializer_class = CompetitionInfoSerializer
+    rows_field = 'competitions'
 
 # CompetitionMembership
 
-class CompetitionMembershipListCreateAPIView(generics.ListCreateAPIView):
+class CompetitionMembershipListCreateAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListCreateAPIView):
     queryset = CompetitionMembership.objects.all()
     serializer_class = CompetitionMembershipSerializer
+    pagination_class = KeysetCursorPagination
 
     def get_permissions(self):
         self.permission_classes = [AllowAny]
@@ -809,7 +887,7 @@ class CompetitionMembershipListCreateAPIView(generics.ListCreateAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class CompetitionMembershipDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class CompetitionMembershipDetailAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = CompetitionMembership.objects.all()
     serializer_class = CompetitionMembershipSerializer
 
@@ -819,25 +897,324 @@ class CompetitionMembershipDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
             self.permission_classes = [IsAdminUser]
         return super().get_permissions()
 
-class UserCompetitionMembershipListAPIView(generics.ListAPIView):
+class UserCompetitionMembershipListAPIView(ConditionalGetMixin, SparseFieldsetMixin, PrefetchPlanMixin, ActiveRowsMixin, generics.ListAPIView):
     queryset = CompetitionMembership.objects.all()
     serializer_class = CompetitionMembershipSerializer
+    etag_per_user = True
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         qs = super().get_queryset()
         return qs.filter(author=self.request.user)
 
-class CompetitionMembershipInfoAPIView(APIView):
-    def get(self, request):
-        competitionmemberships = CompetitionMembership.objects.prefetch_related(
-            'competition',
-            'round',
+class CompetitionMembershipInfoAPIView(ScoringInfoAPIView):
+    queryset = CompetitionMembership.objects.all()
+    serializer_class = CompetitionMembershipInfoSerializer
+    rows_field = 'competitionmemberships'
+
+# Leaderboard
+
+class LeaderboardListAPIView(SparseFieldsetMixin, PrefetchPlanMixin, generics.ListAPIView):
+    """
+    Ranked standings of the round or competition ``pk`` (``scope_field``)
+    read from the denormalized leaderboard table, one keyset page at a time.
+    ``?category=``, ``?agegroup=``, ``?club=`` or ``?team=`` narrow the
+    standings to that group.
+    """
+    queryset = LeaderboardEntry.objects.all()
+    serializer_class = LeaderboardEntrySerializer
+    pagination_class = KeysetCursorPagination
+    permission_classes = [AllowAny]
+    group_query_params = {
+        'category': LeaderboardEntry.GROUP_CATEGORY,
+        'agegroup': LeaderboardEntry.GROUP_AGEGROUP,
+        'club': LeaderboardEntry.GROUP_CLUB,
+        'team': LeaderboardEntry.GROUP_TEAM,
+    }
+
+    scope_field = 'round'
+
+    def get_scope(self):
+        model = LeaderboardEntry._meta.get_field(self.scope_field).related_model
+        pk = get_object_or_404(model, pk=self.kwargs['pk']).pk
+        return competition_scope(pk) if self.scope_field == 'competition' else round_scope(pk)
+
+    def get_uuid_param(self, name):
+        try:
+            return uuid.UUID(self.request.query_params[name])
+        except ValueError:
+            raise ValidationError({name: ["Must be a valid UUID."]})
+
+    def get_group(self):
+        requested = [name for name in self.group_query_params if name in self.request.query_params]
+        if not requested:
+            return LeaderboardEntry.GROUP_OVERALL, None
+        if len(requested) > 1:
+            raise ValidationError({
+                name: ["Only one group filter can be used at a time."] for name in requested
+            })
+        name = requested[0]
+        return self.group_query_params[name], self.get_uuid_param(name)
+
+    def get_queryset(self):
+        group_type, group_id = self.get_group()
+        return super().get_queryset().filter(
+            group_type=group_type,
+            group_id=group_id,
+            **self.get_scope(),
+        )
+
+class CompetitionLeaderboardAPIView(LeaderboardListAPIView):
+    """
+    Competition standings, or the standings of one of its rounds with
+    ``?round=<uuid>``.
+    """
+    scope_field = 'competition'
+
+    def get_scope(self):
+        scope = super().get_scope()
+        if 'round' not in self.request.query_params:
+            return scope
+        round_id = self.get_uuid_param('round')
+        get_object_or_404(CompetitionMembership, competition_id=scope['competition_id'], round_id=round_id)
+        return round_scope(round_id)
+
+class RoundLeaderboardAPIView(LeaderboardListAPIView):
+    scope_field = 'round'
+
+# Handicaps
+
+class RoundHandicapTableAPIView(APIView):
+    """
+    The expected score of every handicap for a round, for the arrows of its
+    scoring sheet or ``?arrows=<n>``, which a round without a sheet needs.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, pk):
+        round = get_object_or_404(Round.objects.select_related('targetface', 'scoringsheet'), pk=pk)
+        definition = handicaps.get_round_definition(round)
+        if definition is None:
+            raise NotFound("This round has no target face with a handicap table.")
+        if round.scoringsheet is None and not request.query_params.get('arrows'):
+            raise ValidationError({'arrows': ["This round has no scoring sheet, give the number of arrows."]})
+        number_of_arrows = round.scoringsheet.rows * round.scoringsheet.columns if round.scoringsheet else None
+        if request.query_params.get('arrows'):
+            try:
+                number_of_arrows = int(request.query_params['arrows'])
+            except ValueError:
+                number_of_arrows = 0
+            if number_of_arrows < 1:
+                raise ValidationError({'arrows': ["Must be a positive integer."]})
+        table = handicaps.get_table(definition)
+        return Response({
+            'round': round.pk,
+            'number_of_arrows': number_of_arrows,
+            'max_score': table.max_points * number_of_arrows,
+            'handicaps': [
+                {'handicap': handicap, 'score': score}
+                for handicap, score in enumerate(table.expected_scores(number_of_arrows))
+            ],
+        })
+
+class ScoreHandicapAPIView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request, pk):
+        rows = handicaps.get_score_rows(Score.objects.filter(pk=pk))
+        if not rows:
+            raise NotFound()
+        return Response(rows[0])
+
+class ArcherHandicapAPIView(APIView):
+    """
+    The handicap of every score of an archer, oldest round first, and the
+    best of them.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, pk):
+        archer = get_object_or_404(Archer, pk=pk)
+        rows = handicaps.get_score_rows(
+            Score.objects.filter(round_archer__archer=archer).order_by(
+                'round_archer__round__start_date', 'created_at', 'pk',
+            )
         )
-        serializer = CompetitionMembershipInfoSerializer({
-            'competitionmemberships': competitionmemberships,
-            'count': len(competitionmemberships),
+        known = [row['handicap'] for row in rows if row['handicap'] is not None]
+        return Response({
+            'archer': archer.pk,
+            'best': min(known) if known else None,
+            'scores': rows,
+        })
+
+class HandicapListAPIView(APIView):
+    """
+    The handicaps of many scores, filtered like the score export by
+    ``competition``, ``round``, ``club``, ``from``/``to`` and by ``archer``.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        filters, errors = export.clean_filters(request.query_params)
+        archer = request.query_params.get('archer')
+        if archer and parse_uuid(archer) is None:
+            errors['archer'] = ["Must be a valid UUID."]
+        if errors:
+            raise ValidationError(errors)
+        queryset = export.get_queryset('scores', include_inactive=includes_inactive(request), **filters)
+        if archer:
+            queryset = queryset.filter(round_archer__archer_id=parse_uuid(archer))
+        return Response({'results': handicaps.get_score_rows(queryset)})
+
+# Export
+
+class ExportAPIView(APIView):
+    """
+    Stream an export of ``scoring/export.py`` as CSV, NDJSON or XLSX, e.g.
+    ``export/scores.csv?competition=<id>&from=2026-01-01&to=2026-03-31``.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, name, file_format):
+        if name not in export.EXPORTS:
+            raise NotFound(f"Unknown export: {name}")
+        if file_format not in export.FORMATS:
+            raise NotFound(f"Unknown format: {file_format}")
+        filters, errors = export.clean_filters(request.query_params)
+        if errors:
+            raise ValidationError(errors)
+        queryset = export.get_queryset(name, include_inactive=includes_inactive(request), **filters)
+        try:
+            content = export.write_export(name, file_format, queryset)
+        except ValueError as exc:
+            raise NotAcceptable(str(exc))
+        response = StreamingHttpResponse(content, content_type=export.FORMATS[file_format])
+        response['Content-Disposition'] = f'attachment; filename="{name}.{file_format}"'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+# Import
+
+class ImportAPIView(APIView):
+    """
+    Create or update archers, clubs or memberships from an uploaded CSV or
+    XLSX file (multipart field ``file``), e.g. ``import/registrations/``.
+    With ``?dry_run=1`` nothing is written and the response only reports
+    what would be created, updated or is in conflict.
+    """
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, name):
+        if name not in imports.IMPORTS:
+            raise NotFound(f"Unknown import: {name}")
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': ["No file was submitted."]})
+        dry_run = request.query_params.get('dry_run', '').lower() in ('1', 'true', 'yes')
+        try:
+            report = imports.import_file(
+                name, upload.file, imports.get_format(upload.name), request.user, dry_run=dry_run,
+            )
+        except ValueError as exc:
+            raise ValidationError({'file': [str(exc)]})
+        except IntegrityError:
+            return Response(
+                {'detail': "The rows changed while importing, nothing was written. Try again."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(report)
+
+# Sync
+
+class SyncAPIView(APIView):
+    """
+    Everything created, changed or deleted in the scoring tables since
+    ``?since=<cursor>`` (or an ISO 8601 time; nothing: since the start), as
+    one stream of ``upsert`` and ``delete`` changes for offline clients.
+    Pass the returned ``cursor`` on the next request, ``has_more`` tells
+    whether to ask again right away.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        position = None
+        since = request.query_params.get('since')
+        if since:
+            try:
+                position = sync.decode_cursor(since)
+            except sync.InvalidCursor:
+                raise ValidationError({'since': ["Invalid cursor."]})
+            if position[0] < sync.get_horizon():
+                return Response(
+                    {'detail': "Deletions this old are no longer known, download everything again."},
+                    status=status.HTTP_410_GONE,
+                )
+        page_size = settings.SCORING_SYNC_PAGE_SIZE
+        if request.query_params.get('page_size'):
+            try:
+                page_size = int(request.query_params['page_size'])
+            except ValueError:
+                raise ValidationError({'page_size': ["A valid integer is required."]})
+            if page_size < 1:
+                raise ValidationError({'page_size': ["Ensure this value is greater than or equal to 1."]})
+            page_size = min(page_size, settings.SCORING_SYNC_MAX_PAGE_SIZE)
+
+        changes, last, has_more = sync.get_changes(position, page_size, context={'request': request})
+        cursor = sync.encode_cursor(last) if last is not None else None
+        next_url = None
+        if has_more:
+            next_url = replace_query_param(request.build_absolute_uri(), 'since', cursor)
+        return Response({
+            'changes': changes,
+            'cursor': cursor,
+            'has_more': has_more,
+            'next': next_url,
         })
-        
-        return Response(serializer.data)
 
+# Reference cache
+
+class ReferenceCacheStatsAPIView(APIView):
+    """
+    Hit and miss counters of the reference data cache, for this process.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(get_reference_cache_stats())
+
+
+class CacheStatsAPIView(APIView):
+    """
+    Hit, miss and load counters of the default cache per key prefix, for
+    this process.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(get_cache_stats())
+
+# Live
+
+def live_stream_response(channel):
+    response = StreamingHttpResponse(event_stream(channel), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Tell nginx not to buffer the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@require_GET
+def round_live(request, pk):
+    """
+    Server-Sent Events with the score deltas of one round.
+    """
+    round = get_object_or_404(Round, pk=pk)
+    return live_stream_response(round_channel(round.pk))
+
+@require_GET
+def competition_live(request, pk):
+    """
+    Server-Sent Events with the score deltas of every round of a competition.
+    """
+    competition = get_object_or_404(Competition, pk=pk)
+    return live_stream_response(competition_channel(competition.pk))